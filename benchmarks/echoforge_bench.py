@@ -0,0 +1,280 @@
+"""
+EchoForge Benchmark Suite
+
+Times the EchoForge hot paths against synthetic corpora and writes the
+results as JSON. A previous results file can be passed with --compare to
+flag regressions.
+
+Usage:
+    python -m benchmarks.echoforge_bench --sizes 1000 10000 100000 --output bench_results.json
+    python -m benchmarks.echoforge_bench --sizes 1000 --compare bench_results.json
+"""
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+import yaml
+from src.agents.echoForge.agent import EchoForgeAgent
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.fakes import ScriptedHuman
+from src.agents.echoForge.memory import EchoForgeMemory
+from src.agents.tools import set_input_provider
+from src.prompts.echoForge.echoForge_prompts import EchoPromptAssembler
+from src.utils.storage import StorageAdapter, TTLStore
+
+
+CONTEXTS = ["LinkedIn", "Twitter", "Discord in the Helium community", "Reddit r/MachineLearning", "Hacker News"]
+VOCABULARY = (
+    "ai model data team hiring launch product research ethics healthcare startup funding open source "
+    "python agent latency vector search memory graph prompt evaluation career remote culture design "
+    "infrastructure cloud cost security privacy community conference talk paper benchmark release"
+).split()
+
+
+def make_corpus(size: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Generate a deterministic synthetic corpus of echoForge documents"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        title_words = rng.sample(VOCABULARY, 4)
+        content_words = [rng.choice(VOCABULARY) for _ in range(rng.randint(20, 80))]
+        response_words = [rng.choice(VOCABULARY) for _ in range(rng.randint(10, 40))]
+        corpus.append({
+            "url": f"https://example.com/posts/{i}",
+            "context": rng.choice(CONTEXTS),
+            "title": " ".join(title_words).capitalize(),
+            "content": " ".join(content_words),
+            "human_response": " ".join(response_words),
+            "reflections": "",
+            "timestamp": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00"
+        })
+    return corpus
+
+
+def measure(fn: Callable[[], Any], repeats: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Run fn repeats times and summarize wall-clock timings in seconds"""
+    timings = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "repeats": repeats,
+        "mean": statistics.fmean(timings),
+        "median": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))],
+        "min": timings[0],
+        "max": timings[-1]
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the [TAG] progress prints of the code under test"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_corpus(size: int, config: EchoForgeConfig, repeats: int, queries: int) -> Dict[str, Dict[str, float]]:
+    """Benchmark memory, prompt and storage hot paths for one corpus size"""
+    results: Dict[str, Dict[str, float]] = {}
+    corpus = make_corpus(size)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        echoForge_dir = os.path.join(data_dir, "echoForge")
+        os.makedirs(echoForge_dir, exist_ok=True)
+        with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+            json.dump(corpus, f)
+        index_dir = os.path.join(echoForge_dir, "index")
+
+        def drop_index():
+            shutil.rmtree(index_dir, ignore_errors=True)
+
+        with quiet():
+            # Index builds are expensive at 100k, so cap repeats there
+            build_repeats = 1 if size >= 100000 else repeats
+            results["index_build"] = measure(lambda: EchoForgeMemory(data_dir, config), build_repeats, setup=drop_index)
+            results["index_load"] = measure(lambda: EchoForgeMemory(data_dir, config), repeats)
+            memory = EchoForgeMemory(data_dir, config)
+
+        rng = random.Random(1)
+        query_docs = [rng.choice(corpus) for _ in range(queries)]
+        query_texts = [
+            f"<context>{d['context']}</context>\n<title>{d['title']}</title>\n<content>{d['content']}</content>"
+            for d in query_docs
+        ]
+
+        def run_queries():
+            for query in query_texts:
+                memory.get_relevant_context(query, limit=3)
+
+        stats = measure(run_queries, repeats)
+        results["get_relevant_context"] = _per_op(stats, queries)
+
+        profile = memory.get_user_profile()
+        notes = memory.get_relevant_context(query_texts[0], limit=3)
+        doc = query_docs[0]
+        # One assembler across calls, as the agent holds it, so its prefix cache is measured too
+        assembler = EchoPromptAssembler()
+
+        def build_prompts():
+            for _ in range(queries):
+                assembler.build(doc["context"], doc["title"], doc["content"], profile, notes, session="bench")
+
+        results["build_echo_prompt"] = _per_op(measure(build_prompts, repeats), queries)
+
+        storage = StorageAdapter(os.path.join(data_dir, "storage"))
+        payload = {"documents": corpus}
+        with quiet():
+            results["storage_save"] = measure(lambda: storage.save_json("bench.json", payload), repeats)
+            results["storage_load"] = measure(lambda: storage.load_json("bench.json"), repeats)
+
+    ttl_ops = min(size, 10000)
+
+    def ttl_cycle():
+        store = TTLStore(ttl_days=1)
+        for i in range(ttl_ops):
+            store.store(f"key-{i}", i)
+        for i in range(ttl_ops):
+            store.retrieve(f"key-{i}")
+        store.cleanup_expired()
+
+    with quiet():
+        results["ttl_store"] = _per_op(measure(ttl_cycle, repeats), ttl_ops * 2 + 1)
+
+    return results
+
+
+def bench_graph(repeats: int) -> Dict[str, float]:
+    """Benchmark one full graph traversal with fake models and zero model latency"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        config_path = os.path.join(data_dir, "config.yaml")
+        with open(config_path, 'w') as f:
+            yaml.dump({"llm_provider": "fake", "embedding_provider": "fake", "data_dir": data_dir}, f)
+
+        with quiet():
+            agent = EchoForgeAgent(config_path)
+
+        def setup():
+            agent.llm.reset()
+            agent.memory.current_config = None
+            set_input_provider(ScriptedHuman(["new post", "LinkedIn / AI / body", "yes"]))
+
+        try:
+            with quiet():
+                return measure(agent.chat, repeats, setup=setup)
+        finally:
+            set_input_provider(None)
+
+
+def _per_op(stats: Dict[str, float], ops: int) -> Dict[str, float]:
+    """Convert batch timings into per-operation timings"""
+    per_op = {key: (value / ops if key != "repeats" else value) for key, value in stats.items()}
+    per_op["ops_per_sec"] = 1.0 / per_op["median"] if per_op["median"] > 0 else float("inf")
+    return per_op
+
+
+def run(sizes: List[int], repeats: int, queries: int, dim: int) -> Dict[str, Any]:
+    """Run the full suite and return a machine-readable results document"""
+    config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=dim)
+    results: Dict[str, Dict[str, float]] = {}
+
+    for size in sizes:
+        print(f"[BENCH] Corpus of {size} posts...")
+        for name, stats in bench_corpus(size, config, repeats, queries).items():
+            results[f"{name}[n={size}]"] = stats
+
+    print("[BENCH] Full graph traversal...")
+    results["graph_traversal"] = bench_graph(repeats)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeats": repeats,
+            "queries": queries,
+            "embedding_backend": f"hashing:dim={dim}"
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Compare median timings against a baseline run.
+
+    Returns one row per benchmark present in both runs; rows whose median
+    grew by more than threshold (fractional) are marked as regressions.
+    """
+    rows = []
+    for name, stats in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or old["median"] <= 0:
+            continue
+        ratio = stats["median"] / old["median"]
+        rows.append({
+            "benchmark": name,
+            "baseline": old["median"],
+            "current": stats["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold
+        })
+    return rows
+
+
+def print_table(results: Dict[str, Any], rows: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Print results (and comparison, if any) as a plain-text table"""
+    print(f"\n{'benchmark':<36}{'median (ms)':>14}{'p95 (ms)':>12}")
+    for name, stats in results["results"].items():
+        print(f"{name:<36}{stats['median'] * 1000:>14.3f}{stats['p95'] * 1000:>12.3f}")
+    if rows:
+        print(f"\n{'benchmark':<36}{'baseline (ms)':>14}{'current (ms)':>14}{'ratio':>8}")
+        for row in rows:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['benchmark']:<36}{row['baseline'] * 1000:>14.3f}{row['current'] * 1000:>14.3f}{row['ratio']:>8.2f}{flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark EchoForge hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Synthetic corpus sizes")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--queries", type=int, default=50, help="Queries/prompts per repetition")
+    parser.add_argument("--dim", type=int, default=256, help="Hashing embedding dimension")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.repeats, args.queries, args.dim)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"[BENCH] Results written to {args.output}")
+
+    rows = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            rows = compare(results, json.load(f), args.threshold)
+    print_table(results, rows)
+
+    if rows and any(row["regression"] for row in rows):
+        print(f"\n[BENCH] {sum(row['regression'] for row in rows)} regression(s) beyond {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+EchoForge Embedding Dimension Trade-off
+
+Measures how much nearest-neighbour recall is lost when the index stores
+fewer embedding dimensions, so the smallest acceptable embedding_dimensions
+can be chosen. Neighbours in the full-dimension space are the ground truth;
+recall@k is the fraction of them still found after reduction.
+
+Two reductions are compared:
+- pca:      the projection EchoForgeMemory fits with embedding_reduction "pca"
+- truncate: first n dimensions, re-normalized; this is what OpenAI
+            text-embedding-3 models return for embedding_reduction "native"
+
+Usage:
+    python -m benchmarks.embedding_dims --size 5000 --dims 64 128 256 512
+    python -m benchmarks.embedding_dims --config config/echoforge.yaml --k 5 --min-recall 0.95
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from benchmarks.echoforge_bench import make_corpus
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.embeddings import HashingEmbeddings, fit_projection
+from src.agents.echoForge.memory import EchoForgeMemory
+
+
+METHODS = ("pca", "truncate")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def reduce_vectors(vectors: np.ndarray, dims: int, method: str) -> np.ndarray:
+    """vectors reduced to dims with the given method"""
+    if method == "pca":
+        return vectors @ fit_projection(vectors, dims).T
+    if method == "truncate":
+        return _normalize(vectors[:, :dims])
+    raise ValueError(f"Unknown method: {method}")
+
+
+def nearest(vectors: np.ndarray, query_ids: np.ndarray, k: int) -> np.ndarray:
+    """Ids of the k most cosine-similar vectors to each query vector, excluding the query itself"""
+    unit = _normalize(vectors)
+    scores = unit[query_ids] @ unit.T
+    scores[np.arange(len(query_ids)), query_ids] = -np.inf
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    """Mean fraction of each query's true neighbours that were found"""
+    k = truth.shape[1]
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)]))
+
+
+def evaluate(vectors: np.ndarray, dims: List[int], k: int = 5, queries: int = 200,
+             methods: tuple = METHODS, seed: int = 0) -> List[Dict[str, Any]]:
+    """recall@k, storage and brute-force query time for every method and dimension"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    count, full_dims = vectors.shape
+    k = min(k, count - 1)
+    query_ids = np.random.RandomState(seed).choice(count, size=min(queries, count), replace=False)
+
+    def timed_nearest(space: np.ndarray) -> tuple:
+        start = time.perf_counter()
+        found = nearest(space, query_ids, k)
+        return found, (time.perf_counter() - start) * 1000 / len(query_ids)
+
+    truth, full_ms = timed_nearest(vectors)
+    rows = [{"method": "full", "dims": full_dims, "recall": 1.0, "bytes_per_vector": full_dims * 4,
+             "index_mb": count * full_dims * 4 / 2 ** 20, "query_ms": full_ms}]
+    for method in methods:
+        for dim in sorted(d for d in dims if d < full_dims):
+            found, query_ms = timed_nearest(reduce_vectors(vectors, dim, method))
+            rows.append({"method": method, "dims": dim, "recall": recall_at_k(truth, found),
+                         "bytes_per_vector": dim * 4, "index_mb": count * dim * 4 / 2 ** 20, "query_ms": query_ms})
+    return rows
+
+
+def smallest_acceptable(rows: List[Dict[str, Any]], min_recall: float) -> Dict[str, Optional[int]]:
+    """Per method, the fewest dimensions whose recall is at least min_recall"""
+    choice = {}
+    for method in METHODS:
+        passing = [row["dims"] for row in rows if row["method"] == method and row["recall"] >= min_recall]
+        choice[method] = min(passing) if passing else None
+    return choice
+
+
+def load_vectors(config_path: Optional[str], size: int, dim: int) -> np.ndarray:
+    """Full-dimension vectors of the configured memory's documents, or of a synthetic corpus"""
+    if config_path:
+        config = EchoForgeConfig.from_file(config_path)
+        config.embedding_dimensions = 0
+        memory = EchoForgeMemory(config.data_dir, config, load_index=False)
+        texts = [memory._to_document(doc, i).page_content for i, doc in enumerate(memory.documents)]
+        embeddings = memory.embeddings
+    else:
+        texts = [EchoForgeMemory._to_document(doc, i).page_content for i, doc in enumerate(make_corpus(size))]
+        embeddings = HashingEmbeddings(dim=dim)
+    if len(texts) < 2:
+        raise ValueError("Need at least two documents to measure recall")
+    print(f"[BENCH] Embedding {len(texts)} documents")
+    return np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+
+
+def print_table(rows: List[Dict[str, Any]], k: int) -> None:
+    print(f"\n{'method':<10}{'dims':>6}{f'recall@{k}':>11}{'bytes/vec':>11}{'index MB':>10}{'query ms':>10}")
+    for row in rows:
+        print(f"{row['method']:<10}{row['dims']:>6}{row['recall']:>11.3f}{row['bytes_per_vector']:>11}"
+              f"{row['index_mb']:>10.2f}{row['query_ms']:>10.3f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure recall@k against embedding dimensionality")
+    parser.add_argument("--config", help="Embed this config's stored documents (default: synthetic corpus)")
+    parser.add_argument("--size", type=int, default=5000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=1024, help="Hashing dimension of the synthetic corpus")
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256, 512], help="Reduced sizes to test")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--min-recall", type=float, default=0.95, help="Recall the chosen size must keep")
+    parser.add_argument("--output", help="Also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    rows = evaluate(load_vectors(args.config, args.size, args.dim), args.dims, args.k, args.queries)
+    print_table(rows, args.k)
+    for method, dims in smallest_acceptable(rows, args.min_recall).items():
+        verdict = f"{dims} dims" if dims else "none of the tested sizes"
+        print(f"[BENCH] {method}: smallest size with recall@{args.k} >= {args.min_recall:.2f}: {verdict}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
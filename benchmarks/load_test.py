@@ -0,0 +1,224 @@
+"""
+EchoForge Load Test
+
+Replays recorded sessions (see src/agents/echoForge/cassette.py) against the
+graph with N concurrent simulated users, and reports throughput, turn and
+session latency percentiles, process memory growth and error rate per
+concurrency level. Model replies and their latency come from the cassette;
+retrieval, prompt assembly, checkpointing and the graph run for real.
+
+Recording: sessions run at the console with cassette_record_file set; every
+model reply and human answer goes into the cassette. Any frontend works the
+same way (e.g. the server with cassette_record_file in its config).
+
+Usage:
+    python -m benchmarks.load_test record --config config/echoforge.yaml --cassette sessions.json --sessions 5
+    python -m benchmarks.load_test replay --cassette sessions.json --users 1 8 32 128 --output load.json
+    python -m benchmarks.load_test replay --cassette sessions.json --latency-scale 0 --think-time 1
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import yaml
+from benchmarks.echoforge_bench import make_corpus, quiet
+from src.agents.echoForge.agent import EchoForgeAgent
+from src.agents.echoForge.cassette import human_replies, load_cassette
+from src.agents.echoForge.config import EchoForgeConfig
+from src.utils.tracing import percentile
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where the current value is unavailable)"""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def replay_config(cassette_path: str, config_dir: str, data_dir: str, base: Optional[Dict[str, Any]] = None,
+                  latency_scale: float = 1.0) -> str:
+    """Write a config replaying cassette_path over data_dir into config_dir and return its path"""
+    config = dict(base or {"embedding_provider": "fake"})
+    config.update({"llm_provider": "replay", "cassette_file": os.path.abspath(cassette_path),
+                   "cassette_latency_scale": latency_scale, "cassette_record_file": "", "data_dir": data_dir})
+    config_path = os.path.join(config_dir, "load_test.yaml")
+    with open(config_path, 'w') as f:
+        yaml.dump(config, f)
+    return config_path
+
+
+def run_user(agent: EchoForgeAgent, sessions: List[List[Dict[str, Any]]], user: int, count: int,
+             think_time: float, results: Dict[str, list], lock: threading.Lock) -> None:
+    """One simulated user running count recorded sessions back to back"""
+    for n in range(count):
+        index = (user * count + n) % len(sessions)
+        thread_id = f"load-{user}-{n}-{uuid.uuid4().hex[:8]}"
+        agent.llm.assign(thread_id, index)
+        replies = human_replies(sessions[index])
+        think_times = [e.get("think_time", 0.0) for e in sessions[index] if e["type"] == "human"]
+        turns = []
+        session_start = time.perf_counter()
+        try:
+            start = time.perf_counter()
+            turn = agent.start_session(thread_id)
+            turns.append(time.perf_counter() - start)
+            while turn["question"] is not None:
+                if not replies:
+                    raise RuntimeError(f"Session {index} asked more questions than were recorded")
+                if think_time > 0:
+                    time.sleep(max(0.0, think_times.pop(0)) * think_time)
+                start = time.perf_counter()
+                turn = agent.resume_session(thread_id, replies.pop(0))
+                turns.append(time.perf_counter() - start)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with lock:
+            results["turns"].extend(turns)
+            if error is None:
+                results["sessions"].append(time.perf_counter() - session_start)
+            else:
+                results["errors"].append(error)
+
+
+def run_level(config_path: str, sessions: List[List[Dict[str, Any]]], users: int, sessions_per_user: int,
+              think_time: float = 0.0) -> Dict[str, Any]:
+    """Run users simulated users concurrently on one agent and summarize the level"""
+    gc.collect()
+    rss_before = rss_bytes()
+    with quiet():
+        agent = EchoForgeAgent(config_path)
+    results: Dict[str, list] = {"turns": [], "sessions": [], "errors": []}
+    lock = threading.Lock()
+
+    start = time.perf_counter()
+    with quiet(), ThreadPoolExecutor(max_workers=users) as pool:
+        for user in range(users):
+            pool.submit(run_user, agent, sessions, user, sessions_per_user, think_time, results, lock)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    rss_after = rss_bytes()
+    with quiet():
+        agent.close()
+
+    turns, durations = sorted(results["turns"]), sorted(results["sessions"])
+    total = users * sessions_per_user
+    return {
+        "users": users,
+        "sessions": total,
+        "completed": len(durations),
+        "errors": len(results["errors"]),
+        "error_rate": len(results["errors"]) / total if total else 0.0,
+        "sample_errors": sorted(set(results["errors"]))[:3],
+        "sessions_per_s": len(durations) / elapsed if elapsed > 0 else 0.0,
+        "turn_p50_ms": percentile(turns, 0.50) * 1000,
+        "turn_p95_ms": percentile(turns, 0.95) * 1000,
+        "turn_p99_ms": percentile(turns, 0.99) * 1000,
+        "session_p50_s": percentile(durations, 0.50),
+        "session_p99_s": percentile(durations, 0.99),
+        "rss_mb": rss_after / 2 ** 20,
+        "rss_growth_mb": (rss_after - rss_before) / 2 ** 20,
+        "elapsed_s": elapsed
+    }
+
+
+def replay(cassette_path: str, users: List[int], sessions_per_user: int = 5, latency_scale: float = 1.0,
+           think_time: float = 0.0, base_config: Optional[str] = None, corpus_size: int = 1000) -> List[Dict[str, Any]]:
+    """One row per concurrency level, each on a fresh agent over the same data"""
+    sessions = [session["events"] for session in load_cassette(cassette_path)["sessions"]]
+    if not sessions:
+        raise ValueError(f"No sessions recorded in {cassette_path}")
+    base = None
+    if base_config:
+        with open(base_config, 'r') as f:
+            base = yaml.safe_load(f) or {}
+
+    rows = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = (base or {}).get("data_dir")
+        if not data_dir:
+            data_dir = temp_dir
+            os.makedirs(os.path.join(data_dir, "echoForge"), exist_ok=True)
+            with open(os.path.join(data_dir, "echoForge", "echoForge_documents.json"), 'w') as f:
+                json.dump(make_corpus(corpus_size), f)
+        config_path = replay_config(cassette_path, temp_dir, data_dir, base, latency_scale)
+        for level in users:
+            rows.append(run_level(config_path, sessions, level, sessions_per_user, think_time))
+            print(f"[BENCH] {level} users: {rows[-1]['sessions_per_s']:.1f} sessions/s, "
+                  f"{rows[-1]['error_rate']:.1%} errors")
+    return rows
+
+
+def record(config_path: str, cassette_path: str, sessions: int) -> int:
+    """Run sessions at the console with recording on; returns the number of sessions recorded"""
+    config = EchoForgeConfig.from_file(config_path)
+    config.cassette_record_file = cassette_path
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recording_config = os.path.join(temp_dir, "record.yaml")
+        config.save_to_file(recording_config)
+        agent = EchoForgeAgent(recording_config)
+        try:
+            for _ in range(sessions):
+                agent.run_session(f"record-{uuid.uuid4().hex[:12]}")
+        finally:
+            agent.close()
+    return len(agent.cassette_recorder.sessions())
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'users':>6}{'sessions':>10}{'err %':>7}{'sess/s':>9}{'turn p50':>10}{'turn p95':>10}"
+          f"{'turn p99':>10}{'sess p99 s':>11}{'RSS MB':>9}{'growth':>8}")
+    for row in rows:
+        print(f"{row['users']:>6}{row['sessions']:>10}{row['error_rate'] * 100:>7.1f}{row['sessions_per_s']:>9.2f}"
+              f"{row['turn_p50_ms']:>10.1f}{row['turn_p95_ms']:>10.1f}{row['turn_p99_ms']:>10.1f}"
+              f"{row['session_p99_s']:>11.2f}{row['rss_mb']:>9.1f}{row['rss_growth_mb']:>8.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Record EchoForge sessions and replay them with concurrent users")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Record sessions run at the console")
+    record_parser.add_argument("--config", default="config/echoforge.yaml")
+    record_parser.add_argument("--cassette", required=True, help="Cassette file to write")
+    record_parser.add_argument("--sessions", type=int, default=1)
+
+    replay_parser = commands.add_parser("replay", help="Replay a cassette with increasing concurrency")
+    replay_parser.add_argument("--cassette", required=True)
+    replay_parser.add_argument("--config", help="Base config (default: fake embeddings over a synthetic corpus)")
+    replay_parser.add_argument("--users", type=int, nargs="+", default=[1, 8, 32, 128], help="Concurrency levels")
+    replay_parser.add_argument("--sessions", type=int, default=5, help="Sessions per simulated user")
+    replay_parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on recorded model latency")
+    replay_parser.add_argument("--think-time", type=float, default=0.0, help="Multiplier on recorded human think time")
+    replay_parser.add_argument("--corpus-size", type=int, default=1000, help="Synthetic corpus size without --config")
+    replay_parser.add_argument("--output", help="Also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        recorded = record(args.config, args.cassette, args.sessions)
+        print(f"[BENCH] {recorded} sessions in {args.cassette}")
+        return 0
+
+    rows = replay(args.cassette, args.users, args.sessions, args.latency_scale, args.think_time,
+                  args.config, args.corpus_size)
+    print_table(rows)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+    return 0 if all(row["errors"] == 0 for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+EchoForge Retrieval Evaluation
+
+Compares retrieval modes of EchoForgeMemory.get_relevant_context on one
+corpus. Ground truth is an exact (brute-force cosine) search over the
+full-size vectors of the reference embedding backend; every mode is scored
+against it for recall@k and MRR, and timed for query latency (p50/p99),
+index build time and index memory.
+
+A mode is a named set of EchoForgeConfig overrides plus an optional k, e.g.
+
+    - name: pca-128
+      embedding_dimensions: 128
+      embedding_reduction: pca
+    - name: strict
+      confidence_threshold: 0.75
+      k: 5
+
+Usage:
+    python -m benchmarks.retrieval_eval --size 5000
+    python -m benchmarks.retrieval_eval --documents data/echoForge/echoForge/echoForge_documents.json \\
+        --config config/echoforge.yaml --modes modes.yaml --output retrieval_eval.json
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+import yaml
+from benchmarks.echoforge_bench import make_corpus, quiet
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.memory import EchoForgeMemory
+from src.agents.echoForge.prefetch import echo_query
+from src.utils.tracing import percentile
+
+
+DEFAULT_K = 3
+DEFAULT_MODES = [
+    {"name": "flat"},
+    {"name": "flat-k10", "k": 10},
+    {"name": "pca-256", "embedding_dimensions": 256, "embedding_reduction": "pca"},
+    {"name": "pca-64", "embedding_dimensions": 64, "embedding_reduction": "pca"},
+    {"name": "threshold-0.7", "confidence_threshold": 0.7}
+]
+
+
+def make_queries(corpus: List[Dict[str, Any]], count: int, seed: int = 1) -> List[str]:
+    """Echo-style queries for random posts, keeping the title and the first half of the content"""
+    rng = random.Random(seed)
+    queries = []
+    for doc in rng.sample(corpus, min(count, len(corpus))):
+        words = doc.get("content", "").split()
+        queries.append(echo_query(doc.get("context", ""), doc.get("title", ""), " ".join(words[:max(1, len(words) // 2)])))
+    return queries
+
+
+def exact_neighbours(config: EchoForgeConfig, corpus: List[Dict[str, Any]], queries: List[str], k: int) -> List[List[str]]:
+    """Urls of the k most cosine-similar posts per query, by brute force over full-size vectors"""
+    reference = EchoForgeConfig(**{**config.__dict__, "embedding_dimensions": 0})
+    with tempfile.TemporaryDirectory() as data_dir, quiet():
+        embeddings = EchoForgeMemory(data_dir, reference, load_index=False).embeddings
+    texts = [EchoForgeMemory._to_document(doc, i).page_content for i, doc in enumerate(corpus)]
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    urls = [doc.get("url", "") for doc in corpus]
+
+    truth = []
+    for query in queries:
+        query_vector = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+        scores = vectors @ (query_vector / max(float(np.linalg.norm(query_vector)), 1e-12))
+        top = np.argsort(-scores, kind="stable")[:k]
+        truth.append([urls[i] for i in top])
+    if hasattr(embeddings, "close"):
+        embeddings.close()
+    return truth
+
+
+def score(truth: List[List[str]], retrieved: List[List[str]], k: int) -> Dict[str, float]:
+    """recall@k against the exact top k, and MRR of the exact nearest post"""
+    recalls, reciprocal_ranks = [], []
+    for expected, found in zip(truth, retrieved):
+        recalls.append(len(set(expected[:k]) & set(found[:k])) / k)
+        rank = found.index(expected[0]) + 1 if expected and expected[0] in found else 0
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    return {"recall": float(np.mean(recalls)), "mrr": float(np.mean(reciprocal_ranks))}
+
+
+def index_bytes(memory: EchoForgeMemory) -> int:
+    """Serialized size of the FAISS index plus any stored projection"""
+    import faiss
+
+    store = memory.vector_store
+    size = 0 if store is None else int(faiss.serialize_index(store.index).nbytes)
+    if os.path.exists(memory.projection_file) and hasattr(memory.embeddings, "fit_documents"):
+        size += os.path.getsize(memory.projection_file)
+    return size
+
+
+def evaluate_mode(mode: Dict[str, Any], base: EchoForgeConfig, corpus: List[Dict[str, Any]],
+                  queries: List[str], truth: List[List[str]]) -> Dict[str, Any]:
+    """Build an index for one mode, run every query through get_relevant_context and score it"""
+    overrides = {key: value for key, value in mode.items() if key not in ("name", "k")}
+    k = mode.get("k", DEFAULT_K)
+    config = EchoForgeConfig(**{**base.__dict__, **overrides})
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        echoForge_dir = os.path.join(data_dir, "echoForge")
+        os.makedirs(echoForge_dir, exist_ok=True)
+        with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+            json.dump(corpus, f)
+
+        with quiet():
+            start = time.perf_counter()
+            memory = EchoForgeMemory(data_dir, config)
+            build_seconds = time.perf_counter() - start
+
+        latencies, retrieved = [], []
+        for query in queries:
+            start = time.perf_counter()
+            posts = memory.get_relevant_context(query, limit=k)
+            latencies.append(time.perf_counter() - start)
+            retrieved.append([post["url"] for post in posts])
+        latencies.sort()
+
+        row = {
+            "mode": mode["name"], "k": k, **score([t[:k] for t in truth], retrieved, k),
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "index_mb": index_bytes(memory) / 2 ** 20,
+            "build_s": build_seconds,
+            "dims": memory.vector_store.index.d if memory.vector_store is not None else 0
+        }
+        if hasattr(memory.embeddings, "close"):
+            memory.embeddings.close()
+    return row
+
+
+def run(corpus: List[Dict[str, Any]], modes: List[Dict[str, Any]], base: EchoForgeConfig,
+        queries: int = 200) -> List[Dict[str, Any]]:
+    """One comparison row per mode; ground truth is computed once at the largest k"""
+    query_texts = make_queries(corpus, queries)
+    max_k = max(mode.get("k", DEFAULT_K) for mode in modes)
+    truth = exact_neighbours(base, corpus, query_texts, max_k)
+    return [evaluate_mode(mode, base, corpus, query_texts, truth) for mode in modes]
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    """Print the comparison as a plain-text table"""
+    print(f"\n{'mode':<18}{'k':>4}{'dims':>6}{'recall@k':>10}{'MRR':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'index MB':>10}{'build s':>9}")
+    for row in rows:
+        print(f"{row['mode']:<18}{row['k']:>4}{row['dims']:>6}{row['recall']:>10.3f}{row['mrr']:>8.3f}"
+              f"{row['p50_ms']:>9.3f}{row['p99_ms']:>9.3f}{row['index_mb']:>10.2f}{row['build_s']:>9.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate EchoForge retrieval quality and latency")
+    parser.add_argument("--config", help="Base config (default: offline hashing embeddings)")
+    parser.add_argument("--documents", help="echoForge_documents.json to evaluate on (default: synthetic corpus)")
+    parser.add_argument("--size", type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument("--modes", help="YAML/JSON list of modes (default: built-in set)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per mode")
+    parser.add_argument("--output", help="Also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    if args.config:
+        base = EchoForgeConfig.from_file(args.config)
+    else:
+        base = EchoForgeConfig(embedding_provider="hashing", embedding_dim=512)
+    # Recall is measured against exact search, so thresholding only applies where a mode asks for it
+    base.confidence_threshold = 0.0
+
+    if args.documents:
+        with open(args.documents, 'r') as f:
+            corpus = json.load(f)
+    else:
+        corpus = make_corpus(args.size)
+    modes = DEFAULT_MODES
+    if args.modes:
+        with open(args.modes, 'r') as f:
+            modes = yaml.safe_load(f)
+
+    rows = run(corpus, modes, base, args.queries)
+    print_table(rows)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
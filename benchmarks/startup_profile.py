@@ -0,0 +1,146 @@
+"""
+EchoForge Startup Profile
+
+Breaks down import time per module (python -X importtime) for the EchoForge
+entry points and measures time-to-first-prompt of examples/echoforge_demo.py
+with offline fake providers, checking both against targets.
+
+Usage:
+    python -m benchmarks.startup_profile
+    python -m benchmarks.startup_profile --module src.agents.echoForge.agent --top 30
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import yaml
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEMO = os.path.join(ROOT, "examples", "echoforge_demo.py")
+PROMPT_MARKER = "[Your response]:"
+
+# Targets on a typical laptop; the time-to-first-prompt target covers interpreter start,
+# imports, agent construction and the first (fake) LLM turn
+TARGET_IMPORT_SECONDS = 1.5
+TARGET_FIRST_PROMPT_SECONDS = 3.0
+
+# Modules that must stay out of `import src.agents.echoForge.agent`; they load on first use
+DEFERRED_MODULES = ("langchain_openai", "openai", "langchain_community", "faiss", "numpy", "yaml")
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse -X importtime output into rows of module, self_us, cumulative_us, depth"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip(" ")) - 1) // 2
+        })
+    return rows
+
+
+def import_profile(module: str) -> Dict[str, Any]:
+    """Import module in a fresh interpreter; total seconds, per-module rows and deferred modules loaded"""
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=ROOT, env=_env(), check=True
+    )
+    rows = parse_importtime(result.stderr)
+    total = next((row["cumulative_us"] for row in rows if row["module"] == module), 0) / 1e6
+    loaded = [m for m in result.stdout.strip().split(",") if m]
+    return {"module": module, "seconds": total, "rows": rows, "deferred_loaded": loaded}
+
+
+def time_to_first_prompt(config_path: Optional[str] = None, timeout: float = 60.0) -> float:
+    """Seconds from launching the demo until it first asks the user for input.
+
+    Without config_path the demo runs on the offline fake providers in a
+    temporary data directory.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if config_path is None:
+            config_path = os.path.join(temp_dir, "config.yaml")
+            with open(config_path, 'w') as f:
+                yaml.dump({"llm_provider": "fake", "embedding_provider": "fake", "data_dir": temp_dir,
+                           "logs_dir": temp_dir, "writeback_enabled": False}, f)
+
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, DEMO, config_path], cwd=ROOT, env=_env(),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        output = b""
+        elapsed = None
+        try:
+            while time.perf_counter() - start < timeout:
+                chunk = os.read(process.stdout.fileno(), 4096)
+                if not chunk:
+                    break
+                output += chunk
+                if PROMPT_MARKER.encode() in output:
+                    elapsed = time.perf_counter() - start
+                    break
+            # Answer "exit" so the demo shuts down cleanly
+            process.communicate(b"exit\n" * 10, timeout=timeout)
+        finally:
+            if process.poll() is None:
+                process.kill()
+        if elapsed is None:
+            raise RuntimeError(f"Demo never prompted for input; output:\n{output.decode(errors='replace')}")
+        return elapsed
+
+
+def print_profile(profile: Dict[str, Any], top: int) -> None:
+    print(f"\n[STARTUP] import {profile['module']}: {profile['seconds']:.3f}s")
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for row in sorted(profile["rows"], key=lambda r: r["cumulative_us"], reverse=True)[:top]:
+        print(f"{row['cumulative_us'] / 1000:>14.1f}  {row['self_us'] / 1000:>8.1f}  {'  ' * row['depth']}{row['module']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile EchoForge startup")
+    parser.add_argument("--module", default="src.agents.echoForge.agent", help="Module whose import is profiled")
+    parser.add_argument("--top", type=int, default=20, help="Modules to list, by cumulative import time")
+    parser.add_argument("--config", help="Config for the demo run (default: offline fake providers)")
+    parser.add_argument("--repeats", type=int, default=3, help="Demo launches; the best is reported")
+    args = parser.parse_args(argv)
+
+    profile = import_profile(args.module)
+    print_profile(profile, args.top)
+    first_prompt = min(time_to_first_prompt(args.config) for _ in range(args.repeats))
+    print(f"\n[STARTUP] time to first prompt: {first_prompt:.3f}s (target {TARGET_FIRST_PROMPT_SECONDS:.1f}s)")
+
+    failures = []
+    if profile["seconds"] > TARGET_IMPORT_SECONDS:
+        failures.append(f"import took {profile['seconds']:.3f}s > {TARGET_IMPORT_SECONDS:.1f}s")
+    if profile["deferred_loaded"]:
+        failures.append(f"deferred modules imported eagerly: {', '.join(profile['deferred_loaded'])}")
+    if first_prompt > TARGET_FIRST_PROMPT_SECONDS:
+        failures.append(f"first prompt took {first_prompt:.3f}s > {TARGET_FIRST_PROMPT_SECONDS:.1f}s")
+    for failure in failures:
+        print(f"[STARTUP] FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
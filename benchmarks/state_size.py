@@ -0,0 +1,118 @@
+"""
+EchoForge Checkpointed State Size
+
+Runs consecutive conversations on one thread with the fake model and reports,
+after each conversation, the serialized size of the thread's checkpointed
+state, its message count and the prompt tokens sent to the model so far.
+Growth per conversation should stay flat: each conversation adds its own
+dialogue, never another copy of the system prompts or of search results.
+
+Two scripted paths are measured:
+- collect: the user provides a new post (three questions, then echo)
+- fetch:   the user picks an archived post found with search_post_history
+
+Usage:
+    python -m benchmarks.state_size --conversations 10
+    python -m benchmarks.state_size --conversations 10 --no-compact --output state_size.json
+"""
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import os
+import sys
+import tempfile
+import yaml
+from benchmarks.echoforge_bench import make_corpus, quiet
+from src.agents.echoForge.agent import EchoForgeAgent
+
+
+PATHS: Dict[str, Dict[str, Any]] = {
+    "collect": {"script": None, "replies": ["new post", "LinkedIn / AI / body", "yes"]},
+    "fetch": {
+        "script": [
+            {"tool": "ask_human", "args": {"question": "What would you like to work on today?"}},
+            {"content": "The user wants to fetch an existing post. OPTION_2"},
+            {"tool": "search_post_history", "args": {}},
+            {"tool": "search_post_history", "args": {"page": 2}},
+            {"content": "SELECTED_POST: https://example.com/posts/3"},
+            {"content": "Thanks for sharing, this matches what we saw on our team too."}
+        ],
+        "replies": ["an old post"]
+    }
+}
+
+
+def checkpoint_bytes(agent: EchoForgeAgent, thread_id: str) -> int:
+    """Size of the thread's state values as the checkpointer serializes them"""
+    values = agent.graph.get_state(agent.memory.create_config(thread_id)).values
+    return len(agent.memory.memory_saver.serde.dumps_typed(values)[1])
+
+
+def measure_path(path: str, conversations: int, compact: bool = True, corpus_size: int = 50) -> List[Dict[str, Any]]:
+    """One row per finished conversation on a single thread"""
+    spec = PATHS[path]
+    with tempfile.TemporaryDirectory() as data_dir:
+        echoForge_dir = os.path.join(data_dir, "echoForge")
+        os.makedirs(echoForge_dir, exist_ok=True)
+        with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+            json.dump(make_corpus(corpus_size), f)
+        config = {"llm_provider": "fake", "embedding_provider": "fake", "data_dir": data_dir,
+                  "compact_state": compact, "writeback_enabled": False, "prefetch_enabled": False}
+        if spec["script"] is not None:
+            config["fake_script_file"] = os.path.join(data_dir, "script.json")
+            with open(config["fake_script_file"], 'w') as f:
+                json.dump(spec["script"], f)
+        config_path = os.path.join(data_dir, "config.yaml")
+        with open(config_path, 'w') as f:
+            yaml.dump(config, f)
+
+        rows = []
+        with quiet():
+            agent = EchoForgeAgent(config_path)
+            for conversation in range(1, conversations + 1):
+                agent.llm.reset()
+                turn = agent.start_session(path)
+                for reply in spec["replies"]:
+                    if turn["question"] is None:
+                        break
+                    turn = agent.resume_session(path, reply)
+                rows.append({
+                    "path": path,
+                    "compact": compact,
+                    "conversation": conversation,
+                    "messages": len(turn["values"]["messages"]),
+                    "checkpoint_bytes": checkpoint_bytes(agent, path),
+                    "prompt_tokens": agent.get_usage(path)["total"]["prompt_tokens"]
+                })
+            agent.close()
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]]) -> None:
+    print(f"\n{'path':<9}{'compact':>8}{'conv':>6}{'messages':>10}{'state KB':>10}{'prompt tokens':>15}")
+    for row in rows:
+        print(f"{row['path']:<9}{str(row['compact']):>8}{row['conversation']:>6}{row['messages']:>10}"
+              f"{row['checkpoint_bytes'] / 1024:>10.1f}{row['prompt_tokens']:>15}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure checkpointed state size and prompt tokens per conversation")
+    parser.add_argument("--conversations", type=int, default=10, help="Conversations run on the same thread")
+    parser.add_argument("--paths", nargs="+", choices=sorted(PATHS), default=sorted(PATHS))
+    parser.add_argument("--no-compact", action="store_true", help="Run with compact_state disabled")
+    parser.add_argument("--output", help="Also write the rows as JSON")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for path in args.paths:
+        rows.extend(measure_path(path, args.conversations, compact=not args.no_compact))
+    print_table(rows)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+        print(f"[BENCH] Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
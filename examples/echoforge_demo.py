@@ -1,19 +1,22 @@
 """
 EchoForge Demo Script
+
+Usage:
+    python examples/echoforge_demo.py [config_path]
 """
-import os
+import sys
 from dotenv import load_dotenv
 from src.agents.echoForge.agent import EchoForgeAgent
 
 
 def main():
     """Demo script for EchoForge agent"""
+    print("=== EchoForge Agent Demo ===")
+    
     # Load environment variables from .env file
     load_dotenv()
     
-    print("=== EchoForge Agent Demo ===")
-    
-    agent = EchoForgeAgent()
+    agent = EchoForgeAgent(*sys.argv[1:2])
     
     # # Example: Using echo function
     # context = "LinkedIn"
@@ -1,47 +1,323 @@
 """
 EchoForge Main Agent Class
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+import atexit
+import threading
+import time
 import uuid
 import json
+import os
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.types import Command
 from .state import EchoForgeState, EchoModeState, PostSchema
 from .config import EchoForgeConfig
 from .memory import EchoForgeMemory
-from src.prompts.echoForge.echoForge_prompts import EchoForgePrompts
-from src.agents.tools import ask_human
+from .usage import BudgetExceededError, UsageCallbackHandler, UsageTotals, UsageTracker, bind_node
+from .writeback import WriteBehindQueue
+from .prefetch import RetrievalPrefetcher, echo_query, parse_post_fields
+from .tenants import TenantMemoryPool, validate_user_id
+from .compaction import compact_messages, replace_messages
+from .request_policy import PolicyChatModel, RequestPolicy, RequestTimeoutError
+from .echo_budget import (FALLBACK_MODEL, FULL, NO_EXAMPLES, DeadlineRunner, EchoDeadline, LatencyWindow,
+                          worst_level)
+from src.prompts.echoForge.echoForge_prompts import EchoForgePrompts, EchoPromptAssembler
+from src.agents.tools import INTERRUPTIBLE_KEY, ask_human, make_search_post_history_tool, read_human_reply
+from src.utils.http_pool import get_http_pool
+from src.utils.lazy_import import LazyImports
+from src.utils.tracing import TracingCallbackHandler, configure_tracing, current_thread_id
 from langgraph.prebuilt import create_react_agent
 
 
+# The OpenAI client stack is imported on first use to keep startup fast
+_lazy = LazyImports(globals(), {"ChatOpenAI": "langchain_openai:ChatOpenAI"})
+__getattr__ = _lazy.module_getattr
+
+# Sessions whose tenant is cached in memory; older ones are looked up in their checkpointed state again
+SESSION_USERS_MAX = 10000
+
+# Config of the graph node currently executing; sub-agents run under it as subgraphs
+_node_config: ContextVar[Optional[RunnableConfig]] = ContextVar("echoforge_node_config", default=None)
+
+
 class EchoForgeAgent:
     """Main EchoForge agent with LangGraph integration"""
     
+    # Steps that can be given their own model/temperature through config.node_models
+    MODEL_NODES = ("gather_intent", "collect_post_info", "fetch_from_history", "structured_parse", "echo")
+    
     def __init__(self, config_path: str = "config/echoforge.yaml"):
         self.config = EchoForgeConfig.from_file(config_path)
-        self.memory = EchoForgeMemory(self.config.data_dir)
+        # The vector store is loaded on first retrieval (or by warm_up), not before the first prompt
+        self.memory = EchoForgeMemory(self.config.data_dir, self.config, load_index=False)
+        
+        # Sessions started with a user_id use that tenant's memory instead of the default one
+        self.tenants = TenantMemoryPool.from_config(self.config)
+        # thread_id -> user_id of live sessions; finished sessions are dropped, the oldest beyond a cap too
+        self._session_users: "OrderedDict[str, str]" = OrderedDict()
         self.prompt_builder = EchoForgePrompts()
+        self.echo_prompt_assembler = EchoPromptAssembler()
+        
+        # Tracing: spans around nodes/LLM/retrieval, plus a callback handler for per-call timings
+        self.tracer = configure_tracing(
+            self.config.tracing_enabled,
+            self.config.trace_log_file or os.path.join(self.config.logs_dir, "echoforge_trace.jsonl")
+        )
+        self.callbacks = [TracingCallbackHandler(self.tracer)] if self.tracer.enabled else []
         
-        # Initialize LLM
-        self.llm = ChatOpenAI(
-            model=self.config.llm_model,
-            temperature=self.config.llm_temperature
+        # Token/cost accounting per node and per thread_id
+        self.usage = UsageTracker(
+            pricing=self.config.model_pricing,
+            session_token_budget=self.config.session_token_budget,
+            session_cost_budget=self.config.session_cost_budget
         )
+        self.callbacks.append(UsageCallbackHandler(self.usage))
+        self.last_echo_usage = UsageTotals()
+        self.last_echo_report: Dict[str, Any] = {}
+        
+        # Echo latency budget: deadline-bounded retrieval, and recent generation latency to plan against.
+        # Abandoned retrievals keep their thread until they finish, so the pool leaves room beyond the
+        # runs that can be echoing at once; otherwise new retrievals queue behind them and miss their slice
+        echo_workers = self.config.echo_workers or 2 * self.config.server_max_active_runs
+        self.echo_runner = DeadlineRunner(max(echo_workers, self.config.server_max_active_runs))
+        self.echo_latency = LatencyWindow(self.config.echo_latency_quantile,
+                                          max_age=self.config.echo_latency_max_age)
+        
+        # Initialize LLMs: one client per (model, temperature), shared by the nodes that use it
+        unknown = set(self.config.node_models) - set(self.MODEL_NODES)
+        if unknown:
+            raise ValueError(f"Unknown node_models entries: {', '.join(sorted(unknown))}")
+        self._llms: Dict[Tuple[str, float], Any] = {}
+        self._llm_lock = threading.Lock()
+        # Deadlines, retries and hedging for network model calls
+        self.request_policy = RequestPolicy.from_config(self.config)
+        # Optionally record every model reply and human answer as a replayable cassette
+        self.cassette_recorder = None
+        if self.config.cassette_record_file:
+            from .cassette import CassetteRecorder
+            self.cassette_recorder = CassetteRecorder(self.config.cassette_record_file, self.config.llm_model)
+            atexit.register(self.cassette_recorder.save)
+        self.llm = self._get_llm()
+        
+        # Tool for looking up archived posts via the memory's secondary indexes
+        self.search_post_history = make_search_post_history_tool(lambda: self.memory_for())
+        
+        # Finished sessions are appended to memory in batches, off the interactive path
+        self.writeback = None
+        if self.config.writeback_enabled:
+            self.writeback = WriteBehindQueue(
+                self._write_records,
+                batch_size=self.config.writeback_batch_size,
+                flush_interval=self.config.writeback_flush_interval
+            )
+            atexit.register(self.writeback.close)
+        
+        # Speculative echo retrieval, started while the human confirms the post fields
+        self.prefetcher = None
+        if self.config.prefetch_enabled:
+            self.prefetcher = RetrievalPrefetcher(
+                lambda query: self.memory.get_packed_context(query),
+                workers=self.config.prefetch_workers
+            )
         
         # Build graph
         self.graph = self._build_graph()
     
+    def close(self) -> None:
+        """Flush pending write-behind records and stop background work; call before shutting down"""
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+        self.request_policy.close()
+        self.echo_runner.close()
+        self.tenants.close()
+        if self.writeback is not None:
+            self.writeback.close()
+            atexit.unregister(self.writeback.close)
+        if self.cassette_recorder is not None:
+            self.cassette_recorder.save()
+            atexit.unregister(self.cassette_recorder.save)
+    
+    def memory_for(self, thread_id: Optional[str] = None) -> EchoForgeMemory:
+        """Memory of the session's tenant (default: the current thread), or the default memory"""
+        thread_id = thread_id or current_thread_id()
+        if thread_id is None:
+            return self.memory
+        user_id = self._user_for(thread_id)
+        return self.tenants.get(user_id) if user_id else self.memory
+    
+    def _user_for(self, thread_id: str) -> str:
+        """Tenant of a session, empty for the default memory"""
+        user_id = self._session_users.get(thread_id)
+        if user_id is None:
+            # Sessions resumed after a restart (or dropped from the cache) carry their tenant in the checkpointed state
+            values = self.graph.get_state(self.memory.create_config(thread_id)).values
+            user_id = values.get("user_id") or ""
+            self._remember_user(thread_id, user_id)
+        return user_id
+    
+    def _remember_user(self, thread_id: str, user_id: str) -> None:
+        self._session_users[thread_id] = user_id
+        while len(self._session_users) > SESSION_USERS_MAX:
+            self._session_users.popitem(last=False)
+    
+    def _write_records(self, records) -> None:
+        """Write-behind writer: append each record to its tenant's memory.
+        
+        A session is stored once: records whose url is already in the tenant's
+        memory, or earlier in the batch, are skipped.
+        """
+        by_user: Dict[str, list] = {}
+        for record in records:
+            by_user.setdefault(record.get("user_id", ""), []).append(
+                {key: value for key, value in record.items() if key != "user_id"}
+            )
+        for user_id, batch in by_user.items():
+            # A pinned tenant cannot be evicted and reloaded while its files are being written
+            with self.tenants.pinned(user_id) if user_id else nullcontext(self.memory) as memory:
+                urls = set()
+                new_records = []
+                for record in batch:
+                    if record["url"] in urls or memory.get_post_by_url(record["url"]) is not None:
+                        continue
+                    urls.add(record["url"])
+                    new_records.append(record)
+                memory.append_documents(new_records)
+    
+    def llm_for(self, node: str):
+        """Chat model configured for a node (see config.node_models)"""
+        settings = self.config.node_models.get(node)
+        # Fake and replayed models follow one scripted conversation, so every node shares them
+        if not settings or self.config.llm_provider in ("fake", "replay"):
+            return self.llm
+        return self._get_llm(settings.get("model"), settings.get("temperature"))
+    
+    def _get_llm(self, model: Optional[str] = None, temperature: Optional[float] = None):
+        """Cached chat model for (model, temperature), defaulting to llm_model/llm_temperature"""
+        model = model or self.config.llm_model
+        temperature = self.config.llm_temperature if temperature is None else temperature
+        key = (model, temperature)
+        with self._llm_lock:
+            if key not in self._llms:
+                llm = self._create_llm(model, temperature)
+                if self.config.llm_provider == "openai" and self.request_policy.enabled:
+                    llm = PolicyChatModel(inner=llm, policy=self.request_policy, model_name=model, usage=self.usage)
+                if self.cassette_recorder is not None:
+                    from .cassette import RecordingChatModel
+                    llm = RecordingChatModel(inner=llm, recorder=self.cassette_recorder, model_name=model)
+                self._llms[key] = llm
+            return self._llms[key]
+    
+    def _create_llm(self, model: Optional[str] = None, temperature: Optional[float] = None):
+        """Create the chat model selected by the config"""
+        if self.config.llm_provider == "fake":
+            from .fakes import FakeChatModel
+            return FakeChatModel.from_config(self.config)
+        elif self.config.llm_provider == "replay":
+            from .cassette import CassetteChatModel
+            return CassetteChatModel.from_config(self.config)
+        elif self.config.llm_provider == "openai":
+            http_pool = get_http_pool(self.config)
+            return _lazy.get("ChatOpenAI")(
+                model=model or self.config.llm_model,
+                temperature=self.config.llm_temperature if temperature is None else temperature,
+                # Retries belong to the request policy; the timeout also ends abandoned requests.
+                # llm_timeout bounds the wait for a response, the pool's settings the rest
+                max_retries=0,
+                timeout=http_pool.request_timeout(read=self.config.llm_timeout),
+                http_client=http_pool.client,
+                http_async_client=http_pool.async_client
+            )
+        else:
+            raise ValueError(f"Unknown llm_provider: {self.config.llm_provider}")
+    
+    def _instrument_node(self, name: str, node):
+        """Wrap a graph node with thread_id/node attribution, budget checks and a tracing span"""
+        
+        def instrumented(state: EchoModeState, config: RunnableConfig) -> EchoModeState:
+            thread_id = config.get("configurable", {}).get("thread_id")
+            token = _node_config.set(config)
+            try:
+                with self.tracer.bind_thread(thread_id), bind_node(name):
+                    if self.config.budget_action == "abort" and self.usage.over_budget(thread_id):
+                        raise BudgetExceededError(f"Session {thread_id} exceeded its budget before {name}")
+                    with self.tracer.span(f"node.{name}") as span:
+                        result = node(state)
+                        span.set(route=result.get("status"))
+                    if self.config.compact_state and "messages" in result:
+                        result["messages"] = replace_messages(self._conversation(result))
+            finally:
+                _node_config.reset(token)
+            return result
+        
+        return instrumented
+    
+    def _instruction_prompts(self) -> Tuple[str, ...]:
+        """System prompts of the sub-agents, as older checkpoints may hold copies of them"""
+        return (
+            self.prompt_builder.intent_gathering_system_prompt(),
+            self.prompt_builder.collect_post_info_system_prompt(),
+            self.prompt_builder.fetch_from_history_system_prompt()
+        )
+    
+    def _conversation(self, state: EchoModeState) -> list:
+        """The state's messages without instruction prompts or finished search-tool chatter"""
+        messages = state.get("messages", [])
+        if not self.config.compact_state:
+            return messages
+        return compact_messages(messages, self._instruction_prompts())
+    
+    def get_usage(self, thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """Token and cost totals with a per-node breakdown, for one session or all of them"""
+        return self.usage.summary(thread_id)
+    
+    def _run_config(self) -> Dict[str, Any]:
+        """Config for sub-agent invocations.
+        
+        Inside a graph node this is the node's own config, so sub-agents run as
+        checkpointed subgraphs of the session and ask_human can interrupt them.
+        """
+        node_config = _node_config.get()
+        if node_config is not None:
+            return node_config
+        return self._session_config((self.memory.get_config() or {}).get("configurable", {}).get("thread_id"))
+    
+    def _session_config(self, thread_id: Optional[str]) -> Dict[str, Any]:
+        """Thread config plus tracing/usage callbacks for a session's graph runs"""
+        config = self.memory.create_config(thread_id) if thread_id else {}
+        if self.callbacks:
+            config["callbacks"] = self.callbacks
+        return config
+    
+    def get_request_stats(self) -> Dict[str, Any]:
+        """Request policy counters: calls, hedges, hedge_rate, hedge_wins, retries and timeouts"""
+        return self.request_policy.stats()
+    
+    def get_http_stats(self) -> Dict[str, Any]:
+        """Request and connection counters of the shared HTTP pool"""
+        return get_http_pool(self.config).stats()
+    
+    def dump_metrics(self, path: Optional[str] = None) -> str:
+        """Write the metrics registry as a text exposition file and return its path"""
+        path = path or self.config.metrics_file or os.path.join(self.config.logs_dir, "echoforge_metrics.prom")
+        self.tracer.registry.dump(path)
+        return path
+    
     def _build_graph(self) -> StateGraph:
         """Build LangGraph workflow"""
         workflow = StateGraph(EchoModeState)
         
         # Add nodes
-        workflow.add_node("gather_intent", self._gather_intent_node)
-        workflow.add_node("collect_post_info", self._collect_post_info_node)
-        workflow.add_node("echo", self._echo_node)
-        workflow.add_node("fetch_from_history", self._fetch_from_history_node)
-        workflow.add_node("handle_exit", self._handle_exit_node)
+        workflow.add_node("gather_intent", self._instrument_node("gather_intent", self._gather_intent_node))
+        workflow.add_node("collect_post_info", self._instrument_node("collect_post_info", self._collect_post_info_node))
+        workflow.add_node("echo", self._instrument_node("echo", self._echo_node))
+        workflow.add_node("fetch_from_history", self._instrument_node("fetch_from_history", self._fetch_from_history_node))
+        workflow.add_node("handle_exit", self._instrument_node("handle_exit", self._handle_exit_node))
         
         # Add conditional edges from gather_intent
         workflow.add_conditional_edges(
@@ -64,11 +340,20 @@ class EchoForgeAgent:
             }
         )
         
+        # Add conditional edges from fetch_from_history
+        workflow.add_conditional_edges(
+            "fetch_from_history",
+            self._route_by_collect_status,
+            {
+                "echo": "echo",  # A post was selected from records
+                "exit": "handle_exit"  # Nothing selected or user wants to exit
+            }
+        )
+        
         # Echo node ends after generating response
         workflow.add_edge("echo", END)
         
         # Other paths end after their nodes
-        workflow.add_edge("fetch_from_history", END)
         workflow.add_edge("handle_exit", END)
         
         # Set entry point
@@ -82,20 +367,14 @@ class EchoForgeAgent:
         # Get system prompt from prompt builder
         system_prompt = self.prompt_builder.intent_gathering_system_prompt()
         
-        # Add system message if not present
-        if not any(
-            (isinstance(msg, dict) and msg.get("role") == "system") or 
-            (hasattr(msg, "role") and msg.role == "system")
-            for msg in state.get("messages", [])
-        ):
-            state["messages"].insert(0, AIMessage(content=system_prompt, name="EchoForge"))
-        
         # Create mini ReAct agent inline
         tools = [ask_human]
-        mini_agent = create_react_agent(self.llm, tools)
+        # The system prompt is prepended per model call, so it is never stored in the conversation
+        mini_agent = create_react_agent(self.llm_for("gather_intent"), tools, prompt=SystemMessage(content=system_prompt))
         
         # Run the mini agent with the same thread config from memory
-        result = mini_agent.invoke({"messages": state["messages"]}, config=self.memory.get_config())
+        with self.tracer.span("react.gather_intent"):
+            result = mini_agent.invoke({"messages": self._conversation(state)}, config=self._run_config())
         
         # Update state with new messages
         state["messages"] = result.get("messages", state["messages"])
@@ -108,7 +387,7 @@ class EchoForgeAgent:
                 break
         
         print(f"[Agent]: {last_assistant_msg}")
-
+        
         # Detect status from AI's final summary message
         if last_assistant_msg:
             summary_text = last_assistant_msg.lower()
@@ -160,20 +439,14 @@ class EchoForgeAgent:
         # Get system prompt from prompt builder
         system_prompt = self.prompt_builder.collect_post_info_system_prompt()
         
-        # Add system message if not present
-        if not any(
-            (isinstance(msg, dict) and msg.get("role") == "system") or 
-            (hasattr(msg, "role") and msg.role == "system")
-            for msg in state.get("messages", [])
-        ):
-            state["messages"].insert(0, AIMessage(content=system_prompt, name="EchoForge"))
-        
         # Create mini ReAct agent inline
         tools = [ask_human]
-        mini_agent = create_react_agent(self.llm, tools)
+        # The system prompt is prepended per model call, so it is never stored in the conversation
+        mini_agent = create_react_agent(self.llm_for("collect_post_info"), tools, prompt=SystemMessage(content=system_prompt))
         
         # Run the mini agent with the same thread config from memory
-        result = mini_agent.invoke({"messages": state["messages"]}, config=self.memory.get_config())
+        with self.tracer.span("react.collect_post_info"):
+            result = mini_agent.invoke({"messages": self._conversation(state)}, config=self._run_config())
         
         # Update state with new messages
         state["messages"] = result.get("messages", state["messages"])
@@ -199,7 +472,10 @@ class EchoForgeAgent:
                 # Parse data using LLM structured output
                 try:
                     # Use LLM with structured output to parse post information
-                    parsed_post = self.llm.with_structured_output(PostSchema).invoke(last_assistant_msg)
+                    with bind_node("structured_parse"), self.tracer.span("llm.structured_parse"):
+                        parsed_post = self.llm_for("structured_parse").with_structured_output(PostSchema).invoke(
+                            last_assistant_msg, config={"callbacks": self.callbacks}
+                        )
                     
                     # Update post_info in state
                     state["post_info"]["context"] = parsed_post.context
@@ -229,10 +505,12 @@ class EchoForgeAgent:
         title = post_info.get("title", "")
         content = post_info.get("content", "")
         
-        # Generate echo response using the echo function
-        response = self.echo(context, title, content)
+        # Generate echo response using the echo function, within the configured latency budget
+        response, report = self.echo_with_report(context, title, content)
         
         # Add response to messages
+        state["ai_response"] = response
+        state["echo_degradation"] = report["level"]
         state["messages"].append(AIMessage(content=response, name="EchoForge"))
         
         # Print the response
@@ -241,8 +519,50 @@ class EchoForgeAgent:
         return state
     
     def _fetch_from_history_node(self, state: EchoModeState) -> EchoModeState:
-        """Fetch a post from history"""
-        # This is a placeholder - implement logic to fetch from history
+        """Mini-ReAct node to pick an existing post from records"""
+        
+        # Get system prompt from prompt builder
+        system_prompt = self.prompt_builder.fetch_from_history_system_prompt()
+        
+        # Create mini ReAct agent inline
+        tools = [ask_human, self.search_post_history]
+        # The system prompt is prepended per model call, so it is never stored in the conversation
+        mini_agent = create_react_agent(self.llm_for("fetch_from_history"), tools, prompt=SystemMessage(content=system_prompt))
+        
+        # Run the mini agent with the same thread config from memory
+        with self.tracer.span("react.fetch_from_history"):
+            result = mini_agent.invoke({"messages": self._conversation(state)}, config=self._run_config())
+        
+        # Update state with new messages
+        state["messages"] = result.get("messages", state["messages"])
+        
+        # Look at the last assistant message for the selected post
+        last_assistant_msg = None
+        for msg in reversed(state["messages"]):
+            if isinstance(msg, AIMessage) or (isinstance(msg, dict) and msg.get("role") == "assistant"):
+                last_assistant_msg = msg.content if hasattr(msg, 'content') else msg.get("content", "")
+                break
+        
+        print(f"[Agent]: {last_assistant_msg}")
+        
+        marker = "selected_post:"
+        if last_assistant_msg and marker in last_assistant_msg.lower():
+            start = last_assistant_msg.lower().index(marker) + len(marker)
+            url = last_assistant_msg[start:].strip().split()[0] if last_assistant_msg[start:].strip() else ""
+            post = self.memory_for().get_post_by_url(url)
+            if post is not None:
+                state["post_info"]["context"] = post.get("context", "")
+                state["post_info"]["title"] = post.get("title", "")
+                state["post_info"]["content"] = post.get("content", "")
+                state["status"] = "echo"
+                print("[Status]: Ready to echo response")
+            else:
+                state["status"] = "exit"
+                print(f"[Status]: No post found for {url} - exiting")
+        else:
+            state["status"] = "exit"
+            print("[Status]: No post selected - exiting")
+        
         return state
     
     def _handle_exit_node(self, state: EchoModeState) -> EchoModeState:
@@ -256,7 +576,7 @@ class EchoForgeAgent:
         
         return state
     
-    def echo(self, context: str, title: str, content: str) -> str:
+    def echo(self, context: str, title: str, content: str, budget: Optional[float] = None) -> str:
         """
         Echo mode function: generates a response based on context, title, and content.
         
@@ -264,53 +584,308 @@ class EchoForgeAgent:
             context: The platform/context (e.g., "LinkedIn", "Twitter", etc.)
             title: The title of the post
             content: The content of the post
+            budget: Seconds the call may take (default: config.echo_latency_budget; 0 means unlimited)
         
         Returns:
-            A response string that mimics the user's communication style
+            A response string that mimics the user's communication style; how far the
+            call degraded to fit its budgets is in last_echo_report (see echo_with_report)
         """
+        response, _ = self.echo_with_report(context, title, content, budget)
+        return response
+    
+    def echo_with_report(self, context: str, title: str, content: str,
+                         budget: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        echo() returning (response, report).
+        
+        report["level"] is "full", "no_examples" (retrieval skipped, failed or
+        missed its share of the budget) or "fallback_model" (generated by the
+        fallback model); report["reasons"] says why, e.g. "session_budget",
+        "retrieval_deadline", "generation_deadline" or "generation_timeout".
+        The primary model gets the time left in the budget as its deadline; if
+        it misses it the fallback model answers, or RequestTimeoutError is raised
+        when no fallback model is configured. The fallback model is best-effort:
+        it runs without the echo deadline, bounded only by llm_timeout, so a
+        degraded echo can still overrun its budget.
+        """
+        with bind_node("echo"), self.usage.scope() as usage:
+            response, report = self._generate_echo(context, title, content, budget)
+        self.last_echo_usage = usage
+        self.last_echo_report = report
+        return response, report
+    
+    def _generate_echo(self, context: str, title: str, content: str,
+                       budget: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        """Retrieve examples, build the echo prompt and generate, honouring the session and latency budgets"""
+        deadline = EchoDeadline(self.config.echo_latency_budget if budget is None else budget,
+                                self.config.echo_retrieval_share)
+        report: Dict[str, Any] = {"level": FULL, "reasons": [], "budget_s": deadline.budget}
+        llm = self.llm_for("echo")
+        over_budget = self.usage.over_budget(current_thread_id())
+        if over_budget:
+            if self.config.budget_action == "abort":
+                raise BudgetExceededError(f"Session {current_thread_id()} exceeded its budget before echo")
+            print("[Status]: Session budget exceeded - echoing without examples")
+            self._degrade(report, NO_EXAMPLES, "session_budget")
+            if self.config.budget_fallback_model:
+                llm = self._echo_fallback(self.config.budget_fallback_model)
+                self._degrade(report, FALLBACK_MODEL, "session_budget")
+        
         # Get user profile
-        user_profile = self.memory.get_user_profile()
+        user_profile = self.memory_for().get_user_profile()
         
         # Build query string for vector store search with proper formatting
-        query = f"<context>{context}</context>\n<title>{title}</title>\n<content>{content}</content>".strip()
+        query = echo_query(context, title, content)
         
-        # Get relevant notes from vector store (top 3)
-        relevant_notes = self.memory.get_relevant_context(query, limit=3)
+        # Get a diverse, token-budgeted set of examples; skipped when over budget or out of time
+        relevant_notes = [] if over_budget else self._examples_within(query, deadline, report)
         
         # Build the prompt with all 5 parts
-        prompt = self.prompt_builder.build_echo_prompt(context, title, content, user_profile, relevant_notes)
+        with self.tracer.span("prompt.build_echo") as span:
+            prompt, prefix_report = self.echo_prompt_assembler.build(context, title, content, user_profile,
+                                                                     relevant_notes, session=current_thread_id())
+            span.set(**prefix_report)
+        
+        # Switch to the fallback model when the primary's recent latency no longer fits the time left
+        primary = report["level"] != FALLBACK_MODEL
+        fallback_model = self.config.echo_fallback_model or self.config.budget_fallback_model
+        remaining = deadline.remaining()
+        estimate = self.echo_latency.estimate()
+        if primary and remaining is not None and (remaining <= 0 or (estimate is not None and estimate > remaining)):
+            if fallback_model:
+                print("[Status]: Echo latency budget too short for the model - using the fallback model")
+                llm = self._echo_fallback(fallback_model)
+                primary = False
+                self._degrade(report, FALLBACK_MODEL, "generation_deadline")
+            else:
+                report["reasons"].append("generation_deadline")
         
-        # Generate and return the response
-        response = self.llm.invoke(prompt).content
-        return response
+        # Generate and return the response; the primary model gets the time left as its deadline
+        def generate(model) -> str:
+            return model.invoke(prompt, config={"callbacks": self.callbacks}).content
+        
+        remaining = deadline.remaining()
+        start = time.perf_counter()
+        with self.tracer.span("llm.echo_generation", level=report["level"]):
+            if not primary or remaining is None:
+                response = generate(llm)
+            else:
+                try:
+                    response = self.request_policy.call_within(lambda: generate(llm), remaining,
+                                                               key="echo_budget")
+                except RequestTimeoutError:
+                    # The missed deadline is a lower bound on the model's latency
+                    self.echo_latency.observe(time.perf_counter() - start)
+                    if not fallback_model:
+                        raise
+                    print("[Status]: Echo generation missed its latency budget - using the fallback model")
+                    primary = False
+                    self._degrade(report, FALLBACK_MODEL, "generation_timeout")
+                    # Best-effort: the budget is spent, so the fallback only has llm_timeout
+                    response = generate(self._echo_fallback(fallback_model))
+        if primary:
+            self.echo_latency.observe(time.perf_counter() - start)
+        report["elapsed_s"] = round(deadline.elapsed(), 3)
+        self.tracer.registry.inc("echoforge_echo_total", level=report["level"])
+        return response, report
     
-    def chat(self) -> str:
-        """Main chat interface - agent initiates conversation"""
+    @staticmethod
+    def _degrade(report: Dict[str, Any], level: str, reason: str) -> None:
+        """Record a degradation step in an echo report; the level only ever gets worse"""
+        report["level"] = worst_level(report["level"], level)
+        if reason not in report["reasons"]:
+            report["reasons"].append(reason)
+    
+    def _echo_fallback(self, model: str):
+        """Cached client of a fallback echo model, at the echo node's temperature"""
+        return self._get_llm(model, self.config.node_models.get("echo", {}).get("temperature"))
+    
+    def _examples_within(self, query: str, deadline: EchoDeadline, report: Dict[str, Any]):
+        """Echo examples for query, or none if retrieval fails or misses its share of the latency budget"""
+        try:
+            finished, notes = self.echo_runner.run(lambda: self._retrieve_examples(query),
+                                                   deadline.retrieval_timeout())
+        except Exception as e:
+            # Without a budget retrieval errors surface as before
+            if not deadline.enabled:
+                raise
+            print(f"[Status]: Echo retrieval failed - echoing without examples: {e}")
+            self._degrade(report, NO_EXAMPLES, "retrieval_error")
+            return []
+        if not finished:
+            print("[Status]: Echo retrieval missed its latency budget - echoing without examples")
+            self._degrade(report, NO_EXAMPLES, "retrieval_deadline")
+            return []
+        return notes
+    
+    def record_feedback(self, human_response: str, reflections: str = "", ai_evaluation: str = "",
+                        thread_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Record the user's own response to an echoed post and queue the session for persistence.
         
-        # Create or get thread config from memory
-        config = self.memory.create_or_get_config()
+        The session state is updated right away; the post is appended to the
+        documents file, vector store and history index by the write-behind worker.
+        A session's post is stored once; feedback recorded again for the same
+        session updates its state but not the stored post.
         
-        # Create initial state
-        initial_state: EchoModeState = {
+        Args:
+            human_response: The response the user actually wrote
+            reflections: Notes on differences between the AI and human responses
+            ai_evaluation: Optional evaluation of the AI response
+            thread_id: Session to update; defaults to the current memory thread
+        
+        Returns:
+            The queued record, or None if the session has no echoed post
+        """
+        config = self.memory.create_config(thread_id) if thread_id else self.memory.get_config()
+        if not config:
+            return None
+        values = self.graph.get_state(config).values
+        post_info = values.get("post_info", {})
+        if not values.get("ai_response") or not human_response:
+            return None
+        
+        self.graph.update_state(config, {
+            "human_response": human_response,
+            "reflections": reflections,
+            "ai_evaluation": ai_evaluation
+        })
+        
+        session_id = config["configurable"]["thread_id"]
+        user_id = values.get("user_id") or ""
+        record = {
+            "url": f"echoforge://session/{session_id}",
+            "context": post_info.get("context", ""),
+            "title": post_info.get("title", ""),
+            "content": post_info.get("content", ""),
+            "ai_response": values.get("ai_response", ""),
+            "ai_evaluation": ai_evaluation,
+            "human_response": human_response,
+            "reflections": reflections,
+            "timestamp": datetime.now().isoformat()
+        }
+        tagged = dict(record, user_id=user_id) if user_id else record
+        if self.writeback is not None:
+            self.writeback.enqueue(tagged)
+        else:
+            self._write_records([tagged])
+        return record
+    
+    @staticmethod
+    def _initial_state(user_id: str = "") -> EchoModeState:
+        """Fresh state for a new conversation"""
+        return {
             "messages": [],
             "post_info": {"context": "", "title": "", "content": ""},
             "ai_response": "",
             "ai_evaluation": "",
             "human_response": "",
             "reflections": "",
-            "status": ""  # Will be set by gather_intent_node: "collect", "fetch", or "exit"
+            "status": "",  # Will be set by gather_intent_node: "collect", "fetch", or "exit"
+            "echo_degradation": "",
+            "user_id": user_id
+        }
+    
+    def start_session(self, thread_id: str, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start a conversation on its own thread_id and run it until it needs the human or ends.
+        
+        Sessions share the LLM client and compiled graph; their state is
+        isolated by thread_id in the checkpointer. A session waiting on the
+        human holds no thread, only its checkpointed state. With a user_id the
+        session reads and writes that tenant's profile, posts and index;
+        otherwise the default memory.
+        
+        Returns:
+            {"question": <pending question or None>, "values": <state values>}
+        """
+        user_id = validate_user_id(user_id) if user_id else ""
+        self._remember_user(thread_id, user_id)
+        return self._advance(thread_id, self._initial_state(user_id))
+    
+    def resume_session(self, thread_id: str, reply: str) -> Dict[str, Any]:
+        """Resume a session paused on a question with the human's reply; same return as start_session"""
+        if self.pending_question(thread_id) is None:
+            raise ValueError(f"Session {thread_id} is not waiting for a reply")
+        return self._advance(thread_id, Command(resume=reply))
+    
+    def pending_question(self, thread_id: str) -> Optional[str]:
+        """The question a session is paused on, or None"""
+        snapshot = self.graph.get_state(self.memory.create_config(thread_id))
+        for task in snapshot.tasks:
+            for pending in task.interrupts:
+                return str(pending.value)
+        return None
+    
+    def _advance(self, thread_id: str, payload: Any) -> Dict[str, Any]:
+        config = self._session_config(thread_id)
+        # The graph is compiled with the memory's checkpointer, so ask_human may interrupt it
+        config["configurable"][INTERRUPTIBLE_KEY] = True
+        user_id = self._user_for(thread_id)
+        # The session's tenant stays resident for the whole run
+        with self.tenants.pinned(user_id) if user_id else nullcontext():
+            for _ in self.graph.stream(payload, config=config, stream_mode="updates"):
+                pass
+        question = self.pending_question(thread_id)
+        if question is None:
+            self._session_users.pop(thread_id, None)
+        if question is not None and self.prefetcher is not None:
+            self._prefetch_for_question(thread_id, question)
+        elif self.prefetcher is not None:
+            self.prefetcher.discard(thread_id)
+        return {
+            "question": question,
+            "values": self.graph.get_state(self.memory.create_config(thread_id)).values
         }
+    
+    def run_session(self, thread_id: str) -> Dict[str, Any]:
+        """Run a whole conversation, answering questions from the console, and return the final state values"""
+        turn = self.start_session(thread_id)
+        while turn["question"] is not None:
+            turn = self.resume_session(thread_id, read_human_reply(turn["question"]))
+        return turn["values"]
+    
+    def _retrieve_examples(self, query: str):
+        """Packed examples for query, reusing this session's speculative prefetch when it matches"""
+        thread_id = current_thread_id()
+        if self.prefetcher is not None and thread_id is not None:
+            hit, notes = self.prefetcher.take(thread_id, query)
+            self.tracer.registry.inc("echoforge_prefetch_total", result="hit" if hit else "miss")
+            if hit:
+                return notes
+        return self.memory_for(thread_id).get_packed_context(query)
+    
+    def _prefetch_for_question(self, thread_id: str, question: str) -> None:
+        """Start retrieval early when a question lists all three post fields (e.g. the confirmation)"""
+        # Over-budget sessions echo without retrieval, so there is nothing to speculate on
+        if self.usage.over_budget(thread_id):
+            return
+        fields = parse_post_fields(question)
+        if fields is not None:
+            self.prefetcher.start(thread_id, echo_query(**fields), retrieve=self.memory_for(thread_id).get_packed_context)
+    
+    def chat(self) -> str:
+        """Main chat interface - agent initiates conversation"""
+        
+        # Create or get thread config from memory
+        config = self.memory.create_or_get_config()
+        
+        # Load the vector store while the user answers the first questions
+        self.memory.warm_up(background=True)
         
         # Just stream and print all messages
         try:
-            # Stream the graph execution in updates mode
-            for _ in self.graph.stream(initial_state, config=config, stream_mode="updates"):
-                pass     
+            self.run_session(config["configurable"]["thread_id"])
         except KeyboardInterrupt:
             print("\nInterrupted by user, exiting...")
+        except BudgetExceededError as e:
+            print(f"\n[Status]: {e} - exiting")
         except Exception as e:
             print(f"\nError: {e}")
             import traceback
             traceback.print_exc()
         
-        return None
\ No newline at end of file
+        if self.tracer.enabled:
+            self.dump_metrics()
+        
+        return None
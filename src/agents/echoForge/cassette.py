@@ -0,0 +1,246 @@
+"""
+EchoForge Session Cassettes: record model replies and human answers of real sessions, replay them offline
+"""
+from typing import Any, Dict, List, Optional, Sequence
+from datetime import datetime
+import json
+import os
+import threading
+import time
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+from .usage import current_node
+from src.utils.tracing import current_thread_id
+
+
+CASSETTE_VERSION = 1
+
+# Sessions recorded or replayed outside a graph run (no thread_id bound)
+NO_THREAD = "no_thread"
+
+
+class CassetteMismatchError(RuntimeError):
+    """Raised when a replayed session asks for a call its recording does not have"""
+
+
+def message_to_dict(message: AIMessage) -> Dict[str, Any]:
+    """Recordable form of a model reply"""
+    return {
+        "content": message.content,
+        "tool_calls": [{"name": c["name"], "args": c["args"], "id": c["id"]} for c in message.tool_calls],
+        "usage": dict(message.usage_metadata or {})
+    }
+
+
+def message_from_dict(data: Dict[str, Any]) -> AIMessage:
+    """Model reply rebuilt from its recorded form"""
+    message = AIMessage(content=data.get("content", ""), tool_calls=data.get("tool_calls", []))
+    if data.get("usage"):
+        message.usage_metadata = data["usage"]
+    return message
+
+
+def load_cassette(path: str) -> Dict[str, Any]:
+    """Read a cassette file, checking its version"""
+    with open(path, 'r') as f:
+        cassette = json.load(f)
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}: {cassette.get('version')}")
+    return cassette
+
+
+class CassetteRecorder:
+    """Collects one event list per thread_id and writes them as a cassette.
+
+    Events are, in the order they happened:
+        {"type": "model", "node": ..., "latency": s, "message": {...}}       a chat model reply
+        {"type": "structured", "node": ..., "latency": s, "output": {...}}   a structured-output parse
+        {"type": "human", "question": ..., "reply": ..., "think_time": s}    an ask_human answer
+
+    Human answers are taken from the ask_human results the model receives,
+    so recording works the same behind the console, the server or the API.
+    """
+
+    def __init__(self, path: str, model_name: str = ""):
+        self.path = path
+        self.model_name = model_name
+        self._sessions: Dict[str, List[Dict[str, Any]]] = {}
+        # ask_human calls issued per thread: call id -> (question, time asked)
+        self._asked: Dict[str, Dict[str, tuple]] = {}
+        self._lock = threading.Lock()
+
+    def record_model(self, messages: Sequence[BaseMessage], message: AIMessage, latency: float) -> None:
+        thread_id = current_thread_id() or NO_THREAD
+        now = time.time()
+        with self._lock:
+            events = self._sessions.setdefault(thread_id, [])
+            asked = self._asked.setdefault(thread_id, {})
+            for previous in messages:
+                call_id = getattr(previous, "tool_call_id", None)
+                if previous.type == "tool" and call_id in asked:
+                    question, asked_at = asked.pop(call_id)
+                    events.append({"type": "human", "question": question, "reply": str(previous.content),
+                                   "think_time": round(now - asked_at - latency, 3)})
+            events.append({"type": "model", "node": current_node(), "latency": round(latency, 4),
+                           "message": message_to_dict(message)})
+            for call in message.tool_calls:
+                if call["name"] == "ask_human":
+                    asked[call["id"]] = (call["args"].get("question", ""), now)
+
+    def record_structured(self, output: Dict[str, Any], latency: float) -> None:
+        with self._lock:
+            self._sessions.setdefault(current_thread_id() or NO_THREAD, []).append(
+                {"type": "structured", "node": current_node(), "latency": round(latency, 4), "output": output}
+            )
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"thread_id": thread_id, "events": list(events)} for thread_id, events in self._sessions.items()]
+
+    def save(self) -> None:
+        """Write the cassette atomically; a no-op before anything was recorded"""
+        sessions = self.sessions()
+        if not sessions:
+            return
+        cassette = {"version": CASSETTE_VERSION, "model": self.model_name,
+                    "recorded_at": datetime.now().isoformat(), "sessions": sessions}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cassette, f, indent=2)
+        os.replace(tmp_path, self.path)
+        print(f"[CASSETTE] Recorded {len(sessions)} sessions to {self.path}")
+
+
+class RecordingChatModel(BaseChatModel):
+    """Chat model wrapper passing calls through to a real model and recording its replies"""
+
+    inner: Any
+    recorder: Any
+    model_name: str = ""
+    # Call arguments bound to the inner model, e.g. the tools of bind_tools
+    inner_kwargs: Dict[str, Any] = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "echoforge-recording"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        start = time.perf_counter()
+        # Called below the callback layer, so usage is reported once, by this wrapper's run
+        result = self.inner._generate(messages, stop=stop, **{**self.inner_kwargs, **kwargs})
+        self.recorder.record_model(messages, result.generations[0].message, time.perf_counter() - start)
+        return result
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> 'RecordingChatModel':
+        binding = self.inner.bind_tools(tools, **kwargs)
+        return RecordingChatModel(inner=self.inner, recorder=self.recorder, model_name=self.model_name,
+                                  inner_kwargs={**self.inner_kwargs, **binding.kwargs})
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        structured = self.inner.with_structured_output(schema, **kwargs)
+
+        def parse(value: Any, config=None):
+            start = time.perf_counter()
+            result = structured.invoke(value, config=config)
+            output = result.model_dump() if hasattr(result, "model_dump") else dict(result)
+            self.recorder.record_structured(output, time.perf_counter() - start)
+            return result
+        return RunnableLambda(parse)
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model replaying a cassette, one recorded session per thread_id.
+
+    Threads are given a session with assign(), or take the next one in
+    round-robin order on their first call. Recorded latency is slept
+    (times latency_scale) before each reply; a session asking for more calls,
+    or a different kind of call, than were recorded raises
+    CassetteMismatchError.
+    """
+
+    model_name: str = "echoforge-replay"
+    sessions: List[List[Dict[str, Any]]] = []
+    latency_scale: float = 1.0
+
+    _cursors: Dict[str, List[int]] = PrivateAttr(default_factory=dict)
+    _next_session: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_file(cls, path: str, latency_scale: float = 1.0) -> 'CassetteChatModel':
+        cassette = load_cassette(path)
+        return cls(model_name=cassette.get("model") or cls.model_fields["model_name"].default,
+                   sessions=[session["events"] for session in cassette["sessions"]],
+                   latency_scale=latency_scale)
+
+    @classmethod
+    def from_config(cls, config) -> 'CassetteChatModel':
+        """Build from EchoForgeConfig cassette_* settings"""
+        if not config.cassette_file:
+            raise ValueError("llm_provider 'replay' needs cassette_file")
+        return cls.from_file(config.cassette_file, config.cassette_latency_scale)
+
+    @property
+    def _llm_type(self) -> str:
+        return "echoforge-replay"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def assign(self, thread_id: str, session: int) -> None:
+        """Replay recorded session number session (modulo the session count) on thread_id"""
+        with self._lock:
+            self._cursors[thread_id] = [session % len(self.sessions), 0]
+
+    def _next_event(self, kind: str) -> Dict[str, Any]:
+        thread_id = current_thread_id() or NO_THREAD
+        with self._lock:
+            if thread_id not in self._cursors:
+                self._cursors[thread_id] = [self._next_session % len(self.sessions), 0]
+                self._next_session += 1
+            cursor = self._cursors[thread_id]
+            events = self.sessions[cursor[0]]
+            while cursor[1] < len(events) and events[cursor[1]]["type"] == "human":
+                cursor[1] += 1
+            if cursor[1] >= len(events):
+                raise CassetteMismatchError(f"Session {cursor[0]} has no {kind} call left for thread {thread_id}")
+            event = events[cursor[1]]
+            if event["type"] != kind:
+                raise CassetteMismatchError(
+                    f"Session {cursor[0]} recorded a {event['type']} call where thread {thread_id} made a {kind} call"
+                )
+            cursor[1] += 1
+        if self.latency_scale > 0 and event.get("latency"):
+            time.sleep(event["latency"] * self.latency_scale)
+        return event
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        message = message_from_dict(self._next_event("model")["message"])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Accept tools the way ChatOpenAI does; the recording decides when to call them"""
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        """Return the recorded parse as the schema"""
+        return RunnableLambda(lambda value: schema(**self._next_event("structured")["output"]))
+
+
+def human_replies(events: List[Dict[str, Any]]) -> List[str]:
+    """Replies the human gave in a recorded session, in order"""
+    return [event["reply"] for event in events if event["type"] == "human"]
@@ -0,0 +1,84 @@
+"""
+EchoForge State Compaction: keep instruction prompts and finished tool chatter out of checkpointed messages
+"""
+from typing import Any, Dict, Iterable, List, Sequence, Set
+from langchain_core.messages import AIMessage, BaseMessage, RemoveMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+
+# Sub-agent tools whose calls and results are only useful while the sub-agent runs
+TRANSIENT_TOOLS = ("search_post_history",)
+
+
+def _role(message: Any) -> str:
+    if isinstance(message, dict):
+        return message.get("role", "")
+    return getattr(message, "type", "")
+
+
+def _content(message: Any) -> str:
+    if isinstance(message, dict):
+        return str(message.get("content", ""))
+    return str(getattr(message, "content", ""))
+
+
+def is_instruction(message: Any, prompts: Iterable[str] = ()) -> bool:
+    """True for system messages, and for assistant messages that repeat a known system prompt.
+
+    The second case covers checkpoints written while system prompts were
+    inserted into the conversation as AI messages.
+    """
+    role = _role(message)
+    if role == "system":
+        return True
+    return role in ("ai", "assistant") and _content(message) in set(prompts)
+
+
+def _without_raw_calls(additional_kwargs: Dict[str, Any], dropped: Set[str]) -> Dict[str, Any]:
+    """additional_kwargs minus the provider's raw copies of dropped calls, which OpenAI clients send as-is"""
+    raw_calls = additional_kwargs.get("tool_calls")
+    if not raw_calls:
+        return additional_kwargs
+    kept = [c for c in raw_calls if c.get("id") not in dropped]
+    if kept:
+        return {**additional_kwargs, "tool_calls": kept}
+    return {k: v for k, v in additional_kwargs.items() if k != "tool_calls"}
+
+
+def compact_messages(messages: Sequence[Any], prompts: Iterable[str] = (),
+                     transient_tools: Iterable[str] = TRANSIENT_TOOLS) -> List[Any]:
+    """Messages worth persisting: instructions dropped, answered calls to transient tools removed.
+
+    A transient tool call is dropped together with its result, and an AI
+    message left with neither content nor other tool calls is dropped too.
+    Unanswered calls stay, since a paused sub-agent still needs them.
+    """
+    prompts = set(prompts)
+    transient_tools = set(transient_tools)
+    answered = {getattr(m, "tool_call_id", None) for m in messages if _role(m) == "tool"}
+    dropped_calls = set()
+
+    compacted = []
+    for message in messages:
+        if is_instruction(message, prompts):
+            continue
+        tool_calls = getattr(message, "tool_calls", None) if isinstance(message, AIMessage) else None
+        if tool_calls:
+            drop = [c for c in tool_calls if c.get("name") in transient_tools and c.get("id") in answered]
+            if drop:
+                dropped_calls.update(c["id"] for c in drop)
+                kept = [c for c in tool_calls if c not in drop]
+                if not kept and not _content(message):
+                    continue
+                message = message.model_copy(update={
+                    "tool_calls": kept, "additional_kwargs": _without_raw_calls(message.additional_kwargs, dropped_calls)
+                })
+        elif _role(message) == "tool" and getattr(message, "tool_call_id", None) in dropped_calls:
+            continue
+        compacted.append(message)
+    return compacted
+
+
+def replace_messages(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """A messages update that replaces the whole list under the add_messages reducer"""
+    return [RemoveMessage(id=REMOVE_ALL_MESSAGES), *messages]
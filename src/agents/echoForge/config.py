@@ -1,9 +1,8 @@
 """
 EchoForge Configuration Management
 """
-from dataclasses import dataclass
-from typing import Dict, Any
-import yaml
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
 import os
 
 
@@ -12,17 +11,117 @@ class EchoForgeConfig:
     """Configuration for EchoForge agent"""
     llm_model: str = "gpt-4"
     llm_temperature: float = 0.7
+    # LLM backend: "openai", "fake" (scripted, offline) or "replay" (a recorded cassette, offline)
+    llm_provider: str = "openai"
+    # Request policy for openai chat calls: llm_timeout bounds each call across all attempts (0 = none),
+    # retryable errors get up to llm_max_retries full-jitter backoffs, and with llm_hedge_percentile > 0
+    # a call slower than that percentile of its node's recent latencies gets a duplicate request
+    llm_timeout: float = 120.0
+    llm_max_retries: int = 2
+    llm_retry_backoff: float = 0.5  # Seconds; the backoff cap doubles per retry
+    llm_hedge_percentile: float = 0.0  # e.g. 0.95; 0 disables hedging
+    llm_hedge_min_samples: int = 20  # Latencies observed per node before hedging starts
+    llm_hedge_max_rate: float = 0.1  # Hedging pauses while hedged calls / calls is at this rate
+    # Per-node model tiers, e.g. {"gather_intent": {"model": "gpt-4o-mini", "temperature": 0.0}};
+    # nodes: gather_intent, collect_post_info, fetch_from_history, structured_parse, echo.
+    # Missing nodes/fields fall back to llm_model and llm_temperature
+    node_models: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     max_conversation_history: int = 10
     confidence_threshold: float = 0.7
     data_dir: str = "data/echoForge"
     logs_dir: str = "logs"
     cache_dir: str = "cache"
+    # Embedding backend: "openai", "hashing" (on-CPU, no network), "sentence_transformers" or "fake"
+    embedding_provider: str = "openai"
+    embedding_model: str = "text-embedding-3-small"
+    embedding_dim: int = 1024  # Only used by the hashing backend
+    embedding_batch_size: int = 256
+    embedding_workers: int = 0  # Local backends only; 0 means one worker per CPU
+    # Reduced index dimensionality; 0 keeps the backend's full size. "native" asks the provider
+    # for shorter vectors (openai text-embedding-3 only), "pca" fits a projection stored with the index
+    embedding_dimensions: int = 0
+    embedding_reduction: str = "native"
+    # Echo prompt example packing: MMR over a wider candidate set, filled to a token budget
+    example_candidates: int = 20
+    example_limit: int = 3
+    example_token_budget: int = 1500
+    example_field_max_tokens: int = 300
+    mmr_lambda: float = 0.7  # 1.0 = pure relevance, 0.0 = pure diversity
+    # Fake provider settings (llm_provider/embedding_provider == "fake")
+    fake_script_file: str = ""  # JSON list of scripted replies; empty uses the built-in script
+    fake_llm_latency: Dict[str, Any] = field(default_factory=dict)  # e.g. {"distribution": "lognormal", "mean": 0.8, "stddev": 0.3}
+    fake_embedding_latency: Dict[str, Any] = field(default_factory=dict)
+    # Session cassettes for load tests (python -m benchmarks.load_test)
+    cassette_record_file: str = ""  # When set, model replies and human answers of every session are recorded here
+    cassette_file: str = ""  # Cassette replayed by llm_provider "replay"
+    cassette_latency_scale: float = 1.0  # Multiplier on recorded model latency during replay; 0 skips the waits
+    # Token/cost accounting: USD per 1M tokens as [prompt, completion], merged over the built-in table
+    model_pricing: Dict[str, List[float]] = field(default_factory=dict)
+    session_token_budget: int = 0  # 0 means unlimited
+    session_cost_budget: float = 0.0  # USD; 0 means unlimited
+    budget_action: str = "abort"  # "abort" the session or "degrade" echo (no examples, fallback model)
+    budget_fallback_model: str = ""  # Model used by degraded echo calls; empty keeps llm_model
+    # Echo latency budget: retrieval gets a share of it, generation moves to a fallback model when it cannot fit
+    echo_latency_budget: float = 0.0  # Seconds per echo call; 0 means unlimited
+    echo_retrieval_share: float = 0.3  # Part of the budget retrieval may use before examples are skipped
+    echo_fallback_model: str = ""  # Model used when generation cannot fit, without a deadline; empty uses budget_fallback_model
+    echo_latency_quantile: float = 0.9  # Recent generation latency percentile compared with the time left
+    echo_latency_max_age: float = 300.0  # Seconds a latency sample counts; 0 keeps the last 200 forever
+    echo_workers: int = 0  # Threads running budgeted retrievals; 0 means 2 x server_max_active_runs, never fewer than that
+    # Span tracing and metrics (no-op when disabled)
+    tracing_enabled: bool = False
+    trace_log_file: str = ""  # JSON-lines span log; empty means <logs_dir>/echoforge_trace.jsonl
+    metrics_file: str = ""  # Text exposition dump; empty means <logs_dir>/echoforge_metrics.prom
+    
+    # Write-behind persistence of finished sessions (human_response/reflections) into memory
+    writeback_enabled: bool = True
+    writeback_batch_size: int = 16
+    writeback_flush_interval: float = 2.0  # Seconds to wait for a batch to fill before writing it
+    
+    # Speculative echo retrieval while the human confirms the collected post fields
+    prefetch_enabled: bool = True
+    prefetch_workers: int = 2
+    
+    # Bulk ingestion of exported posts (python -m src.agents.echoForge.ingest)
+    ingest_batch_size: int = 512  # Posts embedded and appended together
+    ingest_checkpoint_interval: int = 8  # Batches between index saves and checkpoints
+    ingest_workers: int = 0  # Normalization processes; 0 means one per CPU
+    # Near-duplicate collapse at ingest (MinHash over word shingles of title + content)
+    dedupe_enabled: bool = True
+    dedupe_threshold: float = 0.8  # Estimated Jaccard similarity at which posts count as copies
+    dedupe_num_perm: int = 128  # MinHash signature length; longer is more accurate and slower
+    dedupe_shingle_size: int = 3  # Words per shingle
+    
+    # Drop repeated system prompts and finished search-tool chatter from checkpointed messages
+    compact_state: bool = True
+    
+    # Per-user memories for sessions started with a user_id, under <data_dir>/tenants/<user_id>
+    tenant_max_resident: int = 16  # Tenants kept loaded; the least recently used are evicted
+    tenant_memory_budget_mb: float = 1024.0  # Approximate vectors + documents across resident tenants
+    
+    # Shared HTTP connection pool for all OpenAI chat/embedding clients in the process
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 60.0
+    http_write_timeout: float = 30.0
+    http_pool_timeout: float = 10.0  # Seconds to wait for a free connection
+    
+    # Server mode (python -m src.agents.echoForge.server)
+    server_host: str = "127.0.0.1"
+    server_port: int = 8765
+    server_max_sessions: int = 500  # Open connections; further clients are refused
+    server_max_active_runs: int = 32  # Graph runs executing at once; others wait for a slot
+    server_workers: int = 32  # Threads executing graph runs
+    server_queue_timeout: float = 30.0  # Seconds a run may wait for a slot before "busy"
     
     @classmethod
     def from_file(cls, config_path: str) -> 'EchoForgeConfig':
         """Load configuration from YAML file"""
         print(f"[CONFIG] Loading config from {config_path}")
         if os.path.exists(config_path):
+            import yaml
             with open(config_path, 'r') as f:
                 data = yaml.safe_load(f)
             return cls(**data)
@@ -33,6 +132,7 @@ class EchoForgeConfig:
     def save_to_file(self, config_path: str) -> None:
         """Save configuration to YAML file"""
         print(f"[CONFIG] Saving config to {config_path}")
+        import yaml
         os.makedirs(os.path.dirname(config_path), exist_ok=True)
         with open(config_path, 'w') as f:
             yaml.dump(self.__dict__, f, default_flow_style=False)
@@ -0,0 +1,191 @@
+"""
+EchoForge Near-Duplicate Detection: MinHash signatures with LSH banding
+"""
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import hashlib
+import re
+import numpy as np
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Smallest prime above 2**32; with 32-bit shingle hashes and coefficients a*x+b fits in uint64
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def post_text(doc: Dict[str, Any]) -> str:
+    """Text a post is compared on: title and content, not the platform it was posted to"""
+    return f"{doc.get('title', '')} {doc.get('content', '')}"
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """Set of lowercased word size-grams (the whole text if it is shorter)"""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) splitting num_perm whose S-curve midpoint (1/b)^(1/r) is closest below threshold"""
+    best = (num_perm, 1)
+    best_gap = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        if midpoint > threshold:
+            continue
+        gap = threshold - midpoint
+        if best_gap is None or gap < best_gap:
+            best, best_gap = (bands, rows), gap
+    return best
+
+
+def response_quality(doc: Dict[str, Any]) -> Tuple:
+    """Sort key for the copy of a post worth keeping: a response, reviewed, longest, newest"""
+    response = (doc.get("human_response") or "").strip()
+    return (bool(response), bool((doc.get("reflections") or "").strip()), len(response), doc.get("timestamp") or "")
+
+
+# Fields an incoming copy hands to the stored post it beats; the post text, url and timestamp stay
+RESPONSE_FIELDS = ("human_response", "reflections")
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of posts, bucketed by LSH bands for sub-linear candidate lookup.
+
+    Candidates sharing a band are confirmed by their estimated Jaccard
+    similarity, so only pairs at or above threshold are reported.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=(num_perm, 1), dtype=np.uint64)
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [{} for _ in range(self.bands)]
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of text, or None if it has no words"""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+            dtype=np.uint64, count=len(grams)
+        )
+        permuted = ((self._a * hashes[np.newaxis, :] + self._b) % _PRIME) & _MAX_HASH
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key: Hashable, signature: Optional[np.ndarray]) -> None:
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket.setdefault(band_key, []).append(key)
+
+    def query(self, signature: Optional[np.ndarray]) -> List[Tuple[Hashable, float]]:
+        """(key, estimated Jaccard) of indexed posts at or above threshold, most similar first"""
+        if signature is None:
+            return []
+        candidates = set()
+        for bucket, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(band_key, ()))
+        matches = []
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def empty_copy(self) -> 'NearDuplicateIndex':
+        """A new index with the same parameters (and so comparable signatures)"""
+        copy = NearDuplicateIndex.__new__(NearDuplicateIndex)
+        copy.__dict__.update(self.__dict__)
+        copy._buckets = [{} for _ in range(self.bands)]
+        copy._signatures = {}
+        return copy
+
+
+def collapse_near_duplicates(records: List[Dict[str, Any]], existing: NearDuplicateIndex,
+                             stored: Optional[Sequence[Dict[str, Any]]] = None
+                             ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Drop records that near-duplicate an indexed post or each other.
+
+    Clusters of near-duplicates within records are collapsed to the copy with
+    the best human_response (response_quality). Records matching a post
+    already in existing are never kept as new posts; when stored (the posts
+    existing is keyed by) is given and the best such copy beats the stored
+    post, report["replacements"] maps the stored key to it so its
+    RESPONSE_FIELDS can be taken over. Returns the kept records in input
+    order and a report of what was removed.
+    """
+    report = {"input": len(records), "kept": 0, "removed": 0, "removed_existing": 0,
+              "clusters": 0, "removed_chars": 0, "removed_fraction": 0.0, "replaced": 0, "replacements": {}}
+    if not records:
+        return [], report
+
+    signatures = [existing.signature(post_text(record)) for record in records]
+    local = existing.empty_copy()
+    parent = list(range(len(records)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    duplicates_existing = set()
+    best_copies: Dict[Hashable, int] = {}
+    for i, signature in enumerate(signatures):
+        matches = existing.query(signature)
+        if matches:
+            duplicates_existing.add(i)
+            key = matches[0][0]
+            if key not in best_copies or response_quality(records[i]) > response_quality(records[best_copies[key]]):
+                best_copies[key] = i
+            continue
+        for j, _ in local.query(signature):
+            parent[find(i)] = find(j)
+        local.add(i, signature)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(records)):
+        if i not in duplicates_existing:
+            clusters.setdefault(find(i), []).append(i)
+    keep = {max(members, key=lambda i: (response_quality(records[i]), -i)) for members in clusters.values()}
+
+    replacements = {}
+    for key, i in best_copies.items() if stored is not None else ():
+        current = stored[key]
+        better = response_quality(records[i]) > response_quality(current)
+        if better and any(records[i].get(field) != current.get(field) for field in RESPONSE_FIELDS):
+            replacements[key] = records[i]
+
+    kept = [record for i, record in enumerate(records) if i in keep]
+    removed = [record for i, record in enumerate(records) if i not in keep]
+    report.update(
+        kept=len(kept),
+        removed=len(removed),
+        removed_existing=len(duplicates_existing),
+        clusters=sum(1 for members in clusters.values() if len(members) > 1),
+        removed_chars=sum(len(post_text(record)) + len(record.get("human_response") or "") for record in removed),
+        removed_fraction=len(removed) / len(records),
+        replaced=len(replacements),
+        replacements=replacements
+    )
+    return kept, report
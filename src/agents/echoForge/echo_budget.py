@@ -0,0 +1,122 @@
+"""
+EchoForge Echo Latency Budget: split an echo call's time across retrieval and generation, degrading to fit
+"""
+from typing import Any, Callable, Deque, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import contextvars
+import threading
+import time
+from src.utils.tracing import percentile
+
+
+# Degradation levels an echo call can report, mildest first
+FULL = "full"                      # examples retrieved, primary model
+NO_EXAMPLES = "no_examples"        # retrieval skipped, missed its slice or failed
+FALLBACK_MODEL = "fallback_model"  # generated by the fallback model
+DEGRADATION_LEVELS = (FULL, NO_EXAMPLES, FALLBACK_MODEL)
+
+
+def worst_level(*levels: str) -> str:
+    """The most degraded of levels"""
+    return max(levels, key=DEGRADATION_LEVELS.index)
+
+
+class EchoDeadline:
+    """Latency budget of one echo call.
+
+    budget seconds (0 = unlimited) start counting on creation; retrieval gets
+    retrieval_share of them and generation whatever is left.
+    """
+
+    def __init__(self, budget: float = 0.0, retrieval_share: float = 0.3):
+        self.budget = budget
+        self.retrieval_share = min(1.0, max(0.0, retrieval_share))
+        self.started = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None without a budget"""
+        if not self.enabled:
+            return None
+        return max(0.0, self.budget - self.elapsed())
+
+    def retrieval_timeout(self) -> Optional[float]:
+        """Seconds retrieval may take, or None without a budget"""
+        if not self.enabled:
+            return None
+        return max(0.0, self.budget * self.retrieval_share - self.elapsed())
+
+
+class LatencyWindow:
+    """Recent latencies of one call, giving an estimate once min_samples were seen.
+
+    Samples older than max_age seconds (0 = never) expire, so a model that
+    stopped being used because it was slow gets tried again later instead of
+    being judged by its old latency forever.
+    """
+
+    def __init__(self, quantile: float = 0.9, min_samples: int = 5, window: int = 200, max_age: float = 0.0):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        with self._lock:
+            self._samples.append((time.monotonic(), latency))
+
+    def estimate(self) -> Optional[float]:
+        """quantile of the recent latencies, or None before min_samples"""
+        with self._lock:
+            if self.max_age > 0:
+                oldest = time.monotonic() - self.max_age
+                while self._samples and self._samples[0][0] < oldest:
+                    self._samples.popleft()
+            if len(self._samples) < self.min_samples:
+                return None
+            return percentile(sorted(latency for _, latency in self._samples), self.quantile)
+
+
+class DeadlineRunner:
+    """Runs calls on a small pool and stops waiting for them at a timeout.
+
+    A call that misses its timeout is abandoned, not interrupted: it finishes
+    in the background and its result is dropped.
+    """
+
+    def __init__(self, workers: int = 4):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable[[], Any], timeout: Optional[float]) -> Tuple[bool, Any]:
+        """(True, result) if fn finished within timeout, else (False, None); fn's errors propagate"""
+        if timeout is None:
+            return True, fn()
+        if timeout <= 0:
+            return False, None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="echoforge-echo")
+            executor = self._executor
+        # Keep the caller's thread_id/node so tenant lookup and usage attribution still work
+        future = executor.submit(contextvars.copy_context().run, fn)
+        try:
+            return True, future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return False, None
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,207 @@
+"""
+EchoForge Embedding Backends
+"""
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import os
+import re
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _hash_token(token: str, dim: int) -> Tuple[int, float]:
+    """Map a token to a (bucket, sign) pair with a process-independent hash"""
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, (1.0 if (value >> 63) & 1 else -1.0)
+
+
+def _hash_encode_batch(texts: List[str], dim: int) -> np.ndarray:
+    """Encode a batch of texts into L2-normalized hashed unigram+bigram vectors.
+
+    Lives at module level so it can be shipped to worker processes.
+    """
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    buckets: Dict[str, Tuple[int, float]] = {}
+    for row, text in enumerate(texts):
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            if feature not in buckets:
+                buckets[feature] = _hash_token(feature, dim)
+            bucket, sign = buckets[feature]
+            vectors[row, bucket] += sign
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbeddings(Embeddings):
+    """On-CPU embedder using signed feature hashing of word unigrams and bigrams.
+
+    No model download and no network access. Large inputs are split into
+    batches and encoded across a process pool.
+    """
+
+    def __init__(self, dim: int = 1024, batch_size: int = 256, workers: int = 0):
+        self.dim = dim
+        self.batch_size = max(1, batch_size)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def backend_id(self) -> str:
+        """Identifier recorded alongside every index built with this backend"""
+        return f"hashing:dim={self.dim}"
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a process that already runs FAISS, HTTP pool and executor threads can deadlock a child
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        return self._pool
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, fanning batches out to worker processes when worthwhile"""
+        if not texts:
+            return []
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if self.workers > 1 and len(batches) > 1:
+            results = list(self._get_pool().map(_hash_encode_batch, batches, [self.dim] * len(batches)))
+        else:
+            results = [_hash_encode_batch(batch, self.dim) for batch in batches]
+        return np.vstack(results).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query in-process"""
+        return _hash_encode_batch([text], self.dim)[0].tolist()
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Small local transformer embedder (requires the optional sentence-transformers package)"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 256, workers: int = 0):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "embedding_provider 'sentence_transformers' requires the sentence-transformers package"
+            ) from e
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self._pool = None
+
+    @property
+    def backend_id(self) -> str:
+        """Identifier recorded alongside every index built with this backend"""
+        return f"sentence_transformers:{self.model_name}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, using a multi-process pool for large inputs"""
+        if not texts:
+            return []
+        if self.workers > 1 and len(texts) > self.batch_size:
+            if self._pool is None:
+                self._pool = self.model.start_multi_process_pool(["cpu"] * self.workers)
+            vectors = self.model.encode_multi_process(
+                texts, self._pool, batch_size=self.batch_size, normalize_embeddings=True
+            )
+        else:
+            vectors = self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query in-process"""
+        return np.asarray(self.model.encode([text], normalize_embeddings=True)[0], dtype=np.float32).tolist()
+
+    def close(self) -> None:
+        """Stop the multi-process pool, if one was started"""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+
+def fit_projection(vectors: np.ndarray, dim: int) -> np.ndarray:
+    """(dim, d) top right-singular vectors of the uncentered vectors; rows past their rank are zero"""
+    _, _, vt = np.linalg.svd(np.asarray(vectors, dtype=np.float32), full_matrices=False)
+    components = np.zeros((dim, vt.shape[1]), dtype=np.float32)
+    rank = min(dim, vt.shape[0])
+    components[:rank] = vt[:rank]
+    return components
+
+
+class ProjectedEmbeddings(Embeddings):
+    """Wraps an embedder with a linear projection to fewer dimensions, fitted on the corpus.
+
+    The projection is a truncated SVD of the document vectors without
+    centering, so inner products and cosine similarities are approximately
+    preserved and confidence_threshold keeps its meaning. Documents and
+    queries both go through the same projection.
+    """
+
+    def __init__(self, base: Embeddings, dim: int):
+        self.base = base
+        self.dim = dim
+        self.components: Optional[np.ndarray] = None  # (dim, base dim)
+
+    @property
+    def backend_id(self) -> str:
+        """Identifier recorded alongside every index built with this backend"""
+        base_id = getattr(self.base, "backend_id", type(self.base).__name__)
+        return f"{base_id}|pca={self.dim}"
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None
+
+    def fit_documents(self, texts: List[str]) -> List[List[float]]:
+        """Fit the projection on the texts' full vectors and return them projected"""
+        vectors = np.asarray(self.base.embed_documents(texts), dtype=np.float32)
+        if len(vectors) < self.dim:
+            print(f"[EMBEDDINGS] Fitting a {self.dim}-dim projection on {len(vectors)} documents; "
+                  f"dimensions beyond {len(vectors)} stay zero until the index is rebuilt")
+        self.components = fit_projection(vectors, self.dim)
+        return self._project(vectors).tolist()
+
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        if self.components is None:
+            raise RuntimeError("Projection is not fitted; build the index with fit_documents first")
+        return vectors @ self.components.T
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._project(np.asarray(self.base.embed_documents(texts), dtype=np.float32)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._project(np.asarray(self.base.embed_query(text), dtype=np.float32)).tolist()
+
+    def save(self, path: str) -> None:
+        np.save(path, self.components)
+
+    def load(self, path: str) -> bool:
+        """Load a saved projection; False if it is missing or has the wrong shape"""
+        if not os.path.exists(path):
+            return False
+        components = np.load(path)
+        if components.ndim != 2 or components.shape[0] != self.dim:
+            return False
+        self.components = components.astype(np.float32)
+        return True
+
+    def close(self) -> None:
+        if hasattr(self.base, "close"):
+            self.base.close()
@@ -0,0 +1,233 @@
+"""
+EchoForge Fake Providers for offline runs
+"""
+from typing import Any, Dict, List, Optional, Sequence
+import json
+import math
+import random
+import threading
+import time
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+from .embeddings import HashingEmbeddings
+from .packing import estimate_tokens
+from src.utils.tracing import current_thread_id
+
+
+# Cursor of calls made outside a graph run (no thread_id bound)
+NO_THREAD = "no_thread"
+
+# One full traversal: gather_intent -> collect_post_info -> echo
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {"tool": "ask_human", "args": {"question": "What would you like to work on today?"}},
+    {"content": "The user wants to provide new post information. OPTION_1"},
+    {"tool": "ask_human", "args": {"question": "Please share the context, title and content of the post."}},
+    {"tool": "ask_human", "args": {"question": "Let me confirm the information I collected:\ncontext: LinkedIn\ntitle: Discussion about AI Ethics\ncontent: What are your thoughts on AI in healthcare?"}},
+    {"collected_info": {"context": "LinkedIn", "title": "Discussion about AI Ethics", "content": "What are your thoughts on AI in healthcare?"}},
+    {"content": "AI in healthcare is promising, but only with transparency and a human in the loop."}
+]
+
+
+class LatencyModel:
+    """Configurable latency distribution (in seconds) for fake providers"""
+
+    DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+    def __init__(self, distribution: str = "constant", mean: float = 0.0, stddev: float = 0.0,
+                 low: float = 0.0, high: float = 0.0, seed: Optional[int] = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean = mean
+        self.stddev = stddev
+        self.low = low
+        self.high = high
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, spec: Optional[Dict[str, Any]]) -> 'LatencyModel':
+        """Build from a config mapping such as {"distribution": "lognormal", "mean": 0.8, "stddev": 0.3}"""
+        return cls(**(spec or {}))
+
+    def sample(self) -> float:
+        """Draw one latency value, never negative"""
+        with self._lock:
+            if self.distribution == "constant":
+                value = self.mean
+            elif self.distribution == "uniform":
+                value = self._rng.uniform(self.low, self.high)
+            elif self.distribution == "normal":
+                value = self._rng.gauss(self.mean, self.stddev)
+            else:
+                # Parameterized by the mean/stddev of the latency itself, not of its log
+                if self.mean <= 0:
+                    value = 0.0
+                else:
+                    sigma2 = math.log(1 + (self.stddev / self.mean) ** 2)
+                    mu = math.log(self.mean) - sigma2 / 2
+                    value = self._rng.lognormvariate(mu, math.sqrt(sigma2))
+        return max(0.0, value)
+
+    def wait(self) -> float:
+        """Sleep for one sampled latency and return it"""
+        delay = self.sample()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def _message_text(value: Any) -> str:
+    """Flatten a prompt value (string, message or message list) into text"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, BaseMessage):
+        return str(value.content)
+    if isinstance(value, Sequence):
+        return "\n".join(_message_text(item) for item in value)
+    return str(value)
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model that replays a script of replies.
+
+    Each script entry is one of:
+        {"content": "..."}                              plain assistant reply
+        {"tool": "ask_human", "args": {...}}            a tool call
+        {"collected_info": {"context": ..., ...}}       a COLLECTED_INFO payload
+
+    Every thread_id follows the script from its own cursor, so concurrent
+    sessions do not consume each other's replies; calls made outside a
+    graph run share one cursor.
+    """
+
+    model_name: str = "echoforge-fake"
+    script: List[Dict[str, Any]] = DEFAULT_SCRIPT
+    cycle: bool = True
+    latency: Any = None
+
+    _positions: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _calls: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def from_config(cls, config) -> 'FakeChatModel':
+        """Build from EchoForgeConfig fake_* settings"""
+        script = DEFAULT_SCRIPT
+        if config.fake_script_file:
+            with open(config.fake_script_file, 'r') as f:
+                script = json.load(f)
+        return cls(script=script, latency=LatencyModel.from_config(config.fake_llm_latency))
+
+    @property
+    def _llm_type(self) -> str:
+        return "echoforge-fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _next_entry(self) -> Dict[str, Any]:
+        thread_id = current_thread_id() or NO_THREAD
+        with self._lock:
+            position = self._positions.get(thread_id, 0)
+            if position >= len(self.script):
+                if not self.cycle:
+                    return {"content": "No scripted reply left. OPTION_3 exit"}
+                position = 0
+            self._positions[thread_id] = position + 1
+            return self.script[position]
+
+    def _next_call_id(self) -> str:
+        """Tool call id unique across all threads using this model"""
+        with self._lock:
+            self._calls += 1
+            return f"call_{self._calls}"
+
+    def reset(self, thread_id: Optional[str] = None) -> None:
+        """Rewind the script to its first entry, for thread_id or for every thread"""
+        with self._lock:
+            if thread_id is None:
+                self._positions.clear()
+            else:
+                self._positions.pop(thread_id, None)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        if self.latency is not None:
+            self.latency.wait()
+
+        entry = self._next_entry()
+        if "tool" in entry:
+            call_id = self._next_call_id()
+            message = AIMessage(content="", tool_calls=[
+                {"name": entry["tool"], "args": entry.get("args", {}), "id": call_id}
+            ])
+        elif "collected_info" in entry:
+            message = AIMessage(content="COLLECTED_INFO: " + json.dumps(entry["collected_info"]))
+        else:
+            message = AIMessage(content=entry.get("content", ""))
+
+        input_tokens = estimate_tokens(_message_text(messages))
+        output_tokens = estimate_tokens(_message_text(message) + json.dumps(entry.get("args", {})))
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Accept tools the way ChatOpenAI does; the script decides when to call them"""
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        """Parse the JSON object following COLLECTED_INFO: into the schema"""
+        def parse(value: Any):
+            if self.latency is not None:
+                self.latency.wait()
+            text = _message_text(value)
+            start = text.find("{", text.find("COLLECTED_INFO:"))
+            end = text.rfind("}")
+            data = json.loads(text[start:end + 1]) if start != -1 and end > start else {}
+            return schema(**data)
+        return RunnableLambda(parse)
+
+
+class FakeEmbeddings(HashingEmbeddings):
+    """Hashing embedder with a configurable per-call latency"""
+
+    def __init__(self, dim: int = 1024, batch_size: int = 256, workers: int = 1,
+                 latency: Optional[LatencyModel] = None):
+        super().__init__(dim=dim, batch_size=batch_size, workers=workers)
+        self.latency = latency
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency is not None:
+            self.latency.wait()
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.latency is not None:
+            self.latency.wait()
+        return super().embed_query(text)
+
+
+class ScriptedHuman:
+    """Replays human replies for ask_human in offline runs"""
+
+    def __init__(self, replies: List[str], default: str = "exit"):
+        self.replies = list(replies)
+        self.default = default
+        self._position = 0
+
+    def __call__(self, prompt: str = "") -> str:
+        if self._position >= len(self.replies):
+            return self.default
+        reply = self.replies[self._position]
+        self._position += 1
+        return reply
@@ -0,0 +1,152 @@
+"""
+EchoForge Post History Index: secondary indexes over the echoForge document archive
+"""
+from typing import Any, Dict, List, Optional
+from bisect import bisect_left, bisect_right
+import json
+import os
+import re
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def title_tokens(title: str) -> List[str]:
+    """Lowercased word tokens of a title"""
+    return _TOKEN_PATTERN.findall(title.lower())
+
+
+class PostHistoryIndex:
+    """Secondary indexes over the document archive, keyed by document position.
+
+    - hash index on url                      O(1) lookup
+    - sorted index on timestamp              O(log n + page) range/paginated listing
+    - token index on title, with a sorted    O(log V + matches) token and prefix search
+      vocabulary for prefix lookups
+    """
+
+    def __init__(self):
+        self.fingerprint = ""
+        self.url_index: Dict[str, int] = {}
+        self.timestamps: List[str] = []
+        self.time_ids: List[int] = []
+        self.title_postings: Dict[str, List[int]] = {}
+        self.vocabulary: List[str] = []
+
+    @classmethod
+    def build(cls, documents: List[Dict[str, Any]], fingerprint: str = "") -> 'PostHistoryIndex':
+        """Build all indexes from the document list"""
+        index = cls()
+        index.fingerprint = fingerprint
+        for doc_id, doc in enumerate(documents):
+            index._index_document(doc_id, doc, keep_sorted=False)
+        order = sorted(range(len(index.timestamps)), key=lambda i: (index.timestamps[i], index.time_ids[i]))
+        index.timestamps = [index.timestamps[i] for i in order]
+        index.time_ids = [index.time_ids[i] for i in order]
+        index.vocabulary = sorted(index.title_postings)
+        return index
+
+    def add(self, doc_id: int, doc: Dict[str, Any]) -> None:
+        """Index one appended document, keeping every index sorted"""
+        self._index_document(doc_id, doc, keep_sorted=True)
+
+    def _index_document(self, doc_id: int, doc: Dict[str, Any], keep_sorted: bool) -> None:
+        url = doc.get("url", "")
+        if url:
+            self.url_index[url] = doc_id
+
+        timestamp = doc.get("timestamp", "") or ""
+        if keep_sorted:
+            position = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(position, timestamp)
+            self.time_ids.insert(position, doc_id)
+        else:
+            self.timestamps.append(timestamp)
+            self.time_ids.append(doc_id)
+
+        for token in set(title_tokens(doc.get("title", ""))):
+            postings = self.title_postings.get(token)
+            if postings is None:
+                self.title_postings[token] = [doc_id]
+                if keep_sorted:
+                    self.vocabulary.insert(bisect_left(self.vocabulary, token), token)
+            else:
+                postings.append(doc_id)
+
+    def __len__(self) -> int:
+        return len(self.time_ids)
+
+    def get_by_url(self, url: str) -> Optional[int]:
+        """Document id for a url, or None"""
+        return self.url_index.get(url)
+
+    def list_by_time(self, start: Optional[str] = None, end: Optional[str] = None, offset: int = 0,
+                     limit: int = 20, newest_first: bool = True) -> List[int]:
+        """One page of document ids with start <= timestamp < end, in time order"""
+        lo = bisect_left(self.timestamps, start) if start else 0
+        hi = bisect_left(self.timestamps, end) if end else len(self.timestamps)
+        if hi <= lo:
+            return []
+        if newest_first:
+            page_hi = max(lo, hi - offset)
+            page_lo = max(lo, page_hi - limit)
+            return self.time_ids[page_lo:page_hi][::-1]
+        page_lo = min(hi, lo + offset)
+        return self.time_ids[page_lo:min(hi, page_lo + limit)]
+
+    def _prefix_postings(self, prefix: str) -> List[int]:
+        """Union of postings for every vocabulary token starting with prefix"""
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + "\uffff")
+        ids = set()
+        for token in self.vocabulary[lo:hi]:
+            ids.update(self.title_postings[token])
+        return sorted(ids)
+
+    def search_title(self, query: str, offset: int = 0, limit: int = 20) -> List[int]:
+        """Document ids whose title contains every query token (the last one as a prefix)"""
+        tokens = title_tokens(query)
+        if not tokens:
+            return []
+        postings = [self.title_postings.get(token, []) for token in tokens[:-1]]
+        postings.append(self._prefix_postings(tokens[-1]))
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for other in postings[1:]:
+            if not matches:
+                break
+            matches.intersection_update(other)
+        # Most recently archived documents first
+        return sorted(matches, reverse=True)[offset:offset + limit]
+
+    def save(self, path: str) -> None:
+        """Persist the indexes next to the documents"""
+        data = {
+            "fingerprint": self.fingerprint,
+            "url_index": self.url_index,
+            "timestamps": self.timestamps,
+            "time_ids": self.time_ids,
+            "title_postings": self.title_postings
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional['PostHistoryIndex']:
+        """Load persisted indexes if they were built from the same documents"""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get("fingerprint") != fingerprint:
+            return None
+        index = cls()
+        index.fingerprint = fingerprint
+        index.url_index = data["url_index"]
+        index.timestamps = data["timestamps"]
+        index.time_ids = data["time_ids"]
+        index.title_postings = data["title_postings"]
+        index.vocabulary = sorted(index.title_postings)
+        return index
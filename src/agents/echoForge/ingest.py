@@ -0,0 +1,333 @@
+"""
+EchoForge Bulk Ingestion
+
+Loads exported posts (CSV or JSON lines) into EchoForge memory: rows are
+normalized to echoForge documents in a process pool, exact and near-duplicate
+posts (dedupe.py) are dropped, and each batch is embedded and appended to the
+documents file and the in-memory FAISS and history indexes. The indexes are
+saved and progress is checkpointed every checkpoint_interval batches, at the
+end of each file and when a run fails, so an interrupted run resumes after the
+last saved batch. A hard kill between saves leaves posts in the documents file
+that the saved index lacks; the next load embeds only those posts, and the
+rerun skips their rows as duplicates.
+
+Usage:
+    python -m src.agents.echoForge.ingest exports/linkedin.csv --context LinkedIn
+    python -m src.agents.echoForge.ingest exports/*.jsonl --config config/echoforge.yaml --workers 4
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice, repeat
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from .config import EchoForgeConfig
+from .memory import EchoForgeMemory
+
+
+# Export column names accepted for each echoForge document field, matched case-insensitively
+FIELD_ALIASES = {
+    "url": ("url", "link", "permalink", "post_url"),
+    "context": ("context", "platform", "source", "channel", "community", "subreddit"),
+    "title": ("title", "subject", "headline"),
+    "content": ("content", "text", "body", "post", "message", "selftext"),
+    "human_response": ("human_response", "response", "reply", "my_reply", "comment", "answer"),
+    "reflections": ("reflections", "reflection", "notes"),
+    "timestamp": ("timestamp", "created_at", "created_utc", "date", "time")
+}
+TITLE_FROM_CONTENT_CHARS = 80
+# Numeric timestamps at or above this many seconds (1973-03-03) are read as epoch times, so a
+# bare year like "2023" is not; values past EPOCH_MILLIS_MIN are epoch milliseconds
+EPOCH_SECONDS_MIN = 100_000_000
+EPOCH_MILLIS_MIN = 100_000_000_000
+
+
+def _pick(row: Dict[str, Any], names: Tuple[str, ...]) -> str:
+    for name in names:
+        value = row.get(name)
+        if value is not None and str(value).strip():
+            return str(value)
+    return ""
+
+
+def _normalize_text(text: str) -> str:
+    """Unify newlines and strip trailing whitespace from every line"""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def _normalize_timestamp(value: str) -> str:
+    """ISO-8601 timestamp (naive UTC for epoch times), or the value unchanged if unparseable"""
+    value = value.strip()
+    if not value:
+        return ""
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = None
+    if seconds is not None and seconds >= EPOCH_SECONDS_MIN:
+        if seconds >= EPOCH_MILLIS_MIN:
+            seconds /= 1000
+        try:
+            return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat()
+        except (OverflowError, OSError, ValueError):
+            return value
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        return value
+
+
+def normalize_record(row: Dict[str, Any], defaults: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+    """Map one exported row onto an echoForge document, or None if it has no content or response.
+
+    defaults fills fields the export does not carry (e.g. the context of a
+    single-platform export). Rows without a url get a stable content-derived
+    one so re-imports are recognised as duplicates.
+    """
+    row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+    defaults = defaults or {}
+    record = {name: _pick(row, aliases) or defaults.get(name, "") for name, aliases in FIELD_ALIASES.items()}
+
+    for name in ("content", "human_response", "reflections"):
+        record[name] = _normalize_text(record[name])
+    for name in ("context", "title", "url"):
+        record[name] = " ".join(record[name].split())
+    record["timestamp"] = _normalize_timestamp(record["timestamp"])
+
+    if not record["content"] or not record["human_response"]:
+        return None
+    if not record["title"]:
+        record["title"] = record["content"].split("\n", 1)[0][:TITLE_FROM_CONTENT_CHARS]
+    if not record["url"]:
+        key = "\x1f".join(record[name] for name in ("context", "title", "content", "human_response"))
+        record["url"] = f"echoforge://import/{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+    return record
+
+
+def normalize_chunk(rows: List[Optional[Dict[str, Any]]], defaults: Dict[str, str]) -> List[Optional[Dict[str, str]]]:
+    """normalize_record over a chunk; module level so it can be shipped to worker processes"""
+    return [None if row is None else normalize_record(row, defaults) for row in rows]
+
+
+def read_rows(path: str) -> Iterator[Optional[Dict[str, Any]]]:
+    """Rows of a .csv or .jsonl/.ndjson export; None stands in for an unreadable JSON line"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            yield from csv.DictReader(f)
+    elif extension in (".jsonl", ".ndjson"):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield row if isinstance(row, dict) else None
+    else:
+        raise ValueError(f"Unsupported export format: {path} (expected .csv, .jsonl or .ndjson)")
+
+
+def _file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class IngestCheckpoint:
+    """Rows already ingested per input file, persisted after every batch.
+
+    An entry is only trusted while the file's size and mtime are unchanged;
+    otherwise the file is read from the start and duplicate detection skips
+    what is already in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def rows_done(self, source: str) -> int:
+        entry = self.entries.get(os.path.abspath(source))
+        if entry is None or entry.get("fingerprint") != _file_fingerprint(source):
+            return 0
+        return entry.get("rows_done", 0)
+
+    def update(self, source: str, rows_done: int, complete: bool = False) -> None:
+        self.entries[os.path.abspath(source)] = {
+            "fingerprint": _file_fingerprint(source),
+            "rows_done": rows_done,
+            "complete": complete,
+            "updated_at": datetime.now().isoformat()
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def reset(self, source: str) -> None:
+        self.entries.pop(os.path.abspath(source), None)
+
+
+class EchoForgeIngestor:
+    """Normalizes, deduplicates and appends exported posts to EchoForgeMemory in batches"""
+
+    def __init__(self, memory: EchoForgeMemory, batch_size: int = 512, workers: int = 0,
+                 checkpoint_file: Optional[str] = None, dedupe: Optional[bool] = None,
+                 checkpoint_interval: Optional[int] = None):
+        self.memory = memory
+        self.dedupe = memory.config.dedupe_enabled if dedupe is None else dedupe
+        self.batch_size = max(1, batch_size)
+        self.checkpoint_interval = max(1, checkpoint_interval or memory.config.ingest_checkpoint_interval)
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.checkpoint = IngestCheckpoint(
+            checkpoint_file or os.path.join(os.path.dirname(memory.echoForge_documents_file), "ingest_checkpoint.json")
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _normalize_chunks(self, chunks: List[List[Optional[Dict[str, Any]]]],
+                          defaults: Dict[str, str]) -> List[List[Optional[Dict[str, str]]]]:
+        if self.workers > 1 and len(chunks) > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return list(self._pool.map(normalize_chunk, chunks, repeat(defaults)))
+        return [normalize_chunk(chunk, defaults) for chunk in chunks]
+
+    def ingest_file(self, path: str, context: str = "", resume: bool = True) -> Dict[str, Any]:
+        """Ingest one export file; returns row/document counts and throughput"""
+        if not resume:
+            self.checkpoint.reset(path)
+        skip = self.checkpoint.rows_done(path)
+        if skip:
+            print(f"[INGEST] Resuming {path} after {skip} rows")
+
+        defaults = {"context": context} if context else {}
+        stats = {"source": path, "rows": 0, "resumed_rows": skip, "added": 0, "duplicates": 0,
+                 "near_duplicates": 0, "near_duplicate_chars": 0, "replaced": 0, "invalid": 0}
+        seen = set()
+        rows = islice(read_rows(path), skip, None)
+        rows_done = skip
+        unsaved = 0
+        start = time.perf_counter()
+
+        try:
+            while True:
+                # One window is one batch per worker, normalized in parallel and appended batch by batch
+                window = list(islice(rows, self.batch_size * self.workers))
+                if not window:
+                    break
+                chunks = [window[i:i + self.batch_size] for i in range(0, len(window), self.batch_size)]
+                for chunk, normalized in zip(chunks, self._normalize_chunks(chunks, defaults)):
+                    batch = []
+                    for record in normalized:
+                        if record is None:
+                            stats["invalid"] += 1
+                        elif record["url"] in seen or self.memory.history_index.get_by_url(record["url"]) is not None:
+                            stats["duplicates"] += 1
+                        else:
+                            seen.add(record["url"])
+                            batch.append(record)
+                    if self.dedupe:
+                        # Collapsed before append so the dropped copies are never embedded
+                        batch, report = self.memory.collapse_near_duplicates(batch)
+                        stats["near_duplicates"] += report["removed"]
+                        stats["near_duplicate_chars"] += report["removed_chars"]
+                        stats["replaced"] += report["replaced"]
+                    # Indexes are only extended in memory here and saved once per checkpoint interval
+                    self.memory.extend_documents(batch)
+                    stats["rows"] += len(chunk)
+                    stats["added"] += len(batch)
+                    rows_done += len(chunk)
+                    unsaved += 1
+                    if unsaved >= self.checkpoint_interval:
+                        self._save(path, rows_done)
+                        unsaved = 0
+                    self._report(stats, time.perf_counter() - start)
+        finally:
+            # Batches appended since the last save, also before a failure, are saved so a rerun resumes after them
+            if unsaved:
+                self._save(path, rows_done)
+
+        self.checkpoint.update(path, rows_done, complete=True)
+        stats["seconds"] = time.perf_counter() - start
+        stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        stats["documents_per_second"] = stats["added"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    def _save(self, path: str, rows_done: int) -> None:
+        """Save the indexes once for all batches since the last save, then checkpoint"""
+        self.memory.save_indexes()
+        self.checkpoint.update(path, rows_done)
+
+    @staticmethod
+    def _report(stats: Dict[str, Any], elapsed: float) -> None:
+        rate = stats["rows"] / elapsed if elapsed > 0 else 0.0
+        doc_rate = stats["added"] / elapsed if elapsed > 0 else 0.0
+        print(f"[INGEST] {stats['source']}: {stats['rows']} rows, {stats['added']} added, "
+              f"{stats['duplicates']} duplicates, {stats['near_duplicates']} near-duplicates, "
+              f"{stats['invalid']} invalid | "
+              f"{rate:.0f} rows/s, {doc_rate:.0f} docs/s")
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest exported posts into EchoForge memory")
+    parser.add_argument("paths", nargs="+", help="CSV or JSON-lines export files")
+    parser.add_argument("--config", default="config/echoforge.yaml")
+    parser.add_argument("--context", default="", help="Context for rows that carry none (e.g. LinkedIn)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Posts embedded and appended together")
+    parser.add_argument("--checkpoint-interval", type=int, default=None,
+                        help="Batches between index saves and checkpoints")
+    parser.add_argument("--workers", type=int, default=None, help="Normalization processes; 0 means one per CPU")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore checkpoints and read files from the start")
+    parser.add_argument("--no-dedupe", action="store_true", help="Keep near-duplicate posts")
+    parser.add_argument("--dedupe-threshold", type=float, default=None,
+                        help="Estimated Jaccard similarity at which posts count as copies")
+    args = parser.parse_args(argv)
+
+    config = EchoForgeConfig.from_file(args.config)
+    if args.dedupe_threshold is not None:
+        config.dedupe_threshold = args.dedupe_threshold
+    memory = EchoForgeMemory(config.data_dir, config, load_index=False)
+    ingestor = EchoForgeIngestor(
+        memory,
+        batch_size=args.batch_size or config.ingest_batch_size,
+        workers=config.ingest_workers if args.workers is None else args.workers,
+        dedupe=False if args.no_dedupe else None,
+        checkpoint_interval=args.checkpoint_interval
+    )
+
+    totals = {"rows": 0, "added": 0, "duplicates": 0, "near_duplicates": 0, "near_duplicate_chars": 0, "invalid": 0}
+    start = time.perf_counter()
+    try:
+        for path in args.paths:
+            stats = ingestor.ingest_file(path, context=args.context, resume=not args.no_resume)
+            for key in totals:
+                totals[key] += stats[key]
+    finally:
+        ingestor.close()
+    elapsed = time.perf_counter() - start
+    print(f"[INGEST] Done: {totals['rows']} rows, {totals['added']} added, {totals['duplicates']} duplicates, "
+          f"{totals['invalid']} invalid in {elapsed:.1f}s; memory now holds {len(memory.documents)} posts")
+    if totals["near_duplicates"]:
+        removed = totals["near_duplicates"] / max(1, totals["added"] + totals["near_duplicates"])
+        print(f"[INGEST] Near-duplicates collapsed: {totals['near_duplicates']} posts ({removed:.1%} of unique rows, "
+              f"{totals['near_duplicate_chars']} characters not embedded)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,40 +1,98 @@
 """
 EchoForge Memory Management with RAG
 """
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
+import hashlib
 import json
 import os
+import threading
 from datetime import datetime
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-import numpy as np
+from .config import EchoForgeConfig
+from .packing import mmr_select, pack_examples
+from .history_index import PostHistoryIndex
+from src.utils.http_pool import get_http_pool
+from src.utils.lazy_import import LazyImports
+from src.utils.tracing import get_tracer
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .dedupe import NearDuplicateIndex
+
+# Vector store and embedding clients are imported on first use to keep startup fast
+_lazy = LazyImports(globals(), {
+    "OpenAIEmbeddings": "langchain_openai:OpenAIEmbeddings",
+    "FAISS": "langchain_community.vectorstores:FAISS"
+})
+__getattr__ = _lazy.module_getattr
 
 class EchoForgeMemory:
     """Memory management for EchoForge agent"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", config: Optional[EchoForgeConfig] = None,
+                 load_index: bool = True):
         self.data_dir = data_dir
+        self.config = config or EchoForgeConfig()
         
         # File paths for user profile and documents
         self.user_profile_file = os.path.join(data_dir, "shared", "user_profile.json")
         self.echoForge_documents_file = os.path.join(data_dir, "echoForge", "echoForge_documents.json")
+        self.history_index_file = os.path.join(data_dir, "echoForge", "echoForge_history_index.json")
+        
+        # Persisted FAISS index and the manifest recording which backend built it
+        self.index_dir = os.path.join(data_dir, "echoForge", "index")
+        self.index_manifest_file = os.path.join(self.index_dir, "index_manifest.json")
+        self.projection_file = os.path.join(self.index_dir, "projection.npy")
+        # Vectors of posts appended since the index was last saved in full (float32 rows)
+        self.appended_vectors_file = os.path.join(self.index_dir, "appended_vectors.f32")
+        
+        self.tracer = get_tracer()
         
-        # Initialize embeddings model
-        # Using text-embedding-3-small: 1536 dims, good quality/cost balance
-        # Alternative: text-embedding-3-large (3072 dims, better quality, 6.5x more expensive)
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        # Guards the in-memory vector store, documents and history index; held only briefly by
+        # appends, so retrieval never waits on embedding or disk writes
+        self._index_lock = threading.RLock()
+        # Serializes appends and index saves, which embed and write to disk outside _index_lock
+        self._write_lock = threading.RLock()
         
-        # Initialize user profile and vector store
+        # Embeddings model and vector store; built now, or on first use / warm_up() if load_index is False
+        self._embeddings = None
+        self._vector_store = None
+        self._vector_store_ready = False
+        
+        # MinHash signatures of stored posts, built on the first near-duplicate check
+        self._near_duplicates = None
+        # Set when stored posts were rewritten in place, so the next save rewrites the indexes in full
+        self._rewritten = False
+        
+        # Initialize user profile, documents and secondary indexes
         self.user_profile = self._load_user_profile()
-        self.vector_store = self._build_vector_store()
-
+        # Running hash and length of the documents file up to its closing bracket
+        self._documents_hash: Any = None
+        self._documents_bytes = 0
+        self.documents, self.documents_fingerprint = self._load_documents()
+        self.history_index = self._build_history_index()
+        if load_index:
+            self.warm_up()
+        
         # Initialize session memory
         self.memory_saver = MemorySaver()
         
         # Store current thread config (created on demand)
         self.current_config = None
+        
+        # Why candidates were dropped by each thread's most recent retrieval
+        self._retrieval_reports = threading.local()
+    
+    @property
+    def last_retrieval_report(self) -> Dict[str, Any]:
+        """Report of the most recent retrieval made on the calling thread.
+        
+        Kept per thread so a background prefetch cannot overwrite the report of
+        the echo it runs beside; callers that need it reliably use
+        search_with_report or packed_with_report instead.
+        """
+        return getattr(self._retrieval_reports, "report", None) or _empty_report(0, self.config.confidence_threshold)
     
     def create_or_get_config(self) -> Dict[str, Any]:
         """Create or get the current thread config"""
@@ -46,7 +104,187 @@ class EchoForgeMemory:
     def get_config(self) -> Dict[str, Any]:
         """Get the current thread config"""
         return self.current_config
+    
+    @staticmethod
+    def create_config(thread_id: str) -> Dict[str, Any]:
+        """Thread config for a given session id"""
+        return {"configurable": {"thread_id": thread_id}}
+        
+    @property
+    def embeddings(self):
+        """Embedding backend, created on first use"""
+        if self._embeddings is None:
+            with self._index_lock:
+                if self._embeddings is None:
+                    self._embeddings = self._create_embeddings()
+        return self._embeddings
+    
+    @embeddings.setter
+    def embeddings(self, value) -> None:
+        self._embeddings = value
+    
+    @property
+    def embedding_backend(self) -> str:
+        """Identifier of the active embedding backend"""
+        return self._embedding_backend_id()
+    
+    @property
+    def vector_store(self):
+        """FAISS store, loaded or built on first use"""
+        if not self._vector_store_ready:
+            with self._index_lock:
+                if not self._vector_store_ready:
+                    self._vector_store = self._build_vector_store()
+                    self._vector_store_ready = True
+        return self._vector_store
+    
+    @vector_store.setter
+    def vector_store(self, value) -> None:
+        self._vector_store = value
+        self._vector_store_ready = True
+    
+    @property
+    def near_duplicates(self) -> "NearDuplicateIndex":
+        """Near-duplicate index over the stored posts, built on first use"""
+        if self._near_duplicates is None:
+            with self._index_lock:
+                if self._near_duplicates is None:
+                    from .dedupe import NearDuplicateIndex, post_text
+                    index = NearDuplicateIndex(
+                        threshold=self.config.dedupe_threshold,
+                        num_perm=self.config.dedupe_num_perm,
+                        shingle_size=self.config.dedupe_shingle_size
+                    )
+                    with self.tracer.span("dedupe.build", documents=len(self.documents)):
+                        for doc_id, doc in enumerate(self.documents):
+                            index.add(doc_id, index.signature(post_text(doc)))
+                    self._near_duplicates = index
+        return self._near_duplicates
+    
+    def collapse_near_duplicates(self, records: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Drop records that near-duplicate a stored post or each other, before they are embedded.
+        
+        The copy with the best human_response is kept, also against stored
+        posts: a stored post beaten by an incoming copy takes over its
+        response fields; see dedupe.collapse_near_duplicates. Returns (kept
+        records, report).
+        """
+        from .dedupe import collapse_near_duplicates
+        with self._write_lock:
+            with self._index_lock, self.tracer.span("dedupe.collapse", documents=len(records)) as span:
+                kept, report = collapse_near_duplicates(records, self.near_duplicates, self.documents)
+                span.set(removed=report["removed"], replaced=report["replaced"])
+            if report["replacements"]:
+                self._replace_responses(report["replacements"])
+        return kept, report
+    
+    def _replace_responses(self, replacements: Dict[int, Dict[str, Any]]) -> None:
+        """Copy the response fields of better copies onto stored posts and rewrite the documents file.
+        
+        The post text is unchanged, so the stored vectors stay valid; only the
+        metadata returned by searches is updated, and the next save_indexes
+        rewrites the indexes in full.
+        """
+        from .dedupe import RESPONSE_FIELDS
+        vector_store = self.vector_store
+        with self._index_lock:
+            for doc_id, record in replacements.items():
+                fields = {field: record.get(field, "") for field in RESPONSE_FIELDS}
+                self.documents[doc_id] = dict(self.documents[doc_id], **fields)
+                if vector_store is not None:
+                    vector_store.docstore.search(vector_store.index_to_docstore_id[doc_id]).metadata.update(fields)
+        self._rewrite_documents_file()
+        self._rewritten = True
+    
+    def resident_bytes(self) -> int:
+        """Approximate memory held: loaded vectors plus the documents file size"""
+        size = 0
+        vector_store = self._vector_store if self._vector_store_ready else None
+        if vector_store is not None:
+            size += vector_store.index.ntotal * vector_store.index.d * 4
+        if os.path.exists(self.echoForge_documents_file):
+            size += os.path.getsize(self.echoForge_documents_file)
+        return size
+    
+    def warm_up(self, background: bool = False) -> Optional[threading.Thread]:
+        """Load the embedding backend and vector store now, or on a daemon thread if background"""
+        if not background:
+            self.vector_store
+            return None
+        thread = threading.Thread(target=lambda: self.vector_store, name="echoforge-warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def _create_embeddings(self):
+        """Create the embedding backend selected by the config, projected if embedding_dimensions asks for it"""
+        from .embeddings import ProjectedEmbeddings
+        
+        dimensions, reduction = self.config.embedding_dimensions, self.config.embedding_reduction
+        if dimensions and reduction not in ("native", "pca"):
+            raise ValueError(f"Unknown embedding_reduction: {reduction}")
+        if dimensions and reduction == "native" and self.config.embedding_provider != "openai":
+            raise ValueError(
+                f"embedding_reduction 'native' needs the openai provider; use 'pca' with "
+                f"'{self.config.embedding_provider}' (or embedding_dim for the hashing backend)"
+            )
+        embeddings = self._create_base_embeddings()
+        if dimensions and reduction == "pca":
+            return ProjectedEmbeddings(embeddings, dimensions)
+        return embeddings
+    
+    def _create_base_embeddings(self):
+        """Create the embedding backend selected by the config"""
+        from .embeddings import HashingEmbeddings, SentenceTransformerEmbeddings
+        from .fakes import FakeEmbeddings, LatencyModel
         
+        provider = self.config.embedding_provider
+        if provider == "openai":
+            # text-embedding-3-small: 1536 dims, good quality/cost balance
+            # Alternative: text-embedding-3-large (3072 dims, better quality, 6.5x more expensive)
+            # text-embedding-3 models return shorter vectors natively when dimensions is set
+            http_pool = get_http_pool(self.config)
+            native_dimensions = self.config.embedding_dimensions if self.config.embedding_reduction == "native" else 0
+            return _lazy.get("OpenAIEmbeddings")(
+                model=self.config.embedding_model,
+                dimensions=native_dimensions or None,
+                request_timeout=http_pool.request_timeout(),
+                http_client=http_pool.client,
+                http_async_client=http_pool.async_client
+            )
+        elif provider == "hashing":
+            return HashingEmbeddings(
+                dim=self.config.embedding_dim,
+                batch_size=self.config.embedding_batch_size,
+                workers=self.config.embedding_workers
+            )
+        elif provider == "sentence_transformers":
+            return SentenceTransformerEmbeddings(
+                model_name=self.config.embedding_model,
+                batch_size=self.config.embedding_batch_size,
+                workers=self.config.embedding_workers
+            )
+        elif provider == "fake":
+            return FakeEmbeddings(
+                dim=self.config.embedding_dim,
+                batch_size=self.config.embedding_batch_size,
+                latency=LatencyModel.from_config(self.config.fake_embedding_latency)
+            )
+        else:
+            raise ValueError(f"Unknown embedding_provider: {provider}")
+    
+    def _embedding_backend_id(self) -> str:
+        """Identifier of the active embedding backend, recorded with every index"""
+        dimensions, reduction = self.config.embedding_dimensions, self.config.embedding_reduction
+        if self.config.embedding_provider == "openai":
+            backend = f"openai:{self.config.embedding_model}"
+            if dimensions and reduction == "native":
+                backend += f":dim={dimensions}"
+        else:
+            backend = getattr(self.embeddings, "base", self.embeddings).backend_id
+        if dimensions and reduction == "pca":
+            backend += f"|pca={dimensions}"
+        return backend
+    
     def _create_empty_profile(self) -> Dict[str, Any]:
         """Create empty user profile"""
         return {
@@ -65,74 +303,513 @@ class EchoForgeMemory:
         else:
             return self._create_empty_profile()
     
-    def _build_vector_store(self) -> FAISS:
-        """Build FAISS vector store from echoForge documents"""
+    def _load_documents(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Load echoForge documents and a fingerprint of the file they came from.
+        
+        Also starts the running hash of the file up to its closing bracket,
+        which appends extend instead of re-reading the whole file.
+        """
+        if not os.path.exists(self.echoForge_documents_file):
+            return [], ""
+        with open(self.echoForge_documents_file, 'rb') as f:
+            raw = f.read()
+        self._documents_bytes = raw.rfind(b"]")
+        self._documents_hash = hashlib.sha256(raw[:self._documents_bytes])
+        return json.loads(raw), hashlib.sha256(raw).hexdigest()
+    
+    def _appended_fingerprint(self) -> str:
+        """Fingerprint of the documents file after appends, from the running hash"""
+        digest = self._documents_hash.copy()
+        digest.update(b"]")
+        return digest.hexdigest()
+    
+    def _build_vector_store(self) -> "FAISS":
+        """Load the persisted FAISS index, or build it from echoForge documents"""
         
         if os.path.exists(self.echoForge_documents_file):
-            with open(self.echoForge_documents_file, 'r') as f:
-                documents_data = json.load(f)
-                
-                # Convert documents to vector store format
-                documents = []
-                for i, doc_data in enumerate(documents_data):
-                    # Create a combined text for embedding using same format as search query
-                    combined_text = f"<context>{doc_data.get('context', '')}</context>\n<title>{doc_data.get('title', '')}</title>\n<content>{doc_data.get('content', '')}</content>"
-                    
-                    # Create document with metadata
-                    doc = Document(
-                        page_content=combined_text,
-                        metadata={
-                            'url': doc_data.get('url', ''),
-                            'context': doc_data.get('context', ''),
-                            'title': doc_data.get('title', ''),
-                            'content': doc_data.get('content', ''),
-                            'human_response': doc_data.get('human_response', ''),
-                            'reflections': doc_data.get('reflections', ''),
-                            'timestamp': doc_data.get('timestamp', ''),
-                            'index': i
-                        }
-                    )
-                    documents.append(doc)
-                
-                # Create FAISS vector store
-                if documents:
-                    vector_store = FAISS.from_documents(documents, self.embeddings)
-                    return vector_store
-                else:
-                    return None
+            documents_data = self.documents
+            fingerprint = self.documents_fingerprint
+            
+            # Reuse the persisted index only if the same backend built it from the same documents
+            vector_store = self._load_persisted_index(fingerprint)
+            if vector_store is not None:
+                return vector_store
+            
+            # Convert documents to vector store format
+            documents = [self._to_document(doc_data, i) for i, doc_data in enumerate(documents_data)]
+            
+            # Create FAISS vector store
+            if documents:
+                with self.tracer.span("index.build", documents=len(documents), backend=self.embedding_backend):
+                    vector_store = self._faiss_from_documents(documents, refit=True)
+                self._persist_index(vector_store, fingerprint, len(documents))
+                return vector_store
+            else:
+                return None
         else:
             return None
     
+    def _faiss_from_documents(self, documents: List[Document], refit: bool = False) -> "FAISS":
+        """New FAISS store over documents, fitting the embedding projection first if there is one"""
+        FAISS = _lazy.get("FAISS")
+        fit_documents = getattr(self.embeddings, "fit_documents", None)
+        if fit_documents is None or not (refit or not self.embeddings.fitted):
+            return FAISS.from_documents(documents, self.embeddings)
+        texts = [document.page_content for document in documents]
+        vectors = fit_documents(texts)
+        return FAISS.from_embeddings(
+            list(zip(texts, vectors)), self.embeddings, metadatas=[document.metadata for document in documents]
+        )
+    
+    @staticmethod
+    def _to_document(doc_data: Dict[str, Any], index: int) -> Document:
+        """Convert a stored post into a vector store document"""
+        # Create a combined text for embedding using same format as search query
+        combined_text = f"<context>{doc_data.get('context', '')}</context>\n<title>{doc_data.get('title', '')}</title>\n<content>{doc_data.get('content', '')}</content>"
+        
+        # Create document with metadata
+        return Document(
+            page_content=combined_text,
+            metadata={
+                'url': doc_data.get('url', ''),
+                'context': doc_data.get('context', ''),
+                'title': doc_data.get('title', ''),
+                'content': doc_data.get('content', ''),
+                'human_response': doc_data.get('human_response', ''),
+                'reflections': doc_data.get('reflections', ''),
+                'timestamp': doc_data.get('timestamp', ''),
+                'index': index
+            }
+        )
+    
+    def append_documents(self, records: List[Dict[str, Any]]) -> None:
+        """Append posts to the documents file, the vector store and the history index, and save the indexes.
+        
+        The persisted index and history index are re-saved with the new
+        documents fingerprint so the next startup loads them as-is. Bulk
+        loads should call extend_documents per batch and save_indexes once.
+        """
+        if not records:
+            return
+        with self._write_lock:
+            self.extend_documents(records)
+            self.save_indexes()
+    
+    def extend_documents(self, records: List[Dict[str, Any]]) -> None:
+        """Append posts to the documents file and the in-memory indexes without saving the indexes.
+        
+        Embedding and the file write run outside _index_lock, which is held only
+        to add the new vectors and documents, so concurrent searches are not
+        blocked for the length of the write. Until save_indexes() runs, the
+        persisted indexes lag behind the documents file; if the process stops
+        first, the next load embeds only the posts appended since the last save.
+        """
+        if not records:
+            return
+        with self._write_lock, self.tracer.span("memory.append_documents", documents=len(records)):
+            # Load or build the store from the documents as they were before this append,
+            # otherwise a lazily built store would already contain the new records
+            vector_store = self.vector_store
+            start = len(self.documents)
+            new_documents = [self._to_document(doc_data, start + i) for i, doc_data in enumerate(records)]
+            texts = [document.page_content for document in new_documents]
+            if vector_store is None:
+                new_store = self._faiss_from_documents(new_documents)
+            else:
+                vectors = self.embeddings.embed_documents(texts)
+            
+            self._append_to_documents_file(records)
+            
+            with self._index_lock:
+                if vector_store is None:
+                    self.vector_store = new_store
+                else:
+                    vector_store.add_embeddings(list(zip(texts, vectors)),
+                                                metadatas=[document.metadata for document in new_documents])
+                self.documents.extend(records)
+                for i, doc_data in enumerate(records):
+                    self.history_index.add(start + i, doc_data)
+                if self._near_duplicates is not None:
+                    from .dedupe import post_text
+                    for i, doc_data in enumerate(records):
+                        self._near_duplicates.add(start + i, self._near_duplicates.signature(post_text(doc_data)))
+    
+    def save_indexes(self) -> None:
+        """Save the FAISS and history indexes under the current documents fingerprint.
+        
+        Posts appended since the last save only add their vectors to the
+        appended-vectors log and update the manifest; the index and history
+        index are rewritten in full once the log outgrows the saved index, so
+        a small batch costs a small save.
+        """
+        with self._write_lock, self.tracer.span("memory.save_indexes", documents=len(self.documents)) as span:
+            if self.vector_store is None:
+                return
+            manifest = self._read_manifest()
+            with self._index_lock:
+                previous = self.documents_fingerprint
+                fingerprint = self._appended_fingerprint()
+                self.documents_fingerprint = fingerprint
+                self.history_index.fingerprint = fingerprint
+                count = len(self.documents)
+            # Other writers wait on _write_lock, so the saved index matches the documents file
+            saved = manifest.get("document_count", 0) if manifest else 0
+            appended = manifest.get("appended", 0) if manifest else 0
+            incremental = (manifest is not None and not self._rewritten
+                           and manifest.get("backend") == self.embedding_backend
+                           and manifest.get("documents_fingerprint") == previous and 0 < saved <= count
+                           and appended + count - saved <= manifest.get("base_count", 0))
+            span.set(incremental=incremental)
+            if not incremental:
+                self._persist_index(self.vector_store, fingerprint, count)
+                self.history_index.save(self.history_index_file)
+                self._rewritten = False
+                return
+            with self._index_lock:
+                vectors = self.vector_store.index.reconstruct_n(saved, count - saved)
+            self._append_vectors(vectors, appended)
+            self._write_manifest(dict(manifest, documents_fingerprint=fingerprint, document_count=count,
+                                      appended=appended + count - saved, **self._documents_prefix()))
+    
+    def _rewrite_documents_file(self) -> None:
+        """Replace the documents file with the current documents"""
+        items = ",\n".join(json.dumps(record) for record in self.documents).encode("utf-8")
+        tmp_path = self.echoForge_documents_file + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b"[\n" + items + b"\n]")
+        os.replace(tmp_path, self.echoForge_documents_file)
+        self._documents_hash = hashlib.sha256(b"[\n" + items + b"\n")
+        self._documents_bytes = len(items) + 3
+    
+    def _append_to_documents_file(self, records: List[Dict[str, Any]]) -> None:
+        """Append records to the JSON array on disk without rewriting existing entries"""
+        os.makedirs(os.path.dirname(self.echoForge_documents_file), exist_ok=True)
+        items = ",\n".join(json.dumps(record) for record in records).encode("utf-8")
+        if not self.documents or not os.path.exists(self.echoForge_documents_file):
+            with open(self.echoForge_documents_file, 'wb') as f:
+                f.write(b"[\n" + items + b"\n]")
+            self._documents_hash = hashlib.sha256(b"[\n" + items + b"\n")
+            self._documents_bytes = len(items) + 3
+            return
+        with open(self.echoForge_documents_file, 'r+b') as f:
+            # Step back over trailing whitespace to the closing bracket
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            while position > 0:
+                f.seek(position - 1)
+                char = f.read(1)
+                position -= 1
+                if char == b"]":
+                    break
+            f.seek(position)
+            f.truncate()
+            f.write(b",\n" + items + b"\n]")
+        self._documents_hash.update(b",\n" + items + b"\n")
+        self._documents_bytes = position + len(items) + 3
+    
+    def _build_history_index(self) -> PostHistoryIndex:
+        """Load the persisted url/timestamp/title indexes, or build and persist them"""
+        if not self.documents:
+            return PostHistoryIndex()
+        history_index = PostHistoryIndex.load(self.history_index_file, self.documents_fingerprint)
+        if history_index is None:
+            # Incremental saves leave the history index at the last full save; index the rest
+            manifest = self._read_manifest()
+            if manifest and manifest.get("documents_fingerprint") == self.documents_fingerprint:
+                history_index = PostHistoryIndex.load(self.history_index_file, manifest.get("base_fingerprint"))
+                base_count = manifest.get("base_count", 0)
+                if history_index is not None and len(history_index) == base_count:
+                    for doc_id in range(base_count, len(self.documents)):
+                        history_index.add(doc_id, self.documents[doc_id])
+                    history_index.fingerprint = self.documents_fingerprint
+                    return history_index
+            with self.tracer.span("history_index.build", documents=len(self.documents)):
+                history_index = PostHistoryIndex.build(self.documents, self.documents_fingerprint)
+            history_index.save(self.history_index_file)
+        return history_index
+    
+    def get_post_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        """Look up an archived post by url"""
+        doc_id = self.history_index.get_by_url(url)
+        return None if doc_id is None else self.documents[doc_id]
+    
+    def list_posts(self, page: int = 1, page_size: int = 20, start: Optional[str] = None,
+                   end: Optional[str] = None, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """One page of archived posts ordered by timestamp, optionally within [start, end)"""
+        doc_ids = self.history_index.list_by_time(
+            start=start, end=end, offset=(page - 1) * page_size, limit=page_size, newest_first=newest_first
+        )
+        return [self.documents[i] for i in doc_ids]
+    
+    def search_posts_by_title(self, query: str, page: int = 1, page_size: int = 20) -> List[Dict[str, Any]]:
+        """Archived posts whose title contains every query word (the last one as a prefix)"""
+        doc_ids = self.history_index.search_title(query, offset=(page - 1) * page_size, limit=page_size)
+        return [self.documents[i] for i in doc_ids]
+    
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        """The persisted index manifest, or None"""
+        if not os.path.exists(self.index_manifest_file):
+            return None
+        with open(self.index_manifest_file, 'r') as f:
+            return json.load(f)
+    
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = self.index_manifest_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.index_manifest_file)
+    
+    def _append_vectors(self, vectors: "np.ndarray", offset: int) -> None:
+        """Write vectors to the appended-vectors log after its first offset rows"""
+        import numpy as np
+        
+        rows = np.ascontiguousarray(vectors, dtype=np.float32)
+        # Rows past offset belong to a save that never reached the manifest
+        position = offset * rows.shape[1] * rows.itemsize
+        with open(self.appended_vectors_file, 'r+b' if os.path.exists(self.appended_vectors_file) else 'wb') as f:
+            f.truncate(position)
+            f.seek(position)
+            f.write(rows.tobytes())
+    
+    def _read_appended_vectors(self, rows: int, dimensions: int) -> Optional["np.ndarray"]:
+        """The first rows vectors of the appended-vectors log, or None if it is shorter"""
+        import numpy as np
+        
+        if not os.path.exists(self.appended_vectors_file):
+            return None
+        vectors = np.fromfile(self.appended_vectors_file, dtype=np.float32, count=rows * dimensions)
+        if vectors.size != rows * dimensions:
+            return None
+        return vectors.reshape(rows, dimensions)
+    
+    def _load_persisted_index(self, fingerprint: str) -> Optional["FAISS"]:
+        """Load the persisted index if its manifest matches the current backend and documents"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        if manifest.get("backend") != self.embedding_backend:
+            print(f"[MEMORY] Index was built with '{manifest.get('backend')}', "
+                  f"current backend is '{self.embedding_backend}' - rebuilding")
+            return None
+        unsaved = 0
+        if manifest.get("documents_fingerprint") != fingerprint:
+            if not self._extends_saved_documents(manifest):
+                print("[MEMORY] Documents changed since the index was built - rebuilding")
+                return None
+            # Posts appended after the last save (e.g. by a killed ingest); only they are embedded again
+            unsaved = len(self.documents) - manifest.get("document_count", 0)
+        if hasattr(self.embeddings, "fit_documents") and not self.embeddings.load(self.projection_file):
+            print("[MEMORY] Embedding projection missing from the persisted index - rebuilding")
+            return None
+        try:
+            with self.tracer.span("index.load"):
+                vector_store = _lazy.get("FAISS").load_local(self.index_dir, self.embeddings,
+                                                             allow_dangerous_deserialization=True)
+        except Exception as e:
+            print(f"[MEMORY] Could not load persisted index: {e} - rebuilding")
+            return None
+        appended = manifest.get("appended", 0)
+        if appended:
+            base_count = manifest.get("base_count", 0)
+            vectors = self._read_appended_vectors(appended, vector_store.index.d)
+            if vectors is None or vector_store.index.ntotal != base_count:
+                print("[MEMORY] Appended vectors missing from the persisted index - rebuilding")
+                return None
+            documents = [self._to_document(doc_data, base_count + i)
+                         for i, doc_data in enumerate(self.documents[base_count:base_count + appended])]
+            vector_store.add_embeddings([(d.page_content, v) for d, v in zip(documents, vectors)],
+                                        metadatas=[d.metadata for d in documents])
+        if unsaved:
+            print(f"[MEMORY] Indexing {unsaved} posts appended since the index was saved")
+            start = len(self.documents) - unsaved
+            with self.tracer.span("index.catch_up", documents=unsaved):
+                vector_store.add_documents([self._to_document(doc_data, start + i)
+                                            for i, doc_data in enumerate(self.documents[start:])])
+        return vector_store
+    
+    def _persist_index(self, vector_store: "FAISS", fingerprint: str, document_count: int) -> None:
+        """Save the index together with a manifest of the backend that built it"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        vector_store.save_local(self.index_dir)
+        if hasattr(self.embeddings, "fit_documents"):
+            self.embeddings.save(self.projection_file)
+        if os.path.exists(self.appended_vectors_file):
+            os.remove(self.appended_vectors_file)
+        # base_* describe the documents the saved index holds; appended posts follow from the log
+        self._write_manifest({
+            "backend": self.embedding_backend,
+            "dimensions": vector_store.index.d,
+            "documents_fingerprint": fingerprint,
+            "document_count": document_count,
+            "base_fingerprint": fingerprint,
+            "base_count": document_count,
+            "appended": 0,
+            "built_at": datetime.now().isoformat(),
+            **self._documents_prefix()
+        })
+    
+    def _documents_prefix(self) -> Dict[str, Any]:
+        """Manifest entries identifying the documents file as saved, so later appends can be recognised"""
+        return {"documents_bytes": self._documents_bytes, "documents_prefix": self._documents_hash.hexdigest()}
+    
+    def _extends_saved_documents(self, manifest: Dict[str, Any]) -> bool:
+        """Whether the documents file is the one the manifest saved plus posts appended after it"""
+        size = manifest.get("documents_bytes")
+        if size is None or manifest.get("document_count", 0) > len(self.documents):
+            return False
+        with open(self.echoForge_documents_file, 'rb') as f:
+            return hashlib.sha256(f.read(size)).hexdigest() == manifest.get("documents_prefix")
+    
     def get_user_profile(self) -> Dict[str, Any]:
         """Get the loaded user profile"""
         return self.user_profile
     
-    def get_relevant_context(self, query: str, limit: int = 3) -> List[Dict[str, str]]:
-        """Retrieve relevant posts using semantic search"""
+    def get_relevant_context(self, query: str, limit: int = 3,
+                             min_similarity: Optional[float] = None) -> List[Dict[str, str]]:
+        """Retrieve relevant posts using semantic search.
+        
+        Returns at most limit posts whose normalized similarity is at least
+        min_similarity (default: config.confidence_threshold), so the result
+        shrinks for novel queries. Why candidates were dropped is recorded in
+        the calling thread's last_retrieval_report.
+        """
+        relevant_posts, report = self.search_with_report(query, limit, min_similarity)
+        self._retrieval_reports.report = report
+        return relevant_posts
+    
+    def search_with_report(self, query: str, limit: int = 3,
+                           min_similarity: Optional[float] = None) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Thresholded search returning (posts, report) without touching shared state"""
+        threshold = self.config.confidence_threshold if min_similarity is None else min_similarity
+        report = _empty_report(limit, threshold)
         
         if self.vector_store is None:
-            return []
+            return [], report
         
-        try:
-            # Perform semantic search with similarity scores
-            docs_with_scores = self.vector_store.similarity_search_with_score(query, k=limit)
-            
-            # Convert documents back to the expected format
-            relevant_posts = []
-            for doc, score in docs_with_scores:
-                metadata = doc.metadata
-                relevant_posts.append({
-                    'url': metadata.get('url', ''),
-                    'context': metadata.get('context', ''),
-                    'title': metadata.get('title', ''),
-                    'content': metadata.get('content', ''),
-                    'human_response': metadata.get('human_response', ''),
-                    'reflections': metadata.get('reflections', ''),
-                    'timestamp': metadata.get('timestamp', ''),
-                    'similarity_dist': float(score)  # FAISS distance score (lower = more similar)
+        with self.tracer.span("retrieval.get_relevant_context", k=limit) as span:
+            try:
+                query_vector = self._embed_query(query)
+                candidates, _ = self._search(query_vector, limit)
+            except Exception as e:
+                report["error"] = str(e)
+                return [], report
+            relevant_posts = [candidates[i] for i in self._apply_threshold(candidates, threshold, report)]
+            span.set(returned=len(relevant_posts), dropped=len(report["dropped"]))
+            return relevant_posts, report
+    
+    def get_packed_context(self, query: str) -> List[Dict[str, str]]:
+        """Retrieve a diverse, token-budgeted set of examples for the echo prompt.
+        
+        Fetches example_candidates nearest posts, drops those below
+        confidence_threshold, orders the rest by maximal marginal relevance
+        using the vectors already stored in the index, then packs them into
+        example_token_budget, truncating long fields. Why candidates were
+        dropped is recorded in the calling thread's last_retrieval_report.
+        """
+        packed, report = self.packed_with_report(query)
+        self._retrieval_reports.report = report
+        return packed
+    
+    def packed_with_report(self, query: str) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """get_packed_context returning (posts, report) without touching shared state"""
+        report = _empty_report(self.config.example_limit, self.config.confidence_threshold)
+        
+        if self.vector_store is None:
+            return [], report
+        
+        with self.tracer.span("retrieval.get_packed_context", k=self.config.example_candidates) as span:
+            try:
+                query_vector = self._embed_query(query)
+                candidates, vectors = self._search(query_vector, self.config.example_candidates)
+            except Exception as e:
+                report["error"] = str(e)
+                return [], report
+            kept_rows = self._apply_threshold(candidates, self.config.confidence_threshold, report)
+            kept = [candidates[i] for i in kept_rows]
+            order = mmr_select(query_vector, vectors[kept_rows], len(kept), self.config.mmr_lambda)
+            packed = pack_examples(
+                kept, order,
+                limit=self.config.example_limit,
+                token_budget=self.config.example_token_budget,
+                field_max_tokens=self.config.example_field_max_tokens,
+                dropped=report["dropped"]
+            )
+            report["returned"] = len(packed)
+            span.set(returned=len(packed), dropped=len(report["dropped"]))
+            return packed, report
+    
+    def _apply_threshold(self, candidates: List[Dict[str, Any]], threshold: float,
+                         report: Dict[str, Any]) -> List[int]:
+        """Indices of candidates at or above threshold; the rest are recorded in report"""
+        kept = []
+        for i, post in enumerate(candidates):
+            if post["similarity"] >= threshold:
+                kept.append(i)
+            else:
+                report["dropped"].append({
+                    "url": post["url"], "similarity": post["similarity"], "reason": "below_threshold"
                 })
-            
-            return relevant_posts
-            
-        except Exception as e:
-            return []
+        report["candidates"] = len(candidates)
+        report["returned"] = len(kept)
+        return kept
+    
+    def _embed_query(self, query: str) -> "np.ndarray":
+        """Embed a search query"""
+        import numpy as np
+        
+        with self.tracer.span("embedding.query"):
+            return np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+    
+    def _search(self, query_vector: "np.ndarray", limit: int) -> Tuple[List[Dict[str, Any]], "np.ndarray"]:
+        """Search the FAISS index; returns (posts, stored vectors of the hits)"""
+        with self._index_lock:
+            return self._search_locked(query_vector, limit)
+    
+    def _search_locked(self, query_vector: "np.ndarray", limit: int) -> Tuple[List[Dict[str, Any]], "np.ndarray"]:
+        import numpy as np
+        
+        with self.tracer.span("retrieval.faiss_search", k=limit):
+            distances, ids = self.vector_store.index.search(query_vector.reshape(1, -1), limit)
+        
+        # FAISS pads with -1 when the index holds fewer than limit vectors
+        hits = [(int(i), float(d)) for i, d in zip(ids[0], distances[0]) if i != -1]
+        if not hits:
+            return [], np.zeros((0, self.vector_store.index.d), dtype=np.float32)
+        
+        vectors = self.vector_store.index.reconstruct_batch(np.array([i for i, _ in hits], dtype=np.int64))
+        similarities = normalized_similarity(query_vector, vectors)
+        
+        # Convert documents back to the expected format
+        relevant_posts = []
+        for (i, score), similarity in zip(hits, similarities):
+            metadata = self.vector_store.docstore.search(self.vector_store.index_to_docstore_id[i]).metadata
+            relevant_posts.append({
+                'url': metadata.get('url', ''),
+                'context': metadata.get('context', ''),
+                'title': metadata.get('title', ''),
+                'content': metadata.get('content', ''),
+                'human_response': metadata.get('human_response', ''),
+                'reflections': metadata.get('reflections', ''),
+                'timestamp': metadata.get('timestamp', ''),
+                'similarity_dist': score,  # FAISS distance score (lower = more similar)
+                'similarity': float(similarity)  # Normalized to [0, 1] (higher = more similar)
+            })
+        return relevant_posts, vectors
+
+
+def normalized_similarity(query_vector: "np.ndarray", vectors: "np.ndarray") -> "np.ndarray":
+    """Cosine similarity rescaled to [0, 1] as (1 + cos) / 2.
+    
+    Unlike raw FAISS L2 distances this is comparable across queries and
+    embedding backends, so a single confidence_threshold can apply to all.
+    """
+    import numpy as np
+    
+    query = query_vector / max(float(np.linalg.norm(query_vector)), 1e-12)
+    norms = np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+    cosine = (vectors @ query) / norms
+    return np.clip((1.0 + cosine) / 2.0, 0.0, 1.0)
+
+
+def _empty_report(limit: int, threshold: float) -> Dict[str, Any]:
+    return {"limit": limit, "threshold": threshold, "candidates": 0, "returned": 0, "dropped": []}
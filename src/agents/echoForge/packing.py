@@ -0,0 +1,98 @@
+"""
+EchoForge Example Packing: diversity-aware, token-budgeted selection of historical examples
+"""
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Tags and whitespace around each rendered example, in estimated tokens
+EXAMPLE_OVERHEAD_TOKENS = 30
+PACKED_FIELDS = ("context", "title", "content", "human_response")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, on a word boundary, marking the cut"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip() + " ..."
+
+
+def mmr_select(query_vector: "np.ndarray", candidate_vectors: "np.ndarray", k: int,
+               lambda_mult: float = 0.7) -> List[int]:
+    """Maximal-marginal-relevance ordering of candidates.
+
+    Greedily picks the candidate maximizing
+        lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected)
+    using cosine similarity. Returns up to k candidate row indices in pick order.
+    """
+    import numpy as np
+    
+    n = len(candidate_vectors)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    vectors = np.asarray(candidate_vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_vector, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+
+    relevance = vectors @ query
+    pairwise = vectors @ vectors.T
+    max_redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    selected = []
+    for _ in range(k):
+        redundancy = np.where(np.isfinite(max_redundancy), max_redundancy, 0.0)
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        chosen = int(np.argmax(scores))
+        selected.append(chosen)
+        available[chosen] = False
+        max_redundancy = np.maximum(max_redundancy, pairwise[:, chosen])
+    return selected
+
+
+def pack_examples(candidates: List[Dict[str, Any]], order: List[int], limit: int,
+                  token_budget: int, field_max_tokens: int,
+                  dropped: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Fill a token budget with examples taken in order, truncating long fields.
+
+    Examples that would overflow the remaining budget are skipped in favour of
+    later, smaller ones; at most limit examples are returned. If dropped is
+    given, each example left out is appended to it with the reason.
+    """
+    packed = []
+    used = 0
+    for i in order:
+        if len(packed) >= limit:
+            if dropped is not None:
+                dropped.append(_drop_record(candidates[i], "limit_reached"))
+            continue
+        example = dict(candidates[i])
+        cost = EXAMPLE_OVERHEAD_TOKENS
+        for field in PACKED_FIELDS:
+            value = truncate_to_tokens(str(example.get(field, "")), field_max_tokens)
+            example[field] = value
+            cost += estimate_tokens(value)
+        if used + cost > token_budget:
+            if dropped is not None:
+                dropped.append(_drop_record(candidates[i], "over_token_budget"))
+            continue
+        used += cost
+        packed.append(example)
+    return packed
+
+
+def _drop_record(candidate: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    return {"url": candidate.get("url", ""), "similarity": candidate.get("similarity"), "reason": reason}
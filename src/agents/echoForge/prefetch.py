@@ -0,0 +1,122 @@
+"""
+EchoForge Speculative Retrieval: prefetch echo examples while the human confirms the post
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+import re
+import threading
+
+
+POST_FIELDS = ("context", "title", "content")
+_FIELD_PATTERN = re.compile(r"^[\s\-*]*\**(context|title|content)\**\s*:\s*\**\s*(.*?)\s*$", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def parse_post_fields(text: str) -> Optional[Dict[str, str]]:
+    """The context/title/content listed in a question, or None unless all three are present.
+
+    A field runs from its label to the next label or blank line, so values
+    spanning several lines (or starting on the line after the label) are kept whole.
+    """
+    fields: Dict[str, List[str]] = {}
+    current = None
+    for line in (text or "").splitlines():
+        match = _FIELD_PATTERN.match(line)
+        if match:
+            name = match.group(1).lower()
+            current = None if name in fields else name
+            if current is not None:
+                fields[current] = [match.group(2)] if match.group(2) else []
+        elif current is not None:
+            if line.strip():
+                fields[current].append(line.strip())
+            elif fields[current]:
+                current = None
+    values = {name: "\n".join(lines).strip() for name, lines in fields.items()}
+    if not all(values.get(name) for name in POST_FIELDS):
+        return None
+    return {name: values[name] for name in POST_FIELDS}
+
+
+def echo_query(context: str, title: str, content: str) -> str:
+    """Vector store query for a post, in the same format documents are embedded with"""
+    return f"<context>{context}</context>\n<title>{title}</title>\n<content>{content}</content>".strip()
+
+
+def query_key(query: str) -> str:
+    """What two queries must share to count as the same retrieval: their words, case-folded.
+
+    The prefetched query is parsed from the question text and the confirmed
+    one comes from structured output, so whitespace, quoting and markdown
+    around the same post can differ between the two.
+    """
+    return " ".join(_WORD_PATTERN.findall(query.casefold()))
+
+
+class RetrievalPrefetcher:
+    """Runs echo retrieval speculatively, one pending query per session.
+
+    start() kicks retrieval off on a small pool once the post fields are known;
+    take() hands the result to echo() only if the confirmed query is the one
+    that was prefetched (compared by query_key), and otherwise discards it.
+    """
+
+    def __init__(self, retrieve: Callable[[str], Any], workers: int = 2):
+        self.retrieve = retrieve
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="echoforge-prefetch")
+        self._pending: Dict[str, Tuple[str, Future]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, session: str, query: str, retrieve: Optional[Callable[[str], Any]] = None) -> bool:
+        """Prefetch query for session, replacing any different pending query; False if already pending.
+
+        retrieve overrides the default retrieval for this query (e.g. a tenant's memory).
+        """
+        with self._lock:
+            pending = self._pending.get(session)
+            if pending is not None and pending[0] == query_key(query):
+                return False
+            if pending is not None:
+                pending[1].cancel()
+            self._pending[session] = (query_key(query), self._executor.submit(retrieve or self.retrieve, query))
+            self.started += 1
+        return True
+
+    def take(self, session: str, query: str) -> Tuple[bool, Any]:
+        """(True, result) if query was prefetched for session, else (False, None); the entry is consumed"""
+        with self._lock:
+            pending = self._pending.pop(session, None)
+        if pending is None:
+            return False, None
+        prefetched_key, future = pending
+        if prefetched_key != query_key(query):
+            future.cancel()
+            self.misses += 1
+            return False, None
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"[PREFETCH] Speculative retrieval failed, retrieving again: {e}")
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, result
+
+    def discard(self, session: str) -> None:
+        """Drop any pending prefetch for session"""
+        with self._lock:
+            pending = self._pending.pop(session, None)
+        if pending is not None:
+            pending[1].cancel()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+        return {"started": self.started, "hits": self.hits, "misses": self.misses, "pending": pending}
+
+    def close(self) -> None:
+        """Cancel queued prefetches and stop the pool"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,299 @@
+"""
+EchoForge Request Policy: per-call deadlines, jittered retry and hedging for chat model requests
+"""
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import contextvars
+import random
+import threading
+import time
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.runnables import RunnableLambda
+from .usage import current_node
+from src.utils.tracing import get_tracer, percentile
+
+
+# Provider errors worth another attempt, matched by class name so no client library is imported
+RETRYABLE_ERRORS = (
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError",
+    "ServiceUnavailableError", "ConnectError", "ReadTimeout", "RemoteProtocolError"
+)
+
+
+class RequestTimeoutError(TimeoutError):
+    """Raised when a model request has no result by its deadline"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient transport, rate-limit and server errors; never deadline expiry"""
+    if isinstance(error, RequestTimeoutError):
+        return False
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class RequestPolicy:
+    """Deadline, retry and hedging rules shared by all chat model calls.
+
+    Each call gets deadline seconds overall (0 = none), across every attempt.
+    Retryable errors are retried up to max_retries times after a full-jitter
+    exponential backoff (uniform in [0, min(backoff_max, backoff * 2**n)]),
+    as long as the wait fits before the deadline.
+
+    With hedge_percentile set (e.g. 0.95), an attempt still running after that
+    percentile of the node's recent latencies gets a duplicate request, and
+    whichever finishes first wins. Hedging starts once hedge_min_samples
+    latencies were seen and pauses while the hedge rate (hedged calls / calls)
+    is at hedge_max_rate, so duplicates stay a bounded share of spend.
+    Attempts run on a worker pool; a losing or timed-out request is abandoned,
+    not interrupted, and its result is handed to the caller's on_abandoned.
+    call_within steps get a pool of their own, since they wait on attempts.
+    """
+
+    def __init__(self, deadline: float = 0.0, max_retries: int = 0, backoff: float = 0.5, backoff_max: float = 8.0,
+                 hedge_percentile: float = 0.0, hedge_min_samples: int = 20, hedge_max_rate: float = 0.1,
+                 window: int = 200, max_workers: int = 64, seed: Optional[int] = None):
+        self.deadline = deadline
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_rate = hedge_max_rate
+        self.window = window
+        self.max_workers = max_workers
+        self.tracer = get_tracer()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retries = 0
+        self.timeouts = 0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._rng = random.Random(seed)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._step_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'RequestPolicy':
+        return cls(
+            deadline=config.llm_timeout,
+            max_retries=config.llm_max_retries,
+            backoff=config.llm_retry_backoff,
+            hedge_percentile=config.llm_hedge_percentile,
+            hedge_min_samples=config.llm_hedge_min_samples,
+            hedge_max_rate=config.llm_hedge_max_rate
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.deadline > 0 or self.max_retries > 0 or self.hedge_percentile > 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="echoforge-llm")
+            return self._executor
+
+    def _step_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._step_executor is None:
+                self._step_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                         thread_name_prefix="echoforge-llm-step")
+            return self._step_executor
+
+    def _submit(self, fn: Callable[[], Any], pool: Optional[ThreadPoolExecutor] = None):
+        # Attempts keep the caller's thread_id/node so usage and replay attribution still work
+        context = contextvars.copy_context()
+        return (pool or self._pool()).submit(context.run, fn)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging a call for key, or None if it should not be hedged"""
+        if self.hedge_percentile <= 0:
+            return None
+        with self._lock:
+            samples = self._latencies.get(key)
+            if not samples or len(samples) < self.hedge_min_samples:
+                return None
+            if self.calls and self.hedges / self.calls >= self.hedge_max_rate:
+                return None
+            return percentile(sorted(samples), self.hedge_percentile)
+
+    def _observe(self, key: str, latency: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window)).append(latency)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter backoff before retry number attempt (0-based)"""
+        with self._lock:
+            return self._rng.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    def call(self, fn: Callable[[], Any], key: Optional[str] = None,
+             on_abandoned: Optional[Callable[[Any], None]] = None) -> Any:
+        """Run fn under the policy.
+
+        key groups latencies for hedging (default: the current node);
+        on_abandoned receives the results of requests that finished after
+        another one won or the deadline passed, in the caller's context.
+        """
+        key = key or current_node() or "unattributed"
+        with self._lock:
+            self.calls += 1
+        self.tracer.registry.inc("echoforge_llm_requests_total", node=key)
+        deadline_at = time.monotonic() + self.deadline if self.deadline > 0 else None
+
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(fn, key, deadline_at, on_abandoned, self.hedge_delay(key))
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                self.tracer.registry.inc("echoforge_llm_retries_total", node=key)
+                print(f"[POLICY] Retrying {key} after {type(e).__name__} (attempt {attempt + 1})")
+                time.sleep(delay)
+
+    def call_within(self, fn: Callable[[], Any], seconds: float, key: Optional[str] = None,
+                    on_abandoned: Optional[Callable[[Any], None]] = None) -> Any:
+        """Run fn once with a deadline of seconds, without retries or hedging.
+
+        For callers bounding a whole step (e.g. a latency budget) whose model
+        calls may already go through the policy; raises RequestTimeoutError.
+        fn runs on the step pool, so waiting on its own attempts cannot take
+        every worker of the attempt pool.
+        """
+        key = key or current_node() or "unattributed"
+        return self._attempt(fn, key, time.monotonic() + max(0.0, seconds), on_abandoned, None, seconds,
+                             pool=self._step_pool())
+
+    def _attempt(self, fn: Callable[[], Any], key: str, deadline_at: Optional[float],
+                 on_abandoned: Optional[Callable[[Any], None]], hedge_after: Optional[float],
+                 deadline: Optional[float] = None, pool: Optional[ThreadPoolExecutor] = None) -> Any:
+        """One attempt, hedged after hedge_after seconds; raises the attempt's error or RequestTimeoutError"""
+        if deadline_at is None and hedge_after is None:
+            start = time.perf_counter()
+            result = fn()
+            self._observe(key, time.perf_counter() - start)
+            return result
+
+        start = time.perf_counter()
+        pending = {self._submit(fn, pool)}
+        hedge = None
+        errors: List[BaseException] = []
+        while pending:
+            remaining = None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
+            timeout = remaining
+            if hedge is None and hedge_after is not None:
+                until_hedge = max(0.0, hedge_after - (time.perf_counter() - start))
+                timeout = until_hedge if remaining is None else min(remaining, until_hedge)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future.exception() is not None:
+                    errors.append(future.exception())
+                    continue
+                self._observe(key, time.perf_counter() - start)
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                    self.tracer.registry.inc("echoforge_llm_hedge_wins_total", node=key)
+                for loser in pending:
+                    self._abandon(loser, on_abandoned)
+                return future.result()
+
+            if deadline_at is not None and time.monotonic() >= deadline_at:
+                for loser in pending:
+                    self._abandon(loser, on_abandoned)
+                with self._lock:
+                    self.timeouts += 1
+                self.tracer.registry.inc("echoforge_llm_timeouts_total", node=key)
+                raise RequestTimeoutError(
+                    f"{key} request exceeded its {self.deadline if deadline is None else deadline:.1f}s deadline"
+                )
+            if hedge is None and hedge_after is not None and pending:
+                hedge = self._submit(fn, pool)
+                pending.add(hedge)
+                with self._lock:
+                    self.hedges += 1
+                self.tracer.registry.inc("echoforge_llm_hedges_total", node=key)
+
+        # Every request failed; surface the first error
+        raise errors[0]
+
+    def _abandon(self, future, on_abandoned: Optional[Callable[[Any], None]]) -> None:
+        """Let a losing request finish in the background, handing its result to on_abandoned"""
+        if future.cancel() or on_abandoned is None:
+            return
+        context = contextvars.copy_context()
+
+        def report(done) -> None:
+            if not done.cancelled() and done.exception() is None:
+                context.run(on_abandoned, done.result())
+        future.add_done_callback(report)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedges / self.calls if self.calls else 0.0,
+                "retries": self.retries,
+                "timeouts": self.timeouts
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            executors = (self._executor, self._step_executor)
+            self._executor = self._step_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+
+class PolicyChatModel(BaseChatModel):
+    """Chat model wrapper sending every call through a RequestPolicy"""
+
+    inner: Any
+    policy: Any
+    model_name: str = ""
+    # UsageTracker charged for abandoned duplicate requests, which providers still bill
+    usage: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "echoforge-policy"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        # Below the callback layer: only the winning reply is reported by this wrapper's run
+        return self.policy.call(lambda: self.inner._generate(messages, stop=stop, **kwargs),
+                                on_abandoned=self._charge_abandoned)
+
+    def _charge_abandoned(self, result: ChatResult) -> None:
+        usage = getattr(result.generations[0].message, "usage_metadata", None) if result.generations else None
+        if self.usage is not None and usage:
+            self.usage.record(self.model_name, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Bind tools formatted by the inner model; they reach _generate as call arguments"""
+        return self.bind(**self.inner.bind_tools(tools, **kwargs).kwargs)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        structured = self.inner.with_structured_output(schema, **kwargs)
+        # Invoked with the caller's callbacks, so every duplicate reports its own usage
+        return RunnableLambda(lambda value, config=None: self.policy.call(lambda: structured.invoke(value, config=config)))
@@ -0,0 +1,242 @@
+"""
+EchoForge Server: many concurrent sessions over a JSON-lines socket protocol
+
+Each connection is one session with its own thread_id. Client messages:
+    {"type": "start", "thread_id": "<optional, to reuse>", "user_id": "<optional tenant>"}
+    {"type": "reply", "text": "..."}                      answer to a question
+    {"type": "feedback", "human_response": "...", "reflections": "...", "ai_evaluation": "..."}
+    {"type": "close"}
+Server messages:
+    {"type": "session", "thread_id": "..."}
+    {"type": "question", "text": "..."}
+    {"type": "result", "status": "...", "ai_response": "...", "echo_degradation": "..."}
+    {"type": "feedback_recorded", "url": "..."}
+    {"type": "error", "error": "..."}
+"""
+from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import json
+import uuid
+from .agent import EchoForgeAgent
+from .tenants import validate_user_id
+
+
+class EchoForgeSession:
+    """One client connection bound to a thread_id"""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.thread_id: Optional[str] = None
+        self.waiting = False  # Paused on a question; the graph state lives in the checkpointer
+        self.run_task: Optional[asyncio.Task] = None
+        self.closed = False
+        self._send_lock = asyncio.Lock()
+    
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Write one JSON line to the client"""
+        if self.closed:
+            return
+        async with self._send_lock:
+            self.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+            await self.writer.drain()
+    
+    def busy(self) -> bool:
+        return self.run_task is not None and not self.run_task.done()
+
+
+class EchoForgeServer:
+    """Asyncio front end sharing one EchoForgeAgent across sessions.
+    
+    Connections are coroutines and a session waiting on the human is just its
+    checkpointed graph state, so idle sessions cost no OS thread. Graph steps
+    (start, or resume with a reply) execute on a bounded thread pool; at most
+    max_active_runs run at once and further steps wait up to queue_timeout for
+    a slot before being refused.
+    """
+    
+    def __init__(self, agent: EchoForgeAgent, host: Optional[str] = None, port: Optional[int] = None):
+        config = agent.config
+        self.agent = agent
+        self.host = host or config.server_host
+        self.port = config.server_port if port is None else port
+        self.max_sessions = config.server_max_sessions
+        self.queue_timeout = config.server_queue_timeout
+        self.executor = ThreadPoolExecutor(max_workers=config.server_workers, thread_name_prefix="echoforge-run")
+        self.sessions: Dict[str, EchoForgeSession] = {}
+        self._connections = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._max_active_runs = config.server_max_active_runs
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    async def start(self) -> int:
+        """Start listening and return the bound port"""
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self._max_active_runs)
+        self.agent.memory.warm_up(background=True)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        print(f"[SERVER] Listening on {self.host}:{self.port}")
+        return self.port
+    
+    async def serve_forever(self) -> None:
+        """Start (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+    
+    async def stop(self) -> None:
+        """Stop accepting connections, end sessions and flush pending writes"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for session in list(self.sessions.values()):
+            session.closed = True
+        # Wait off the loop for in-flight graph steps to finish
+        await asyncio.to_thread(self.executor.shutdown, True)
+        self.agent.close()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = EchoForgeSession(reader, writer)
+        if self._connections >= self.max_sessions:
+            await session.send({"type": "error", "error": "server_full"})
+            writer.close()
+            return
+        self._connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    await session.send({"type": "error", "error": "invalid_json"})
+                    continue
+                if message.get("type") == "close":
+                    break
+                await self._dispatch(session, message)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections -= 1
+            session.closed = True
+            if session.thread_id is not None:
+                self.sessions.pop(session.thread_id, None)
+            writer.close()
+    
+    async def _dispatch(self, session: EchoForgeSession, message: Dict[str, Any]) -> None:
+        kind = message.get("type")
+        if kind == "start":
+            if session.busy():
+                await session.send({"type": "error", "error": "run_in_progress"})
+                return
+            thread_id = message.get("thread_id") or str(uuid.uuid4())
+            user_id = message.get("user_id") or None
+            if user_id is not None:
+                try:
+                    validate_user_id(user_id)
+                except ValueError:
+                    await session.send({"type": "error", "error": "invalid_user_id"})
+                    return
+            if thread_id in self.sessions and self.sessions[thread_id] is not session:
+                await session.send({"type": "error", "error": "thread_in_use"})
+                return
+            # A second start rebinds the connection; release the thread it held before
+            if session.thread_id is not None and session.thread_id != thread_id:
+                self.sessions.pop(session.thread_id, None)
+                session.waiting = False
+            session.thread_id = thread_id
+            self.sessions[thread_id] = session
+            await session.send({"type": "session", "thread_id": thread_id})
+            
+            # Reconnecting to a paused session re-asks its question instead of starting over
+            question = await self._loop.run_in_executor(self.executor, self.agent.pending_question, thread_id)
+            if question is not None:
+                session.waiting = True
+                await session.send({"type": "question", "text": question})
+                return
+            session.run_task = asyncio.create_task(self._step(session, self.agent.start_session, thread_id, user_id))
+        elif kind == "reply":
+            if not session.waiting or session.busy():
+                await session.send({"type": "error", "error": "no_question_pending"})
+                return
+            session.waiting = False
+            session.run_task = asyncio.create_task(
+                self._step(session, self.agent.resume_session, session.thread_id, str(message.get("text", "")))
+            )
+        elif kind == "feedback":
+            if session.thread_id is None:
+                await session.send({"type": "error", "error": "no_session"})
+                return
+            record = await self._loop.run_in_executor(
+                self.executor, lambda: self.agent.record_feedback(
+                    message.get("human_response", ""),
+                    reflections=message.get("reflections", ""),
+                    ai_evaluation=message.get("ai_evaluation", ""),
+                    thread_id=session.thread_id
+                )
+            )
+            if record is None:
+                await session.send({"type": "error", "error": "nothing_to_record"})
+            else:
+                await session.send({"type": "feedback_recorded", "url": record["url"]})
+        else:
+            await session.send({"type": "error", "error": f"unknown_type:{kind}"})
+    
+    async def _step(self, session: EchoForgeSession, step, *args) -> None:
+        """Advance the session's graph on the pool once a slot is free, until it asks or ends"""
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            await session.send({"type": "error", "error": "busy"})
+            return
+        try:
+            turn = await self._loop.run_in_executor(self.executor, step, *args)
+        except Exception as e:
+            await session.send({"type": "error", "error": str(e)})
+            return
+        finally:
+            self._slots.release()
+        
+        if turn["question"] is not None:
+            session.waiting = True
+            await session.send({"type": "question", "text": turn["question"]})
+        else:
+            values = turn["values"]
+            await session.send({
+                "type": "result",
+                "status": values.get("status", ""),
+                "ai_response": values.get("ai_response", ""),
+                "echo_degradation": values.get("echo_degradation", "")
+            })
+
+
+def main(argv=None) -> None:
+    """Run the EchoForge server until interrupted"""
+    parser = argparse.ArgumentParser(description="EchoForge multi-session server")
+    parser.add_argument("--config", default="config/echoforge.yaml")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args(argv)
+    
+    server = EchoForgeServer(EchoForgeAgent(args.config), host=args.host, port=args.port)
+    
+    async def serve():
+        try:
+            await server.serve_forever()
+        finally:
+            await server.stop()
+    
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n[SERVER] Shutting down")
+
+
+if __name__ == "__main__":
+    main()
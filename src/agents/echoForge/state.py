@@ -35,3 +35,5 @@ class EchoModeState(MessagesState):
     human_response: str  # User's preferred response
     reflections: str  # Notes on differences between AI and human responses
     status: str  # Track current status: "collect", "fetch", "exit", "continue", "confirm"
+    echo_degradation: str  # How the echo call degraded to fit its budgets: "full", "no_examples" or "fallback_model"
+    user_id: str  # Tenant whose memory the session uses; empty for the default memory
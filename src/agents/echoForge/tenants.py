@@ -0,0 +1,190 @@
+"""
+EchoForge Tenants: per-user memories kept resident in LRU order under a memory budget
+"""
+from typing import Any, Dict, Iterator, List, Optional
+from collections import OrderedDict
+from contextlib import contextmanager
+import os
+import re
+import threading
+from .config import EchoForgeConfig
+from .memory import EchoForgeMemory
+from src.utils.tracing import get_tracer
+
+
+_USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.@-]{1,128}$")
+
+
+def validate_user_id(user_id: str) -> str:
+    """user_id, if it is safe to use as a directory name"""
+    if not isinstance(user_id, str) or not _USER_ID_PATTERN.match(user_id) or user_id in (".", ".."):
+        raise ValueError(f"Invalid user_id: {user_id!r}")
+    return user_id
+
+
+class TenantMemoryPool:
+    """Per-user EchoForgeMemory instances, loaded on demand and evicted least-recently-used.
+
+    Each tenant lives in <root>/<user_id> with the single-user layout
+    (shared/user_profile.json, echoForge/documents, index and history index),
+    so its profile, documents and vectors are never shared. A tenant's vector
+    store loads on its first retrieval; whenever a tenant is fetched, the
+    least recently used ones are dropped until at most max_resident remain and
+    their estimated size fits memory_budget_mb. Dropped tenants reload from
+    disk on next use.
+
+    Every tenant has its own EchoForgeMemory and index lock, and loading runs
+    outside the pool lock, so one tenant's large index never blocks another
+    tenant's queries. Tenants in use through pinned() are never evicted, so
+    two instances never write the same tenant's files at once. All tenants
+    share one embedding client.
+    """
+
+    def __init__(self, root: str, config: Optional[EchoForgeConfig] = None, max_resident: int = 16,
+                 memory_budget_mb: float = 1024.0):
+        self.root = root
+        self.config = config or EchoForgeConfig()
+        self.max_resident = max(1, max_resident)
+        self.memory_budget_bytes = int(memory_budget_mb * 2 ** 20)
+        self.tracer = get_tracer()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+        self._resident: "OrderedDict[str, EchoForgeMemory]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        # Tenants in use by pinned() callers, with their use counts
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # One embedding client for all tenants; with a PCA reduction each tenant projects over it
+        self._embeddings = None
+        self._embeddings_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: EchoForgeConfig) -> 'TenantMemoryPool':
+        return cls(
+            os.path.join(config.data_dir, "tenants"), config,
+            max_resident=config.tenant_max_resident,
+            memory_budget_mb=config.tenant_memory_budget_mb
+        )
+
+    def path_for(self, user_id: str) -> str:
+        return os.path.join(self.root, validate_user_id(user_id))
+
+    def get(self, user_id: str, pin: bool = False) -> EchoForgeMemory:
+        """The tenant's memory, loading it from disk if it is not resident.
+
+        With pin the tenant stays resident until unpin(); prefer pinned().
+        """
+        validate_user_id(user_id)
+        with self._lock:
+            memory = self._touch(user_id, pin)
+            if memory is not None:
+                return memory
+            loading = self._loading.setdefault(user_id, threading.Lock())
+
+        # Only this tenant's callers wait for its load
+        with loading:
+            with self._lock:
+                memory = self._touch(user_id, pin)
+                if memory is not None:
+                    return memory
+            memory = self._load(user_id)
+            with self._lock:
+                self._resident[user_id] = memory
+                self._loading.pop(user_id, None)
+                self.loads += 1
+                if pin:
+                    self._pins[user_id] = self._pins.get(user_id, 0) + 1
+                self._evict_over_budget()
+        return memory
+
+    @contextmanager
+    def pinned(self, user_id: str) -> Iterator[EchoForgeMemory]:
+        """The tenant's memory, kept resident (not evicted) until the block exits"""
+        memory = self.get(user_id, pin=True)
+        try:
+            yield memory
+        finally:
+            self.unpin(user_id)
+
+    def unpin(self, user_id: str) -> None:
+        """Release one pin taken by get(pin=True), applying the budget if it was the last"""
+        with self._lock:
+            count = self._pins.get(user_id, 0) - 1
+            if count > 0:
+                self._pins[user_id] = count
+            else:
+                self._pins.pop(user_id, None)
+                self._evict_over_budget()
+
+    def _touch(self, user_id: str, pin: bool = False) -> Optional[EchoForgeMemory]:
+        """Mark a resident tenant most recently used and apply the budget; caller holds the lock"""
+        memory = self._resident.get(user_id)
+        if memory is not None:
+            self._resident.move_to_end(user_id)
+            self.hits += 1
+            if pin:
+                self._pins[user_id] = self._pins.get(user_id, 0) + 1
+            self._evict_over_budget()
+        return memory
+
+    def _load(self, user_id: str) -> EchoForgeMemory:
+        with self.tracer.span("tenant.load", user_id=user_id):
+            memory = EchoForgeMemory(self.path_for(user_id), self.config, load_index=False)
+        # The memory builds no embedding client of its own: the first tenant creates the shared one
+        with self._embeddings_lock:
+            if self._embeddings is None:
+                self._embeddings = memory.embeddings
+            elif hasattr(self._embeddings, "fit_documents"):
+                memory.embeddings = type(self._embeddings)(self._embeddings.base, self._embeddings.dim)
+            else:
+                memory.embeddings = self._embeddings
+        return memory
+
+    def _evict_over_budget(self) -> None:
+        """Drop least recently used unpinned tenants, never the most recent one; caller holds the lock"""
+        while len(self._resident) > 1 and (
+            len(self._resident) > self.max_resident or self._resident_bytes() > self.memory_budget_bytes
+        ):
+            most_recent = next(reversed(self._resident))
+            user_id = next((u for u in self._resident if u != most_recent and u not in self._pins), None)
+            if user_id is None:
+                return
+            del self._resident[user_id]
+            self.evictions += 1
+            self.tracer.registry.inc("echoforge_tenant_evictions_total")
+            print(f"[TENANTS] Evicted {user_id}")
+
+    def _resident_bytes(self) -> int:
+        return sum(memory.resident_bytes() for memory in self._resident.values())
+
+    def evict(self, user_id: str) -> bool:
+        """Drop a tenant from memory; False if it was not resident or is pinned"""
+        with self._lock:
+            if user_id in self._pins:
+                return False
+            return self._resident.pop(user_id, None) is not None
+
+    def resident(self) -> List[str]:
+        """Resident tenants, least recently used first"""
+        with self._lock:
+            return list(self._resident)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resident": len(self._resident),
+                "resident_bytes": self._resident_bytes(),
+                "budget_bytes": self.memory_budget_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "pinned": len(self._pins)
+            }
+
+    def close(self) -> None:
+        """Release the shared embedding client"""
+        with self._embeddings_lock:
+            embeddings, self._embeddings = self._embeddings, None
+        if embeddings is not None and hasattr(embeddings, "close"):
+            embeddings.close()
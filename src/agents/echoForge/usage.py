@@ -0,0 +1,184 @@
+"""
+EchoForge Token and Cost Accounting
+"""
+from typing import Any, Dict, Iterator, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from uuid import UUID
+import threading
+from langchain_core.callbacks import BaseCallbackHandler
+from src.utils.tracing import current_thread_id
+
+
+# USD per 1M tokens: (prompt, completion). Override or extend via EchoForgeConfig.model_pricing
+DEFAULT_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "gpt-4.1-nano": (0.1, 0.4),
+    "gpt-3.5-turbo": (0.5, 1.5)
+}
+
+_current_node: ContextVar[Optional[str]] = ContextVar("echoforge_usage_node", default=None)
+_active_scopes: ContextVar[Tuple['UsageTotals', ...]] = ContextVar("echoforge_usage_scopes", default=())
+
+
+class BudgetExceededError(Exception):
+    """Raised when a session exceeds its token or cost budget and budget_action is 'abort'"""
+
+
+@dataclass
+class UsageTotals:
+    """Accumulated token counts and estimated cost"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        return data
+
+
+def current_node() -> Optional[str]:
+    """Node bound by the innermost bind_node block, if any"""
+    return _current_node.get()
+
+
+@contextmanager
+def bind_node(node: str) -> Iterator[None]:
+    """Attribute every LLM call in the with-block to node"""
+    token = _current_node.set(node)
+    try:
+        yield
+    finally:
+        _current_node.reset(token)
+
+
+class UsageTracker:
+    """Rolls token usage and cost up per node and per thread_id, with optional session budgets"""
+
+    def __init__(self, pricing: Optional[Dict[str, Any]] = None, session_token_budget: int = 0,
+                 session_cost_budget: float = 0.0):
+        self.pricing = dict(DEFAULT_PRICING)
+        self.pricing.update({model: tuple(prices) for model, prices in (pricing or {}).items()})
+        self.session_token_budget = session_token_budget
+        self.session_cost_budget = session_cost_budget
+        self._totals = UsageTotals()
+        self._by_node: Dict[str, UsageTotals] = {}
+        self._by_thread: Dict[str, UsageTotals] = {}
+        self._by_thread_node: Dict[Tuple[str, str], UsageTotals] = {}
+        self._lock = threading.Lock()
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated USD cost; unknown models fall back to the longest matching price-table prefix"""
+        prices = self.pricing.get(model)
+        if prices is None:
+            matches = [name for name in self.pricing if model.startswith(name)]
+            prices = self.pricing[max(matches, key=len)] if matches else (0.0, 0.0)
+        return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+
+    def record(self, model: str, prompt_tokens: int, completion_tokens: int,
+               node: Optional[str] = None, thread_id: Optional[str] = None) -> float:
+        """Record one LLM call and return its estimated cost"""
+        node = node or _current_node.get() or "unattributed"
+        thread_id = thread_id or current_thread_id() or "no_thread"
+        cost = self.estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            self._totals.add(prompt_tokens, completion_tokens, cost)
+            self._by_node.setdefault(node, UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            self._by_thread.setdefault(thread_id, UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            self._by_thread_node.setdefault((thread_id, node), UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            for scope in _active_scopes.get():
+                scope.add(prompt_tokens, completion_tokens, cost)
+        return cost
+
+    @contextmanager
+    def scope(self) -> Iterator[UsageTotals]:
+        """Collect usage of every call made in the with-block (e.g. one echo call)"""
+        totals = UsageTotals()
+        token = _active_scopes.set(_active_scopes.get() + (totals,))
+        try:
+            yield totals
+        finally:
+            _active_scopes.reset(token)
+
+    def summary(self, thread_id: Optional[str] = None) -> Dict[str, Any]:
+        """Totals and per-node breakdown, for one thread_id or the whole process"""
+        with self._lock:
+            if thread_id is None:
+                total = self._totals.to_dict()
+                by_node = {node: totals.to_dict() for node, totals in self._by_node.items()}
+            else:
+                total = self._by_thread.get(thread_id, UsageTotals()).to_dict()
+                by_node = {node: totals.to_dict() for (tid, node), totals in self._by_thread_node.items() if tid == thread_id}
+            threads = list(self._by_thread) if thread_id is None else [thread_id]
+        return {"total": total, "by_node": by_node, "threads": threads}
+
+    def session_totals(self, thread_id: str) -> UsageTotals:
+        """Usage accumulated so far by one thread_id"""
+        with self._lock:
+            totals = self._by_thread.get(thread_id, UsageTotals())
+            return UsageTotals(totals.calls, totals.prompt_tokens, totals.completion_tokens, totals.cost)
+
+    def over_budget(self, thread_id: Optional[str]) -> bool:
+        """Whether a session has used up its token or cost budget (0 means unlimited)"""
+        if thread_id is None:
+            return False
+        totals = self.session_totals(thread_id)
+        if self.session_token_budget and totals.total_tokens >= self.session_token_budget:
+            return True
+        if self.session_cost_budget and totals.cost >= self.session_cost_budget:
+            return True
+        return False
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler feeding chat model token usage into a UsageTracker"""
+
+    def __init__(self, tracker: UsageTracker):
+        self.tracker = tracker
+        self._models: Dict[UUID, str] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[Dict] = None,
+                            invocation_params: Optional[Dict] = None, **kwargs: Any) -> None:
+        params = invocation_params or {}
+        self._models[run_id] = (
+            (metadata or {}).get("ls_model_name")
+            or params.get("model") or params.get("model_name") or params.get("_type") or "unknown"
+        )
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        model = self._models.pop(run_id, "unknown")
+        prompt_tokens, completion_tokens = _extract_usage(response)
+        if prompt_tokens or completion_tokens:
+            self.tracker.record(model, prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._models.pop(run_id, None)
+
+
+def _extract_usage(response) -> Tuple[int, int]:
+    """Prompt/completion token counts from an LLMResult"""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
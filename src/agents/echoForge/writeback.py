@@ -0,0 +1,86 @@
+"""
+EchoForge Write-Behind Queue: persists finished sessions off the interactive path
+"""
+from typing import Any, Callable, Dict, List
+import queue
+import threading
+
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Collects records and hands them to a writer in batches on a background thread.
+    
+    enqueue() never blocks on I/O. The worker flushes when batch_size records
+    are waiting or flush_interval seconds have passed since the first one
+    arrived. close() flushes whatever is still queued.
+    """
+    
+    def __init__(self, writer: Callable[[List[Dict[str, Any]]], None], batch_size: int = 16,
+                 flush_interval: float = 2.0):
+        self.writer = writer
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.flushed_batches = 0
+        self.flushed_records = 0
+        self.failed_records = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="echoforge-writeback", daemon=True)
+        self._worker.start()
+    
+    def enqueue(self, record: Dict[str, Any]) -> None:
+        """Queue one record for persistence"""
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+        self._queue.put(record)
+    
+    def pending(self) -> int:
+        """Records queued but not yet handed to the writer"""
+        return self._queue.qsize()
+    
+    def flush(self) -> None:
+        """Block until everything queued so far has been written"""
+        self._queue.join()
+    
+    def close(self) -> None:
+        """Flush remaining records and stop the worker (idempotent)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+    
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                self._queue.task_done()
+                break
+            batch = [first]
+            taken = 1
+        
+            # Collect more records until the batch is full or the interval elapses
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+        
+            try:
+                self.writer(batch)
+                self.flushed_batches += 1
+                self.flushed_records += len(batch)
+            except Exception as e:
+                self.failed_records += len(batch)
+                print(f"[WRITEBACK] Failed to persist {len(batch)} record(s): {e}")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
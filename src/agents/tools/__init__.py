@@ -1,5 +1,7 @@
 """Tools for EchoForge agent"""
 
-from .echoforge_tools import ask_human
+from .echoforge_tools import (
+    INTERRUPTIBLE_KEY, ask_human, make_search_post_history_tool, read_human_reply, set_input_provider
+)
 
-__all__ = ["ask_human"]
+__all__ = ["INTERRUPTIBLE_KEY", "ask_human", "make_search_post_history_tool", "read_human_reply", "set_input_provider"]
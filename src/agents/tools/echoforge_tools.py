@@ -1,8 +1,30 @@
 """
 EchoForge Tools
 """
-from typing import Annotated
+from typing import Annotated, Callable, Optional
+import json
 from langchain_core.tools import tool
+from langgraph.config import get_config
+from langgraph.types import interrupt
+
+
+# Set in the configurable of graph runs whose checkpointer can persist interrupts
+INTERRUPTIBLE_KEY = "echoforge_interruptible"
+
+# Source of human replies; offline runs swap in scripted replies
+_input_provider: Optional[Callable[[str], str]] = None
+
+
+def set_input_provider(provider: Optional[Callable[[str], str]] = None) -> None:
+    """Route human replies through provider (None restores input())"""
+    global _input_provider
+    _input_provider = provider
+
+
+def read_human_reply(question: str) -> str:
+    """Print a question and read the reply from the console (or the input provider)"""
+    print(f"[Agent]: {question}")
+    return (_input_provider or input)("[Your response]: ")
 
 
 @tool
@@ -10,10 +32,60 @@ def ask_human(question: Annotated[str, "The question to ask the user"]) -> str:
     """
     Ask the user a question and wait for their response.
     """
-    # Print the question
-    print(f"[Agent]: {question}")
+    # Inside a checkpointed graph run, suspend on an interrupt: the waiting session
+    # holds no thread, and resuming it with Command(resume=reply) returns the reply here
+    if _in_checkpointed_run():
+        return interrupt(question)
     
     # Get user response
-    response = input("[Your response]: ")
+    return read_human_reply(question)
+
+
+def _in_checkpointed_run() -> bool:
+    """Whether the caller runs inside a graph run marked with INTERRUPTIBLE_KEY, so interrupts can be persisted"""
+    try:
+        config = get_config()
+    except RuntimeError:
+        return False
+    return bool(config.get("configurable", {}).get(INTERRUPTIBLE_KEY))
+
+
+def make_search_post_history_tool(memory):
+    """Build a search_post_history tool bound to an EchoForgeMemory archive.
+    
+    memory may also be a callable returning the archive to search, resolved
+    on every call (e.g. the current session's tenant).
+    """
+    resolve = memory if not hasattr(memory, "search_posts_by_title") else (lambda: memory)
+    
+    @tool
+    def search_post_history(
+        title_query: Annotated[str, "Words from the post title; the last word may be partial"] = "",
+        url: Annotated[str, "Exact url of the post"] = "",
+        page: Annotated[int, "Result page, starting at 1"] = 1
+    ) -> str:
+        """
+        Search archived posts by url or by title words. With neither, list the most recent posts.
+        """
+        memory = resolve()
+        if url:
+            post = memory.get_post_by_url(url)
+            posts = [post] if post else []
+        elif title_query:
+            posts = memory.search_posts_by_title(title_query, page=page, page_size=10)
+        else:
+            posts = memory.list_posts(page=page, page_size=10)
+        
+        if not posts:
+            return "No matching posts found."
+        return json.dumps([
+            {
+                "url": post.get("url", ""),
+                "context": post.get("context", ""),
+                "title": post.get("title", ""),
+                "timestamp": post.get("timestamp", "")
+            }
+            for post in posts
+        ], indent=2)
     
-    return response
+    return search_post_history
\ No newline at end of file
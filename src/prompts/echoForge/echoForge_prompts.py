@@ -1,8 +1,11 @@
 """
 EchoForge Prompt Builder
 """
-from typing import Dict, List, Any
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
 import json
+import os
+import threading
 
 
 class EchoForgePrompts:
@@ -58,65 +61,144 @@ RULES:
 Keep the conversation focused and use the ask_human tool for all user interactions."""
     
     @staticmethod
-    def build_echo_prompt(context: str, title: str, content: str, user_profile: dict, relevant_notes: list) -> str:
-        """Build the prompt for echo mode response generation"""
-        
-        # Format user profile with XML-style tags
-        if user_profile:
-            profile_lines = []
-            for key, value in user_profile.items():
-                if isinstance(value, dict):
-                    profile_lines.append(f"<{key}>")
-                    for sub_key, sub_value in value.items():
-                        profile_lines.append(f"  <{sub_key}>{sub_value}</{sub_key}>")
-                    profile_lines.append(f"</{key}>")
-                elif isinstance(value, list):
-                    profile_lines.append(f"<{key}>")
-                    for item in value:
-                        profile_lines.append(f"  <item>{item}</item>")
-                    profile_lines.append(f"</{key}>")
-                else:
-                    profile_lines.append(f"<{key}>{value}</{key}>")
-            profile_text = "\n".join(profile_lines)
-        else:
-            profile_text = "<no_profile>No profile data available</no_profile>"
-        
-        # Format relevant notes with XML-style tags and numbering
-        if relevant_notes:
-            notes_text = ""
-            for i, note in enumerate(relevant_notes, 1):
-                notes_text += f"<example_{i}>\n"
-                notes_text += f"  <context>{note.get('context', 'Unknown')}</context>\n"
-                notes_text += f"  <title>{note.get('title', 'N/A')}</title>\n"
-                notes_text += f"  <content>{note.get('content', 'N/A')}</content>\n"
-                notes_text += f"  <human_response>{note.get('human_response', 'N/A')}</human_response>\n"
-                if note.get('similarity_dist'):
-                    notes_text += f"  <similarity_dist>{note.get('similarity_dist')}</similarity_dist>\n"
-                notes_text += f"</example_{i}>\n\n"
-        else:
-            notes_text = "<no_examples>No relevant historical examples found.</no_examples>"
-        
-        prompt = f"""You are responding as if you were the user. Generate a response that matches their communication style, tone, knowledge, values, and preferences.
+    def fetch_from_history_system_prompt() -> str:
+        """System prompt for fetching an existing post from records"""
+        return """You are helping the user pick an existing post from their records to work on.
+
+Your goal is to find the one post the user means and guide the user back to the task if they go off topic.
 
-<current_post>
-  <context>{context}</context>
-  <title>{title}</title>
-  <content>{content}</content>
-</current_post>
+RULES:
+1. Use ask_human tool to ask which post they want (a url, words from its title, or "the most recent ones").
+2. Use search_post_history tool to look posts up by url or title words, or to list recent posts. Show the user the matches and ask them to pick one if there are several.
+3. After the user confirms a single post (not before!), append ONE final AI message that starts with "SELECTED_POST:" followed by the exact url of that post, e.g.
+   SELECTED_POST: https://example.com/posts/42
+4. If at any point the user wants to exit/quit/stop, or no matching post exists and they do not want to search again, the conversation should stop immediately. Your final message should simply state: "User wants to exit"
+
+Keep the conversation focused and use the ask_human tool for all user interactions."""
+    
+    @staticmethod
+    def build_echo_prompt(context: str, title: str, content: str, user_profile: dict, relevant_notes: list) -> str:
+        """Build the prompt for echo mode response generation (uncached; see EchoPromptAssembler)"""
+        return EchoPromptAssembler().build(context, title, content, user_profile, relevant_notes)[0]
 
-<user_profile>
-{profile_text}
-</user_profile>
 
-<relevant_historical_examples>
-{notes_text}</relevant_historical_examples>
+# Static instructions lead the prompt so every echo call shares them as a cacheable prefix
+ECHO_INSTRUCTIONS = """You are responding as if you were the user. Generate a response that matches their communication style, tone, knowledge, values, and preferences.
 
-Based on the context, title, and content above, generate a response that:
+Based on the user profile, the relevant historical examples and the current post below, generate a response that:
 1. Matches the user's communication style and tone
 2. Reflects their knowledge and expertise areas
 3. Aligns with their values and preferences
 4. Is appropriate for the given context
 
-Response:"""
+"""
+
+
+def render_user_profile(user_profile: dict) -> str:
+    """Format the user profile with XML-style tags"""
+    if not user_profile:
+        return "<no_profile>No profile data available</no_profile>"
+    
+    profile_lines = []
+    for key, value in user_profile.items():
+        if isinstance(value, dict):
+            profile_lines.append(f"<{key}>")
+            for sub_key, sub_value in value.items():
+                profile_lines.append(f"  <{sub_key}>{sub_value}</{sub_key}>")
+            profile_lines.append(f"</{key}>")
+        elif isinstance(value, list):
+            profile_lines.append(f"<{key}>")
+            for item in value:
+                profile_lines.append(f"  <item>{item}</item>")
+            profile_lines.append(f"</{key}>")
+        else:
+            profile_lines.append(f"<{key}>{value}</{key}>")
+    return "\n".join(profile_lines)
+
+
+def render_examples(relevant_notes: list) -> str:
+    """Format relevant notes with XML-style tags and numbering"""
+    if not relevant_notes:
+        return "<no_examples>No relevant historical examples found.</no_examples>"
+    
+    parts = []
+    for i, note in enumerate(relevant_notes, 1):
+        parts.append(f"<example_{i}>\n")
+        parts.append(f"  <context>{note.get('context', 'Unknown')}</context>\n")
+        parts.append(f"  <title>{note.get('title', 'N/A')}</title>\n")
+        parts.append(f"  <content>{note.get('content', 'N/A')}</content>\n")
+        parts.append(f"  <human_response>{note.get('human_response', 'N/A')}</human_response>\n")
+        if note.get('similarity_dist'):
+            parts.append(f"  <similarity_dist>{note.get('similarity_dist')}</similarity_dist>\n")
+        parts.append(f"</example_{i}>\n\n")
+    return "".join(parts)
+
+
+class EchoPromptAssembler:
+    """Assembles echo prompts static-first so consecutive calls share the longest cacheable prefix.
+    
+    Segment order: instructions, user profile, historical examples, current post.
+    The instructions+profile prefix is rendered once per profile and memoized by its
+    content, so sessions of different users (tenants) can share one assembler. The
+    prefix report compares each prompt with the previous prompt of the same session.
+    """
+    
+    def __init__(self, max_profiles: int = 256, max_sessions: int = 4096):
+        self.max_profiles = max_profiles
+        self.max_sessions = max_sessions
+        self._prefixes: "OrderedDict[str, str]" = OrderedDict()
+        self._previous_prompts: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def static_prefix(self, user_profile: dict) -> str:
+        """Instructions + rendered profile, rendered once per distinct profile content"""
+        profile_key = json.dumps(user_profile, sort_keys=True, default=str)
+        with self._lock:
+            prefix = self._prefixes.get(profile_key)
+            if prefix is not None:
+                self._prefixes.move_to_end(profile_key)
+                return prefix
+        prefix = f"{ECHO_INSTRUCTIONS}<user_profile>\n{render_user_profile(user_profile)}\n</user_profile>\n\n"
+        with self._lock:
+            self._prefixes[profile_key] = prefix
+            while len(self._prefixes) > self.max_profiles:
+                self._prefixes.popitem(last=False)
+        return prefix
+    
+    def build(self, context: str, title: str, content: str, user_profile: dict, relevant_notes: list,
+              session: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+        """Build the echo prompt; returns (prompt, report of how much of it is a reusable prefix).
+        
+        session (e.g. the thread_id) selects the previous prompt the shared prefix is
+        measured against; without one the shared prefix is 0.
+        """
+        static_prefix = self.static_prefix(user_profile)
+        prompt = "".join([
+            static_prefix,
+            "<relevant_historical_examples>\n",
+            render_examples(relevant_notes),
+            "</relevant_historical_examples>\n\n",
+            "<current_post>\n",
+            f"  <context>{context}</context>\n",
+            f"  <title>{title}</title>\n",
+            f"  <content>{content}</content>\n",
+            "</current_post>\n\n",
+            "Response:"
+        ])
         
-        return prompt
+        previous = ""
+        if session is not None:
+            with self._lock:
+                previous = self._previous_prompts.pop(session, "")
+                self._previous_prompts[session] = prompt
+                while len(self._previous_prompts) > self.max_sessions:
+                    self._previous_prompts.popitem(last=False)
+        shared = len(os.path.commonprefix([previous, prompt]))
+        report = {
+            "prompt_chars": len(prompt),
+            "static_prefix_chars": len(static_prefix),
+            "shared_prefix_chars": shared,
+            # ~4 characters per token; providers cache whole-token prefixes
+            "shared_prefix_tokens_est": shared // 4
+        }
+        return prompt, report
@@ -0,0 +1,160 @@
+"""
+EchoForge Shared HTTP Connection Pool
+"""
+from typing import Any, Dict, Optional
+import threading
+import httpx
+
+
+class HTTPPool:
+    """Process-wide keep-alive connection pool shared by every model and embedding client.
+
+    One sync and one async httpx client are created lazily and handed to the
+    OpenAI-backed clients as http_client / http_async_client. Connection
+    setup is counted through httpcore trace events, so stats() shows how many
+    requests were served on reused connections.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0, write_timeout: float = 30.0, pool_timeout: float = 10.0):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout, read=read_timeout, write=write_timeout, pool=pool_timeout
+        )
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._counts = {"requests": 0, "connections_opened": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config) -> 'HTTPPool':
+        """Build from EchoForgeConfig http_* settings"""
+        return cls(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+            connect_timeout=config.http_connect_timeout,
+            read_timeout=config.http_read_timeout,
+            write_timeout=config.http_write_timeout,
+            pool_timeout=config.http_pool_timeout
+        )
+
+    def request_timeout(self, read: Optional[float] = None) -> httpx.Timeout:
+        """The pool's timeouts for one client's requests, with read replaced when given.
+
+        OpenAI clients send their own timeout with every request, overriding
+        the httpx client's, so they must be handed this explicitly.
+        """
+        if not read:
+            return self.timeout
+        return httpx.Timeout(
+            connect=self.timeout.connect, read=read, write=self.timeout.write, pool=self.timeout.pool
+        )
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared synchronous client"""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    limits=self.limits, timeout=self.timeout,
+                    event_hooks={"request": [self._on_request], "response": [self._on_response]}
+                )
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The shared asynchronous client"""
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(
+                    limits=self.limits, timeout=self.timeout,
+                    event_hooks={"request": [self._on_async_request], "response": [self._on_async_response]}
+                )
+            return self._async_client
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] += 1
+
+    def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self._count("connections_opened")
+
+    async def _async_trace(self, event: str, info: Dict[str, Any]) -> None:
+        self._trace(event, info)
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        request.extensions["trace"] = self._trace
+
+    async def _on_async_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        request.extensions["trace"] = self._async_trace
+
+    def _on_response(self, response: httpx.Response) -> None:
+        if response.status_code >= 500:
+            self._count("errors")
+
+    async def _on_async_response(self, response: httpx.Response) -> None:
+        self._on_response(response)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request/connection counters plus the current pool occupancy"""
+        with self._lock:
+            stats = dict(self._counts)
+        stats["reused_connections"] = max(0, stats["requests"] - stats["connections_opened"])
+        open_connections = idle_connections = 0
+        for client in (self._client, self._async_client):
+            # httpcore's pool is not part of httpx's public API; report zero if it moves
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            for connection in getattr(pool, "connections", []):
+                open_connections += 1
+                idle_connections += int(connection.is_idle())
+        stats["open_connections"] = open_connections
+        stats["idle_connections"] = idle_connections
+        stats["max_connections"] = self.limits.max_connections
+        stats["max_keepalive_connections"] = self.limits.max_keepalive_connections
+        return stats
+
+    def close(self) -> None:
+        """Close the sync client; the async one is closed by aclose()"""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self) -> None:
+        """Close both clients"""
+        self.close()
+        with self._lock:
+            client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.aclose()
+
+
+_pool: Optional[HTTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool(config=None) -> HTTPPool:
+    """Return the process-wide pool, creating it from config (or defaults) on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HTTPPool.from_config(config) if config is not None else HTTPPool()
+        return _pool
+
+
+def reset_http_pool() -> None:
+    """Drop the process-wide pool (closing its sync client) so the next get_http_pool builds a fresh one"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,42 @@
+"""
+Deferred imports for heavy optional-at-startup dependencies
+"""
+from typing import Any, Dict
+import importlib
+
+
+class LazyImports:
+    """Module-level names imported on first use.
+
+    Install in a module as
+
+        _lazy = LazyImports(globals(), {"FAISS": "langchain_community.vectorstores:FAISS"})
+        __getattr__ = _lazy.module_getattr
+
+    and resolve names with _lazy.get("FAISS"). Once imported, a name is cached
+    in the module globals, so unittest.mock.patch("pkg.module.FAISS") works
+    exactly as it does for an eager import.
+    """
+
+    def __init__(self, namespace: Dict[str, Any], targets: Dict[str, str]):
+        self.namespace = namespace
+        self.targets = targets
+
+    def get(self, name: str) -> Any:
+        """The object bound to name, importing it on first use"""
+        try:
+            return self.namespace[name]
+        except KeyError:
+            pass
+        module_name, _, attribute = self.targets[name].partition(":")
+        value = importlib.import_module(module_name)
+        if attribute:
+            value = getattr(value, attribute)
+        self.namespace[name] = value
+        return value
+
+    def module_getattr(self, name: str) -> Any:
+        """PEP 562 module __getattr__ resolving the deferred names"""
+        if name in self.targets:
+            return self.get(name)
+        raise AttributeError(f"module {self.namespace.get('__name__')!r} has no attribute {name!r}")
@@ -0,0 +1,293 @@
+"""
+EchoForge Tracing and Metrics Utilities
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from uuid import UUID
+import json
+import math
+import os
+import threading
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+SPAN_METRIC = "echoforge_span_seconds"
+QUANTILES = (0.5, 0.95, 0.99)
+# Control-flow exceptions that suspend a graph run rather than fail it
+SUSPEND_EXCEPTIONS = ("GraphInterrupt", "NodeInterrupt")
+
+_current_thread_id: ContextVar[Optional[str]] = ContextVar("echoforge_thread_id", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("echoforge_span", default=None)
+
+
+def current_thread_id() -> Optional[str]:
+    """thread_id bound by the innermost Tracer.bind_thread block, if any"""
+    return _current_thread_id.get()
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class MetricsRegistry:
+    """In-process registry of counters and latency summaries"""
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._samples: Dict[Tuple[str, Tuple], deque] = {}
+        self._totals: Dict[Tuple[str, Tuple], Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Increment a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record one observation of a summary metric (a bounded window is kept for percentiles)"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.max_samples)
+                self._totals[key] = (0, 0.0)
+            self._samples[key].append(value)
+            count, total = self._totals[key]
+            self._totals[key] = (count + 1, total + value)
+
+    def counter(self, name: str, **labels: Any) -> float:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0.0)
+
+    def summary(self, name: str, **labels: Any) -> Dict[str, float]:
+        """Count, sum and p50/p95/p99 of a summary metric"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            values = sorted(self._samples.get(key, ()))
+            count, total = self._totals.get(key, (0, 0.0))
+        result = {"count": count, "sum": total}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = percentile(values, q)
+        return result
+
+    def to_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {key: (sorted(values), self._totals[key]) for key, values in self._samples.items()}
+
+        lines = []
+        for name in sorted({key[0] for key in counters}):
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name in sorted({key[0] for key in summaries}):
+            lines.append(f"# TYPE {name} summary")
+            for (metric, labels), (values, (count, total)) in sorted(summaries.items()):
+                if metric != name:
+                    continue
+                for q in QUANTILES:
+                    lines.append(f"{name}{_format_labels(labels + (('quantile', str(q)),))} {percentile(values, q)}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Write the text exposition to a file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(self.to_text())
+
+    def reset(self) -> None:
+        """Drop all recorded metrics"""
+        with self._lock:
+            self._counters.clear()
+            self._samples.clear()
+            self._totals.clear()
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+class _NoopSpan:
+    """Shared span returned when tracing is disabled"""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation; recorded to the tracer when the with-block exits"""
+
+    def __init__(self, tracer: 'Tracer', name: str, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.parent: Optional[str] = None
+        self._token = None
+        self._start = 0.0
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes to the span record"""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> 'Span':
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self.name)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        if exc_type is None:
+            status = "ok"
+        elif exc_type.__name__ in SUSPEND_EXCEPTIONS:
+            status = "interrupted"
+        else:
+            status = f"error:{exc_type.__name__}"
+        self.tracer.record(self.name, duration, parent=self.parent, status=status, **self.attrs)
+        return False
+
+
+class Tracer:
+    """Span-style tracer writing a JSON-lines log and feeding a MetricsRegistry"""
+
+    def __init__(self, enabled: bool = False, log_file: Optional[str] = None,
+                 registry: Optional[MetricsRegistry] = None):
+        self.enabled = enabled
+        self.log_file = log_file
+        self.registry = registry or MetricsRegistry()
+        self._log = None
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs: Any):
+        """Time a with-block as a span named name"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def record(self, name: str, duration: float, parent: Optional[str] = None,
+               status: str = "ok", **attrs: Any) -> None:
+        """Record a finished span measured elsewhere (e.g. by a callback handler)"""
+        if not self.enabled:
+            return
+        self.registry.observe(SPAN_METRIC, duration, span=name)
+        if status.startswith("error"):
+            self.registry.inc("echoforge_span_errors_total", span=name)
+        if self.log_file:
+            entry = {
+                "ts": datetime.now().isoformat(),
+                "span": name,
+                "duration_ms": round(duration * 1000, 3),
+                "thread_id": _current_thread_id.get(),
+                "parent": parent,
+                "status": status
+            }
+            entry.update(attrs)
+            line = json.dumps(entry, default=str) + "\n"
+            with self._lock:
+                if self._log is None:
+                    directory = os.path.dirname(self.log_file)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._log = open(self.log_file, 'a', buffering=1)
+                self._log.write(line)
+
+    @contextmanager
+    def bind_thread(self, thread_id: Optional[str]) -> Iterator[None]:
+        """Correlate every span in the with-block with a conversation thread_id"""
+        token = _current_thread_id.set(thread_id)
+        try:
+            yield
+        finally:
+            _current_thread_id.reset(token)
+
+    def close(self) -> None:
+        """Close the structured log file"""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler that records every chat model and tool call as a span"""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+        self._starts: Dict[UUID, Tuple[str, float, Optional[str]]] = {}
+
+    def _start(self, run_id: UUID, name: str) -> None:
+        self._starts[run_id] = (name, time.perf_counter(), _current_span.get())
+
+    def _end(self, run_id: UUID, status: str = "ok") -> None:
+        started = self._starts.pop(run_id, None)
+        if started is not None:
+            name, start, parent = started
+            self.tracer.record(name, time.perf_counter() - start, parent=parent, status=status)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, "llm.call")
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, f"error:{type(error).__name__}")
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, f"tool.{(serialized or {}).get('name', 'unknown')}")
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id, f"error:{type(error).__name__}")
+
+
+# Process-wide tracer; disabled (no-op) until configured
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    return _tracer
+
+
+def configure_tracing(enabled: bool, log_file: Optional[str] = None) -> Tracer:
+    """Enable or disable the process-wide tracer, keeping its metrics registry"""
+    _tracer.close()
+    _tracer.enabled = enabled
+    _tracer.log_file = log_file
+    return _tracer
@@ -3,10 +3,14 @@ Unit tests for EchoForgeAgent
 """
 import pytest
 import tempfile
+import threading
 import yaml
 import os
 from unittest.mock import patch, MagicMock
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, END
 from src.agents.echoForge.agent import EchoForgeAgent
+from src.agents.tools import INTERRUPTIBLE_KEY, ask_human, set_input_provider
 
 
 class TestEchoForgeAgent:
@@ -85,3 +89,83 @@ class TestEchoForgeAgent:
         # This should work with the default config/echoforge.yaml
         agent = EchoForgeAgent()
         assert agent.graph is not None
+
+
+class TestInterruptibleSessions:
+    """Test human questions suspend sessions on graph interrupts"""
+    
+    def test_session_pauses_and_resumes(self, make_agent):
+        """Test a session stops at each question and resumes with the reply"""
+        agent = make_agent()
+        
+        turn = agent.start_session("s1")
+        assert turn["question"] == "What would you like to work on today?"
+        assert agent.pending_question("s1") == turn["question"]
+        
+        for reply in ["new post", "LinkedIn / AI / body", "yes"]:
+            assert turn["question"] is not None
+            turn = agent.resume_session("s1", reply)
+        
+        assert turn["question"] is None
+        assert turn["values"]["status"] == "echo"
+        tool_messages = [m.content for m in turn["values"]["messages"] if m.type == "tool"]
+        assert tool_messages == ["new post", "LinkedIn / AI / body", "yes"]
+        with pytest.raises(ValueError):
+            agent.resume_session("s1", "again")
+    
+    def test_idle_sessions_hold_no_threads(self, make_agent):
+        """Test many paused sessions keep only checkpointed state"""
+        agent = make_agent(script=[{"tool": "ask_human", "args": {"question": "Hello?"}}])
+        threads_before = threading.active_count()
+        
+        for i in range(200):
+            assert agent.start_session(f"idle-{i}")["question"] == "Hello?"
+        
+        assert threading.active_count() <= threads_before + 2
+        assert agent.pending_question("idle-199") == "Hello?"
+        assert agent.resume_session("idle-7", "hi")["question"] == "Hello?"
+    
+    def test_ask_human_interrupts_only_marked_runs(self):
+        """Test ask_human interrupts runs marked interruptible and reads the console otherwise"""
+        graph = StateGraph(dict)
+        graph.add_node("ask", lambda state: {"reply": ask_human.invoke({"question": "Hello?"})})
+        graph.set_entry_point("ask")
+        graph.add_edge("ask", END)
+        app = graph.compile(checkpointer=MemorySaver())
+        
+        set_input_provider(lambda prompt: "from console")
+        try:
+            assert app.invoke({}, {"configurable": {"thread_id": "plain"}})["reply"] == "from console"
+            result = app.invoke({}, {"configurable": {"thread_id": "marked", INTERRUPTIBLE_KEY: True}})
+        finally:
+            set_input_provider(None)
+        
+        assert result["__interrupt__"][0].value == "Hello?"
+
+
+class TestNodeModels:
+    """Test per-node model tiers"""
+    
+    @patch('src.agents.echoForge.agent.ChatOpenAI')
+    def test_nodes_get_configured_models(self, mock_chat_openai, make_agent):
+        """Test nodes use their configured model and share clients per (model, temperature)"""
+        mock_chat_openai.side_effect = lambda **kwargs: MagicMock(name=kwargs["model"])
+        fast = {"model": "gpt-4o-mini", "temperature": 0.0}
+        
+        agent = make_agent(llm_provider="openai", llm_model="gpt-4o", node_models={
+            "gather_intent": fast, "collect_post_info": fast, "structured_parse": {"model": "gpt-4o-mini"}
+        })
+        
+        assert agent.llm_for("gather_intent") is agent.llm_for("collect_post_info")
+        assert agent.llm_for("gather_intent") is not agent.llm
+        assert agent.llm_for("echo") is agent.llm
+        assert agent.llm_for("fetch_from_history") is agent.llm
+        # structured_parse inherits llm_temperature, so it is a separate client
+        assert agent.llm_for("structured_parse") is not agent.llm_for("gather_intent")
+        created = sorted((c.kwargs["model"], c.kwargs["temperature"]) for c in mock_chat_openai.call_args_list)
+        assert created == [("gpt-4o", 0.7), ("gpt-4o-mini", 0.0), ("gpt-4o-mini", 0.7)]
+    
+    def test_unknown_node_rejected(self, make_agent):
+        """Test a typo in node_models fails fast"""
+        with pytest.raises(ValueError):
+            make_agent(node_models={"gather_intnet": {"model": "gpt-4o-mini"}})
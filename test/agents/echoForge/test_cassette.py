@@ -0,0 +1,85 @@
+"""
+Unit tests for EchoForge session cassettes
+"""
+import json
+import os
+import tempfile
+import pytest
+from src.agents.echoForge.cassette import CassetteChatModel, CassetteMismatchError, human_replies, load_cassette
+
+
+REPLIES = ["new post", "LinkedIn / AI / body", "yes"]
+
+
+def run(agent, thread_id, replies=REPLIES):
+    turn = agent.start_session(thread_id)
+    for reply in replies:
+        turn = agent.resume_session(thread_id, reply)
+    return turn
+
+
+def record(make_agent, temp_dir, sessions=1):
+    path = os.path.join(temp_dir, "sessions.json")
+    agent = make_agent(cassette_record_file=path)
+    turns = [run(agent, f"rec-{i}") for i in range(sessions)]
+    agent.close()
+    return path, agent, turns
+
+
+class TestCassetteRecording:
+    """Test cases for recording sessions"""
+    
+    def test_records_model_replies_and_human_answers(self, make_agent, tmp_path):
+        """Test each thread gets its model calls, structured parse and human replies in order"""
+        path, _, _ = record(make_agent, tmp_path, sessions=2)
+        cassette = load_cassette(path)
+        
+        assert cassette["model"] == "gpt-4"
+        assert [session["thread_id"] for session in cassette["sessions"]] == ["rec-0", "rec-1"]
+        events = cassette["sessions"][0]["events"]
+        assert [e["type"] for e in events] == ["model", "human", "model", "model", "human", "model", "human",
+                                               "model", "structured", "model"]
+        assert human_replies(events) == REPLIES
+        assert events[1]["question"] == "What would you like to work on today?"
+        assert events[-1]["node"] == "echo"
+        assert events[-2]["output"]["context"] == "LinkedIn"
+    
+    def test_usage_counted_once_while_recording(self, make_agent, tmp_path):
+        """Test the recording wrapper does not double count the wrapped model's tokens"""
+        _, recording_agent, _ = record(make_agent, tmp_path)
+        plain = make_agent()
+        run(plain, "plain")
+        
+        assert recording_agent.get_usage("rec-0")["total"]["calls"] == plain.get_usage("plain")["total"]["calls"] == 6
+
+
+class TestCassetteReplay:
+    """Test cases for replaying sessions"""
+    
+    def test_replay_reproduces_session(self, make_agent, tmp_path):
+        """Test a replayed session ends in the same state with the same usage"""
+        path, recording_agent, turns = record(make_agent, tmp_path)
+        agent = make_agent(llm_provider="replay", cassette_file=path, cassette_latency_scale=0.0)
+        
+        replayed = run(agent, "replay")
+        
+        assert replayed["values"]["ai_response"] == turns[0]["values"]["ai_response"]
+        assert replayed["values"]["post_info"] == turns[0]["values"]["post_info"]
+        assert agent.get_usage("replay")["total"] == recording_agent.get_usage("rec-0")["total"]
+    
+    def test_divergent_session_raises(self):
+        """Test a thread asking for calls beyond its recording gets CassetteMismatchError"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "short.json")
+            with open(path, 'w') as f:
+                json.dump({"version": 1, "model": "gpt-4", "sessions": [{"thread_id": "t", "events": [
+                    {"type": "model", "latency": 0.0, "message": {"content": "hello"}}
+                ]}]}, f)
+            model = CassetteChatModel.from_file(path, latency_scale=0.0)
+        
+            assert model.invoke("hi").content == "hello"
+            with pytest.raises(CassetteMismatchError):
+                model.invoke("again")
+            model.assign("no_thread", 0)
+            with pytest.raises(CassetteMismatchError):
+                model.with_structured_output(dict).invoke("parse")
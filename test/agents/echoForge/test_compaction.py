@@ -0,0 +1,115 @@
+"""
+Unit tests for EchoForge state compaction
+"""
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_openai.chat_models.base import _convert_message_to_dict
+from src.agents.echoForge.compaction import compact_messages, is_instruction
+from src.agents.echoForge.fakes import FakeChatModel
+
+
+PROMPT = "You are EchoForge. Gather the user's intent."
+
+
+def search_exchange(call_id="c1"):
+    return [
+        AIMessage(content="", tool_calls=[{"name": "search_post_history", "args": {}, "id": call_id}]),
+        ToolMessage(content='[{"url": "u1"}]', tool_call_id=call_id, name="search_post_history")
+    ]
+
+
+class TestCompactMessages:
+    """Test cases for compact_messages"""
+    
+    def test_instructions_deduped(self):
+        """Test system messages and AI copies of known prompts are dropped"""
+        messages = [AIMessage(content=PROMPT, name="EchoForge"), SystemMessage(content="other"),
+                    HumanMessage(content="hi"), AIMessage(content=PROMPT, name="EchoForge")]
+        
+        assert [m.content for m in compact_messages(messages, [PROMPT])] == ["hi"]
+        assert is_instruction({"role": "system", "content": "x"})
+        assert not is_instruction(AIMessage(content="a reply"), [PROMPT])
+    
+    def test_request_has_no_orphaned_raw_calls(self):
+        """Test a compacted message carrying OpenAI's raw tool calls is sent with only the calls it kept"""
+        raw = [{"id": "c2", "type": "function", "function": {"name": "search_post_history", "arguments": "{}"}},
+               {"id": "a2", "type": "function", "function": {"name": "ask_human", "arguments": "{}"}}]
+        mixed = AIMessage(content="", additional_kwargs={"tool_calls": raw}, tool_calls=[
+            {"name": "search_post_history", "args": {}, "id": "c2"}, {"name": "ask_human", "args": {}, "id": "a2"}
+        ])
+        searching = AIMessage(content="Searching", additional_kwargs={"tool_calls": raw[:1]},
+                              tool_calls=[{"name": "search_post_history", "args": {}, "id": "c2"}])
+        
+        for message, kept in ((mixed, ["a2"]), (searching, [])):
+            replies = [ToolMessage(content="[]", tool_call_id=c["id"]) for c in message.tool_calls]
+            request = [_convert_message_to_dict(m) for m in compact_messages([message] + replies)]
+            
+            assert [c["id"] for c in request[0].get("tool_calls", [])] == kept
+            assert [m["tool_call_id"] for m in request[1:]] == kept
+        assert [c["id"] for c in mixed.additional_kwargs["tool_calls"]] == ["c2", "a2"]
+    
+    def test_finished_search_chatter_dropped(self):
+        """Test answered search calls go with their results; ask_human exchanges stay"""
+        ask = [
+            AIMessage(content="", tool_calls=[{"name": "ask_human", "args": {"question": "Which?"}, "id": "a1"}]),
+            ToolMessage(content="the hiring one", tool_call_id="a1", name="ask_human")
+        ]
+        mixed = AIMessage(content="", tool_calls=[
+            {"name": "search_post_history", "args": {}, "id": "c2"},
+            {"name": "ask_human", "args": {"question": "More?"}, "id": "a2"}
+        ])
+        messages = ask + search_exchange() + [mixed, ToolMessage(content="[]", tool_call_id="c2"),
+                                               ToolMessage(content="no", tool_call_id="a2")]
+        
+        compacted = compact_messages(messages)
+        
+        assert [m.type for m in compacted] == ["ai", "tool", "ai", "tool"]
+        assert [c["id"] for c in compacted[2].tool_calls] == ["a2"]
+        assert [c["id"] for c in mixed.tool_calls] == ["c2", "a2"]
+    
+    def test_pending_call_kept(self):
+        """Test a search call without a result yet is left for the running sub-agent"""
+        pending = search_exchange()[:1]
+        
+        assert compact_messages(pending) == pending
+
+
+class TestAgentCompaction:
+    """Test system prompts and compaction in graph runs"""
+    
+    def test_one_system_prompt_per_call(self, make_agent, monkeypatch):
+        """Test each model call gets its node's prompt once, and none is checkpointed"""
+        agent = make_agent()
+        seen = []
+        generate = FakeChatModel._generate
+        
+        def recording_generate(model, messages, *args, **kwargs):
+            seen.append([m for m in messages if m.type == "system"])
+            return generate(model, messages, *args, **kwargs)
+        
+        monkeypatch.setattr(FakeChatModel, "_generate", recording_generate)
+        for _ in range(2):
+            turn = agent.start_session("s1")
+            for reply in ["new post", "LinkedIn / AI / body", "yes"]:
+                turn = agent.resume_session("s1", reply)
+        
+        react_calls = [system for system in seen if system]
+        assert all(len(system) == 1 for system in react_calls)
+        assert {system[0].content for system in react_calls} == {
+            agent.prompt_builder.intent_gathering_system_prompt(),
+            agent.prompt_builder.collect_post_info_system_prompt()
+        }
+        messages = turn["values"]["messages"]
+        assert len(messages) == 18
+        assert not any(is_instruction(m, agent._instruction_prompts()) for m in messages)
+    
+    def test_legacy_prompt_copies_removed(self, make_agent):
+        """Test prompt copies stored as AI messages by older checkpoints are dropped on the next run"""
+        agent = make_agent()
+        prompt = agent.prompt_builder.intent_gathering_system_prompt()
+        state = dict(agent._initial_state(), messages=[AIMessage(content=prompt, name="EchoForge") for _ in range(3)])
+        
+        agent._advance("s1", state)
+        agent.resume_session("s1", "new post")
+        values = agent.graph.get_state(agent.memory.create_config("s1")).values
+        
+        assert not any(m.content == prompt for m in values["messages"])
@@ -0,0 +1,136 @@
+"""
+Unit tests for EchoForge near-duplicate detection
+"""
+import tempfile
+import pytest
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.dedupe import NearDuplicateIndex, collapse_near_duplicates, lsh_params, shingles
+from src.agents.echoForge.memory import EchoForgeMemory
+
+
+POST = ("We just open sourced our vector search benchmark suite after six months of work. It covers "
+        "recall latency and memory for twelve index types across three dataset sizes and the results surprised us")
+
+
+def post(url, content=POST, response="Congrats to the team", reflections="", context="LinkedIn"):
+    return {"url": url, "context": context, "title": "Benchmark release", "content": content,
+            "human_response": response, "reflections": reflections, "timestamp": "2024-01-01T00:00:00"}
+
+
+class TestNearDuplicateIndex:
+    """Test cases for NearDuplicateIndex class"""
+    
+    def test_shingles(self):
+        """Test word shingles, with short texts kept whole"""
+        assert shingles("The quick brown Fox", 3) == {"the quick brown", "quick brown fox"}
+        assert shingles("Hi there", 3) == {"hi there"}
+        assert shingles("  ", 3) == set()
+    
+    def test_lsh_params_cover_threshold(self):
+        """Test the band split puts the S-curve midpoint just below the threshold"""
+        bands, rows = lsh_params(0.8, 128)
+        
+        assert bands * rows == 128
+        assert 0.6 < (1.0 / bands) ** (1.0 / rows) <= 0.8
+    
+    def test_edited_repost_matches_and_unrelated_does_not(self):
+        """Test a lightly edited copy is found and a different post is not"""
+        index = NearDuplicateIndex(threshold=0.7)
+        index.add("original", index.signature(POST))
+        
+        edited = POST.replace("six months", "half a year").replace("surprised us", "surprised us!")
+        unrelated = "Hiring two backend engineers for our platform team in Berlin, remote friendly, apply below"
+        
+        matches = index.query(index.signature(edited))
+        assert [key for key, _ in matches] == ["original"]
+        assert matches[0][1] >= 0.7
+        assert index.query(index.signature(unrelated)) == []
+        assert index.query(index.signature("")) == []
+    
+    def test_invalid_threshold(self):
+        """Test thresholds outside (0, 1] are rejected"""
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(threshold=0.0)
+
+
+class TestCollapseNearDuplicates:
+    """Test cases for collapse_near_duplicates"""
+    
+    def test_keeps_best_response_per_cluster(self):
+        """Test a cluster of cross-posts collapses to the copy with the best human_response"""
+        records = [
+            post("a", response="Nice"),
+            post("b", context="Twitter", response="Congrats, the latency numbers are impressive", reflections="good"),
+            post("c", content="Something else entirely about gardening tomatoes in raised beds this spring"),
+            post("d", context="Reddit", response="")
+        ]
+        
+        kept, report = collapse_near_duplicates(records, NearDuplicateIndex(threshold=0.8))
+        
+        assert [record["url"] for record in kept] == ["b", "c"]
+        assert report["removed"] == 2
+        assert report["clusters"] == 1
+        assert report["removed_fraction"] == 0.5
+        assert report["removed_chars"] > 0
+    
+    def test_existing_posts_win(self):
+        """Test copies of an already indexed post are dropped"""
+        existing = NearDuplicateIndex(threshold=0.8)
+        existing.add(0, existing.signature(POST))
+        
+        kept, report = collapse_near_duplicates([post("a"), post("b")], existing)
+        
+        assert kept == []
+        assert report["removed_existing"] == 2
+    
+    def test_better_copy_replaces_stored_response(self):
+        """Test the best incoming copy of a stored post is reported when its response beats the stored one"""
+        stored = [post("a", response="Nice")]
+        existing = NearDuplicateIndex(threshold=0.8)
+        existing.add(0, existing.signature(POST))
+        better = post("b", response="Congrats, the latency numbers are impressive", reflections="good")
+        
+        kept, report = collapse_near_duplicates([post("c", response="Cool stuff"), better, post("d")], existing, stored)
+        assert kept == []
+        assert report["replaced"] == 1 and report["replacements"] == {0: better}
+        
+        _, report = collapse_near_duplicates([post("e", response="")], existing, stored)
+        assert report["replacements"] == {}
+
+
+class TestMemoryNearDuplicates:
+    """Test near-duplicate collapse against EchoForgeMemory"""
+    
+    def test_stored_and_appended_posts_are_checked(self):
+        """Test the index covers both loaded posts and posts appended afterwards"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = EchoForgeConfig(embedding_provider="fake", embedding_dim=32)
+            EchoForgeMemory(temp_dir, config).append_documents([post("a")])
+        
+            memory = EchoForgeMemory(temp_dir, config, load_index=False)
+            kept, report = memory.collapse_near_duplicates([post("b", context="Twitter")])
+            assert kept == [] and report["removed_existing"] == 1
+        
+            other = post("c", content="A thread on how we cut our cloud bill in half by moving batch jobs to spot instances")
+            memory.append_documents([other])
+            kept, _ = memory.collapse_near_duplicates([dict(other, url="d")])
+            assert kept == []
+    
+    def test_better_copy_updates_stored_post(self):
+        """Test a stored post takes over the response of a better incoming copy, also after a reload"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = EchoForgeConfig(embedding_provider="fake", embedding_dim=32, confidence_threshold=0.0)
+            memory = EchoForgeMemory(temp_dir, config)
+            memory.append_documents([post("a", response="Nice")])
+            better = post("b", context="Twitter", response="Congrats, the latency numbers are impressive")
+            
+            kept, report = memory.collapse_near_duplicates([better])
+            memory.save_indexes()
+            
+            assert kept == [] and report["replaced"] == 1
+            reloaded = EchoForgeMemory(temp_dir, config)
+            stored = reloaded.get_post_by_url("a")
+            assert (stored["context"], stored["human_response"]) == ("LinkedIn", better["human_response"])
+            hit = reloaded.get_relevant_context("<title>Benchmark release</title>", limit=1)[0]
+            assert hit["human_response"] == better["human_response"]
+            assert reloaded.vector_store.index.ntotal == 1
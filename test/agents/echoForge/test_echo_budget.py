@@ -0,0 +1,190 @@
+"""
+Unit tests for the EchoForge echo latency budget
+"""
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from src.agents.echoForge.echo_budget import DeadlineRunner, EchoDeadline, LatencyWindow, worst_level
+from src.agents.echoForge.fakes import FakeChatModel, LatencyModel
+from src.agents.echoForge.request_policy import RequestTimeoutError
+
+
+@pytest.fixture
+def make_agent(make_agent):
+    """Agents without prefetch or write-behind threads, so echo timings are the only moving part"""
+    return functools.partial(make_agent, prefetch_enabled=False, writeback_enabled=False)
+
+
+def _slow_retrieval(seconds):
+    def retrieve(query):
+        time.sleep(seconds)
+        return [{"context": "LinkedIn", "title": "Old", "content": "Old post"}]
+    return retrieve
+
+
+class TestEchoBudgetHelpers:
+    """Test cases for the deadline, latency window and runner"""
+    
+    def test_deadline_split(self):
+        """Test retrieval gets its share of the budget and generation the rest"""
+        deadline = EchoDeadline(2.0, retrieval_share=0.25)
+        
+        assert 0.4 < deadline.retrieval_timeout() <= 0.5
+        assert 1.9 < deadline.remaining() <= 2.0
+        assert EchoDeadline(0).remaining() is None and EchoDeadline(0).retrieval_timeout() is None
+        assert worst_level("full", "fallback_model", "no_examples") == "fallback_model"
+    
+    def test_latency_window(self):
+        """Test the latency estimate needs min_samples and follows the quantile"""
+        window = LatencyWindow(quantile=0.9, min_samples=3)
+        window.observe(0.1)
+        window.observe(0.2)
+        
+        assert window.estimate() is None
+        for latency in (0.3, 0.4, 5.0):
+            window.observe(latency)
+        assert window.estimate() == 5.0
+    
+    def test_latency_samples_expire(self):
+        """Test old samples stop counting so a slow model is tried again later"""
+        window = LatencyWindow(min_samples=2, max_age=0.05)
+        window.observe(5.0)
+        window.observe(5.0)
+        assert window.estimate() == 5.0
+        
+        time.sleep(0.1)
+        assert window.estimate() is None
+    
+    def test_runner_stops_waiting(self):
+        """Test a call missing its timeout is abandoned and errors propagate"""
+        runner = DeadlineRunner()
+        
+        start = time.perf_counter()
+        assert runner.run(lambda: time.sleep(1) or "late", 0.05) == (False, None)
+        assert time.perf_counter() - start < 0.5
+        assert runner.run(lambda: "done", 1.0) == (True, "done")
+        assert runner.run(lambda: "inline", None) == (True, "inline")
+        try:
+            runner.run(lambda: 1 / 0, 1.0)
+            assert False, "error not raised"
+        except ZeroDivisionError:
+            pass
+        runner.close()
+
+
+class TestEchoDegradation:
+    """Test echo calls degrading to fit their latency budget"""
+    
+    def test_full_without_budget(self, make_agent):
+        """Test echo without a budget retrieves and reports no degradation"""
+        agent = make_agent()
+        agent.llm = FakeChatModel(script=[{"content": "reply"}])
+        agent._retrieve_examples = _slow_retrieval(0.05)
+        
+        response, report = agent.echo_with_report("LinkedIn", "AI", "Body")
+        
+        assert response == "reply"
+        assert report["level"] == "full" and report["reasons"] == []
+    
+    def test_slow_retrieval_skips_examples(self, make_agent):
+        """Test retrieval missing its slice is abandoned and echo goes on without examples"""
+        agent = make_agent(echo_latency_budget=1.0, echo_retrieval_share=0.1)
+        agent.llm = FakeChatModel(script=[{"content": "reply"}])
+        agent._retrieve_examples = _slow_retrieval(2.0)
+        prompts = []
+        agent.echo_prompt_assembler.build = lambda *args, **kwargs: (prompts.append(args) or "prompt", {})
+        
+        start = time.perf_counter()
+        assert agent.echo("LinkedIn", "AI", "Body") == "reply"
+        
+        assert time.perf_counter() - start < 1.0
+        assert prompts[0][-1] == []
+        assert agent.last_echo_report["level"] == "no_examples"
+        assert agent.last_echo_report["reasons"] == ["retrieval_deadline"]
+    
+    def test_retrieval_error_skips_examples(self, make_agent):
+        """Test a failing retrieval degrades instead of failing the echo under a budget"""
+        agent = make_agent()
+        agent.llm = FakeChatModel(script=[{"content": "reply"}])
+        agent._retrieve_examples = lambda query: 1 / 0
+        
+        response, report = agent.echo_with_report("LinkedIn", "AI", "Body", budget=5.0)
+        
+        assert response == "reply"
+        assert report["reasons"] == ["retrieval_error"]
+    
+    def test_fallback_model_when_generation_cannot_fit(self, make_agent):
+        """Test the fallback model answers once the primary's recent latency exceeds the time left"""
+        agent = make_agent(echo_latency_budget=1.0, echo_fallback_model="small-model")
+        agent.llm = FakeChatModel(script=[{"content": "primary"}])
+        agent._llms[("small-model", agent.config.llm_temperature)] = FakeChatModel(script=[{"content": "fallback"}])
+        agent._retrieve_examples = lambda query: []
+        for _ in range(5):
+            agent.echo_latency.observe(3.0)
+        
+        response, report = agent.echo_with_report("LinkedIn", "AI", "Body")
+        
+        assert response == "fallback"
+        assert report["level"] == "fallback_model"
+        assert report["reasons"] == ["generation_deadline"]
+        # A call with enough time stays on the primary model
+        assert agent.echo("LinkedIn", "AI", "Body", budget=10.0) == "primary"
+        assert agent.last_echo_report["level"] == "full"
+    
+    def test_generation_bounded_by_remaining_time(self, make_agent):
+        """Test a primary model slower than the time left is abandoned for the fallback model"""
+        agent = make_agent(echo_latency_budget=0.3, echo_fallback_model="small-model")
+        agent.llm = FakeChatModel(script=[{"content": "primary"}], latency=LatencyModel("constant", 2.0))
+        agent._llms[("small-model", agent.config.llm_temperature)] = FakeChatModel(script=[{"content": "fallback"}])
+        agent._retrieve_examples = lambda query: []
+        
+        start = time.perf_counter()
+        response, report = agent.echo_with_report("LinkedIn", "AI", "Body")
+        
+        assert time.perf_counter() - start < 1.0
+        assert response == "fallback"
+        assert report["reasons"] == ["generation_timeout"]
+        assert agent.get_request_stats()["timeouts"] == 1
+    
+    def test_generation_timeout_without_fallback(self, make_agent):
+        """Test the budget is enforced even when there is no model to fall back to"""
+        agent = make_agent(echo_latency_budget=0.2)
+        agent.llm = FakeChatModel(script=[{"content": "primary"}], latency=LatencyModel("constant", 2.0))
+        agent._retrieve_examples = lambda query: []
+        
+        with pytest.raises(RequestTimeoutError):
+            agent.echo("LinkedIn", "AI", "Body")
+    
+    def test_level_in_session_state(self, make_agent):
+        """Test the degradation level reaches the caller through the session state"""
+        agent = make_agent(echo_latency_budget=1.0, echo_retrieval_share=0.05)
+        agent._retrieve_examples = _slow_retrieval(1.0)
+        
+        turn = agent.start_session("budgeted")
+        for reply in ("new post", "LinkedIn / AI / body", "yes"):
+            turn = agent.resume_session("budgeted", reply)
+        
+        assert turn["question"] is None
+        assert turn["values"]["echo_degradation"] == "no_examples"
+    
+    def test_abandoned_retrievals_do_not_starve_later_echoes(self, make_agent):
+        """Test echoes arriving while abandoned retrievals still run get their examples"""
+        agent = make_agent(echo_latency_budget=2.0, echo_retrieval_share=0.25, server_max_active_runs=8)
+        agent.llm = FakeChatModel(script=[{"content": "reply"}])
+        slow = threading.Event()
+        slow.set()
+        
+        def retrieve(query):
+            time.sleep(2.0 if slow.is_set() else 0.05)
+            return [{"context": "LinkedIn", "title": "Old", "content": "Old post"}]
+        
+        agent._retrieve_examples = retrieve
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            stalled = list(pool.map(lambda _: agent.echo_with_report("LinkedIn", "AI", "Body")[1], range(8)))
+            slow.clear()
+            served = list(pool.map(lambda _: agent.echo_with_report("LinkedIn", "AI", "Body")[1], range(8)))
+        
+        assert {report["level"] for report in stalled} == {"no_examples"}
+        assert {report["level"] for report in served} == {"full"}
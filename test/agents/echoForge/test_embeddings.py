@@ -0,0 +1,96 @@
+"""
+Unit tests for EchoForge embedding backends
+"""
+import pytest
+import numpy as np
+from src.agents.echoForge.embeddings import HashingEmbeddings, ProjectedEmbeddings
+
+
+class TestHashingEmbeddings:
+    """Test cases for HashingEmbeddings class"""
+    
+    def test_query_vector_shape_and_norm(self):
+        """Test query vectors have the configured dimension and unit norm"""
+        embeddings = HashingEmbeddings(dim=64)
+        vector = embeddings.embed_query("Discussion about AI ethics")
+        
+        assert len(vector) == 64
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-5)
+    
+    def test_empty_text_is_zero_vector(self):
+        """Test that text without tokens embeds to a zero vector"""
+        embeddings = HashingEmbeddings(dim=32)
+        
+        assert embeddings.embed_query("") == [0.0] * 32
+        assert embeddings.embed_documents([]) == []
+    
+    def test_deterministic(self):
+        """Test that the same text always produces the same vector"""
+        first = HashingEmbeddings(dim=128).embed_query("LinkedIn post about hiring")
+        second = HashingEmbeddings(dim=128).embed_query("LinkedIn post about hiring")
+        
+        assert first == second
+    
+    def test_similar_texts_score_higher(self):
+        """Test that overlapping texts are closer than unrelated ones"""
+        embeddings = HashingEmbeddings(dim=512)
+        query = np.array(embeddings.embed_query("AI ethics in healthcare"))
+        related = np.array(embeddings.embed_query("the ethics of AI in healthcare"))
+        unrelated = np.array(embeddings.embed_query("weekend hiking trip photos"))
+        
+        assert query @ related > query @ unrelated
+    
+    def test_process_pool_matches_serial(self):
+        """Test that batched process-pool encoding matches in-process encoding"""
+        texts = [f"post number {i} about topic {i % 7}" for i in range(50)]
+        serial = HashingEmbeddings(dim=64, batch_size=8, workers=1).embed_documents(texts)
+        
+        pooled_embeddings = HashingEmbeddings(dim=64, batch_size=8, workers=2)
+        try:
+            pooled = pooled_embeddings.embed_documents(texts)
+            start_method = pooled_embeddings._get_pool()._mp_context.get_start_method()
+        finally:
+            pooled_embeddings.close()
+        
+        assert np.allclose(serial, pooled)
+        assert start_method != "fork"
+    
+    def test_backend_id(self):
+        """Test backend identifier includes the dimension"""
+        assert HashingEmbeddings(dim=256).backend_id == "hashing:dim=256"
+
+
+class TestProjectedEmbeddings:
+    """Test cases for ProjectedEmbeddings class"""
+    
+    def test_fit_and_project(self):
+        """Test documents and queries come out at the reduced size with similarities kept"""
+        texts = [f"post about topic {i} and {i % 3} things" for i in range(40)]
+        base = HashingEmbeddings(dim=128, workers=1)
+        projected = ProjectedEmbeddings(base, dim=32)
+        
+        vectors = np.array(projected.fit_documents(texts))
+        query = np.array(projected.embed_query(texts[0]))
+        
+        assert vectors.shape == (40, 32)
+        assert query.shape == (32,)
+        assert np.allclose(np.array(projected.embed_documents(texts[:1]))[0], vectors[0], atol=1e-5)
+        assert np.argmax(vectors @ query) == 0
+        assert projected.backend_id == "hashing:dim=128|pca=32"
+    
+    def test_unfitted_projection_raises(self):
+        """Test the projection must be fitted before use"""
+        with pytest.raises(RuntimeError):
+            ProjectedEmbeddings(HashingEmbeddings(dim=16, workers=1), dim=4).embed_query("hello")
+    
+    def test_save_and_load(self, tmp_path):
+        """Test a saved projection is restored, and one of another size is refused"""
+        projected = ProjectedEmbeddings(HashingEmbeddings(dim=16, workers=1), dim=4)
+        projected.fit_documents(["a b c", "c d e", "e f g", "g h i", "i j k"])
+        path = str(tmp_path / "projection.npy")
+        projected.save(path)
+        
+        restored = ProjectedEmbeddings(HashingEmbeddings(dim=16, workers=1), dim=4)
+        assert restored.load(path)
+        assert restored.embed_query("a b c") == projected.embed_query("a b c")
+        assert not ProjectedEmbeddings(HashingEmbeddings(dim=16, workers=1), dim=8).load(path)
@@ -0,0 +1,115 @@
+"""
+Unit tests for EchoForge fake providers
+"""
+import pytest
+from langchain_core.messages import HumanMessage
+from src.agents.echoForge.fakes import FakeChatModel, FakeEmbeddings, LatencyModel, ScriptedHuman
+from src.agents.echoForge.state import PostSchema
+from src.agents.tools import set_input_provider
+from src.utils.tracing import get_tracer
+
+
+class TestLatencyModel:
+    """Test cases for LatencyModel class"""
+    
+    def test_constant(self):
+        """Test constant distribution always returns the mean"""
+        latency = LatencyModel("constant", mean=0.25)
+        
+        assert latency.sample() == 0.25
+    
+    def test_seeded_distributions_are_reproducible(self):
+        """Test the same seed yields the same latency sequence"""
+        for distribution in ("uniform", "normal", "lognormal"):
+            first = LatencyModel(distribution, mean=0.5, stddev=0.2, low=0.1, high=0.9, seed=7)
+            second = LatencyModel(distribution, mean=0.5, stddev=0.2, low=0.1, high=0.9, seed=7)
+            
+            samples = [first.sample() for _ in range(20)]
+            assert samples == [second.sample() for _ in range(20)]
+            assert all(s >= 0 for s in samples)
+    
+    def test_unknown_distribution(self):
+        """Test unknown distributions are rejected"""
+        with pytest.raises(ValueError):
+            LatencyModel("pareto")
+
+
+class TestFakeChatModel:
+    """Test cases for FakeChatModel class"""
+    
+    def test_scripted_replies_in_order(self):
+        """Test replies follow the script, including tool calls and cycling"""
+        model = FakeChatModel(script=[
+            {"tool": "ask_human", "args": {"question": "What now?"}},
+            {"content": "OPTION_1"}
+        ])
+        
+        first = model.invoke([HumanMessage(content="hi")])
+        second = model.invoke([HumanMessage(content="hi")])
+        third = model.invoke([HumanMessage(content="hi")])
+        
+        assert first.tool_calls[0]["name"] == "ask_human"
+        assert first.tool_calls[0]["args"] == {"question": "What now?"}
+        assert second.content == "OPTION_1"
+        assert third.tool_calls[0]["name"] == "ask_human"
+        assert second.usage_metadata["total_tokens"] > 0
+    
+    def test_threads_keep_their_own_position(self):
+        """Test each thread walks the script on its own and tool call ids stay unique"""
+        model = FakeChatModel(script=[
+            {"tool": "ask_human", "args": {"question": "What now?"}},
+            {"content": "OPTION_1"}
+        ])
+        tracer = get_tracer()
+        
+        with tracer.bind_thread("t1"):
+            first = model.invoke([HumanMessage(content="hi")])
+        with tracer.bind_thread("t2"):
+            other = model.invoke([HumanMessage(content="hi")])
+        with tracer.bind_thread("t1"):
+            second = model.invoke([HumanMessage(content="hi")])
+        
+        assert first.tool_calls[0]["name"] == "ask_human"
+        assert other.tool_calls[0]["name"] == "ask_human"
+        assert second.content == "OPTION_1"
+        assert first.tool_calls[0]["id"] != other.tool_calls[0]["id"]
+    
+    def test_collected_info_and_structured_output(self):
+        """Test COLLECTED_INFO payloads parse through with_structured_output"""
+        model = FakeChatModel(script=[
+            {"collected_info": {"context": "LinkedIn", "title": "AI", "content": "Body"}}
+        ])
+        
+        message = model.invoke("confirm")
+        parsed = model.with_structured_output(PostSchema).invoke(message.content)
+        
+        assert message.content.startswith("COLLECTED_INFO:")
+        assert parsed == PostSchema(context="LinkedIn", title="AI", content="Body")
+
+
+class TestFakeEmbeddings:
+    """Test cases for FakeEmbeddings class"""
+    
+    def test_latency_applied(self):
+        """Test that embedding calls wait for the sampled latency"""
+        embeddings = FakeEmbeddings(dim=16, latency=LatencyModel("constant", mean=0.01))
+        
+        assert len(embeddings.embed_query("hello")) == 16
+
+
+class TestOfflineGraph:
+    """Test a full graph traversal with fake providers"""
+    
+    def test_chat_runs_offline(self, make_agent):
+        """Test chat reaches echo with scripted model and human replies"""
+        agent = make_agent()
+        set_input_provider(ScriptedHuman(["new post", "LinkedIn / AI / body", "yes"]))
+        try:
+            agent.chat()
+        finally:
+            set_input_provider(None)
+        
+        state = agent.graph.get_state(agent.memory.get_config()).values
+        assert state["status"] == "echo"
+        assert state["post_info"]["context"] == "LinkedIn"
+        assert "human in the loop" in state["messages"][-1].content
@@ -0,0 +1,127 @@
+"""
+Unit tests for PostHistoryIndex and the fetch_from_history node
+"""
+import pytest
+import tempfile
+import json
+import os
+from unittest.mock import patch
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.fakes import FakeChatModel, ScriptedHuman
+from src.agents.echoForge.history_index import PostHistoryIndex
+from src.agents.echoForge.memory import EchoForgeMemory
+from src.agents.tools import set_input_provider
+
+
+POSTS = [
+    {"url": "u0", "title": "AI ethics in healthcare", "context": "LinkedIn", "content": "c0", "timestamp": "2024-03-01T00:00:00"},
+    {"url": "u1", "title": "Hiring AI engineers", "context": "LinkedIn", "content": "c1", "timestamp": "2024-01-01T00:00:00"},
+    {"url": "u2", "title": "Weekend hiking", "context": "Discord", "content": "c2", "timestamp": "2024-02-01T00:00:00"},
+    {"url": "u3", "title": "Healthcare startups", "context": "Twitter", "content": "c3", "timestamp": "2024-04-01T00:00:00"}
+]
+
+
+class TestPostHistoryIndex:
+    """Test cases for PostHistoryIndex class"""
+    
+    def test_url_lookup(self):
+        """Test hash lookup by url"""
+        index = PostHistoryIndex.build(POSTS)
+        
+        assert index.get_by_url("u2") == 2
+        assert index.get_by_url("missing") is None
+    
+    def test_time_listing_and_pagination(self):
+        """Test timestamp-ordered listing, ranges and pages"""
+        index = PostHistoryIndex.build(POSTS)
+        
+        assert index.list_by_time(limit=10) == [3, 0, 2, 1]
+        assert index.list_by_time(limit=2, offset=2) == [2, 1]
+        assert index.list_by_time(limit=10, newest_first=False) == [1, 2, 0, 3]
+        assert index.list_by_time(start="2024-02-01", end="2024-04-01", limit=10) == [0, 2]
+        assert index.list_by_time(offset=10) == []
+    
+    def test_title_search(self):
+        """Test token and prefix title search"""
+        index = PostHistoryIndex.build(POSTS)
+        
+        assert sorted(index.search_title("healthcare")) == [0, 3]
+        assert sorted(index.search_title("health")) == [0, 3]
+        assert index.search_title("ai health") == [0]
+        assert index.search_title("AI Hir") == [1]
+        assert index.search_title("quantum") == []
+        assert index.search_title("") == []
+    
+    def test_add_keeps_indexes_sorted(self):
+        """Test incremental additions are searchable and time-ordered"""
+        index = PostHistoryIndex.build(POSTS)
+        index.add(4, {"url": "u4", "title": "Quantum computing", "timestamp": "2024-02-15T00:00:00"})
+        
+        assert index.get_by_url("u4") == 4
+        assert index.search_title("quant") == [4]
+        assert index.list_by_time(start="2024-02-01", end="2024-03-01", limit=10) == [4, 2]
+    
+    def test_persistence(self):
+        """Test indexes round-trip through disk and are rejected for other documents"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "index.json")
+            PostHistoryIndex.build(POSTS, fingerprint="abc").save(path)
+            
+            loaded = PostHistoryIndex.load(path, "abc")
+            assert loaded.get_by_url("u3") == 3
+            assert sorted(loaded.search_title("health")) == [0, 3]
+            assert loaded.list_by_time(limit=1) == [3]
+            assert PostHistoryIndex.load(path, "other") is None
+    
+    def test_memory_persists_history_index(self):
+        """Test memory loads persisted indexes instead of rebuilding at startup"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, "echoForge"))
+            with open(os.path.join(temp_dir, "echoForge", "echoForge_documents.json"), 'w') as f:
+                json.dump(POSTS, f)
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=32)
+            
+            memory = EchoForgeMemory(temp_dir, config)
+            assert os.path.exists(memory.history_index_file)
+            assert memory.get_post_by_url("u1")["title"] == "Hiring AI engineers"
+            assert [p["url"] for p in memory.list_posts(page=2, page_size=2)] == ["u2", "u1"]
+            
+            with patch.object(PostHistoryIndex, 'build') as mock_build:
+                EchoForgeMemory(temp_dir, config)
+                mock_build.assert_not_called()
+
+
+class TestFetchFromHistory:
+    """Test the fetch_from_history graph path"""
+    
+    def test_fetch_then_echo(self, make_agent, tmp_path):
+        """Test a post selected from records is echoed"""
+        os.makedirs(os.path.join(tmp_path, "echoForge"))
+        with open(os.path.join(tmp_path, "echoForge", "echoForge_documents.json"), 'w') as f:
+            json.dump(POSTS, f)
+        
+        agent = make_agent(embedding_dim=32)
+        agent.llm = FakeChatModel(script=[
+            {"tool": "ask_human", "args": {"question": "What would you like to do?"}},
+            {"content": "The user wants to fetch an existing post. OPTION_2"},
+            {"tool": "search_post_history", "args": {"title_query": "hiring"}},
+            {"tool": "ask_human", "args": {"question": "Is it 'Hiring AI engineers'?"}},
+            {"content": "SELECTED_POST: u1"},
+            {"content": "Echoed reply"}
+        ], cycle=False)
+        search = agent.search_post_history.func
+        tool_outputs = []
+        agent.search_post_history.func = lambda **kwargs: tool_outputs.append(search(**kwargs)) or tool_outputs[-1]
+        set_input_provider(ScriptedHuman(["an old post", "yes"]))
+        try:
+            agent.chat()
+        finally:
+            set_input_provider(None)
+        
+        state = agent.graph.get_state(agent.memory.get_config()).values
+        assert state["post_info"]["title"] == "Hiring AI engineers"
+        assert state["status"] == "echo"
+        assert state["messages"][-1].content == "Echoed reply"
+        assert "u1" in tool_outputs[0]
+        # Finished search results are compacted out of the checkpointed conversation
+        assert not [m for m in state["messages"] if getattr(m, "name", None) == "search_post_history"]
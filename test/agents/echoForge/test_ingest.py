@@ -0,0 +1,230 @@
+"""
+Unit tests for EchoForge bulk ingestion
+"""
+import csv
+import json
+import os
+import tempfile
+from unittest.mock import patch
+import pytest
+import yaml
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.ingest import EchoForgeIngestor, main, normalize_record
+from src.agents.echoForge.memory import EchoForgeMemory
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def export_rows(count, start=0):
+    return [
+        {"Link": f"https://example.com/p/{i}", "Title": f"Post {i}", "Text": f"Body of post {i}",
+         "Reply": f"My reply {i}", "created_at": "1700000000"}
+        for i in range(start, start + count)
+    ]
+
+
+class TestNormalizeRecord:
+    """Test cases for normalize_record"""
+
+    def test_aliases_and_normalization(self):
+        """Test export columns map onto echoForge fields"""
+        record = normalize_record(
+            {"Permalink": " https://x.com/1 ", "Body": "line one  \r\nline two", "comment": "Agreed!",
+             "created_utc": "1700000000"},
+            {"context": "Twitter"}
+        )
+
+        assert record == {
+            "url": "https://x.com/1", "context": "Twitter", "title": "line one", "content": "line one\nline two",
+            "human_response": "Agreed!", "reflections": "", "timestamp": "2023-11-14T22:13:20"
+        }
+
+    def test_timestamps(self):
+        """Test only plausible numbers are read as epoch times"""
+        def timestamp(value):
+            return normalize_record({"text": "a post", "reply": "a reply", "date": value})["timestamp"]
+
+        assert timestamp("1700000000") == timestamp("1700000000000") == "2023-11-14T22:13:20"
+        assert timestamp("2023") == "2023"
+        assert timestamp("20230115") == "2023-01-15T00:00:00"
+        assert timestamp("2024-02-01T08:30:00") == "2024-02-01T08:30:00"
+
+    def test_missing_response_is_invalid(self):
+        """Test rows without content or a human response are rejected"""
+        assert normalize_record({"text": "a post"}) is None
+        assert normalize_record({"reply": "a reply"}) is None
+
+    def test_stable_url_without_link(self):
+        """Test rows without a url get the same derived url every time"""
+        row = {"title": "T", "content": "C", "response": "R"}
+
+        first = normalize_record(row)
+        assert first["url"].startswith("echoforge://import/")
+        assert normalize_record(dict(row))["url"] == first["url"]
+
+
+class TestEchoForgeIngestor:
+    """Test cases for EchoForgeIngestor class"""
+
+    def make_memory(self, temp_dir):
+        config = EchoForgeConfig(embedding_provider="fake", embedding_dim=32, data_dir=temp_dir)
+        return EchoForgeMemory(temp_dir, config, load_index=False)
+
+    def test_ingest_csv_and_jsonl(self):
+        """Test both formats land in the documents file, vector store and history index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, "linkedin.csv")
+            write_csv(csv_path, export_rows(5))
+            jsonl_path = os.path.join(temp_dir, "twitter.jsonl")
+            with open(jsonl_path, 'w') as f:
+                f.write(json.dumps({"text": "tweet", "reply": "reply", "platform": "Twitter"}) + "\n")
+                f.write("not json\n")
+                f.write(json.dumps({"text": "no reply"}) + "\n")
+
+            memory = self.make_memory(temp_dir)
+            ingestor = EchoForgeIngestor(memory, batch_size=2, workers=2)
+            csv_stats = ingestor.ingest_file(csv_path, context="LinkedIn")
+            jsonl_stats = ingestor.ingest_file(jsonl_path)
+            ingestor.close()
+
+            assert (csv_stats["rows"], csv_stats["added"]) == (5, 5)
+            assert (jsonl_stats["rows"], jsonl_stats["added"], jsonl_stats["invalid"]) == (3, 1, 2)
+            assert csv_stats["rows_per_second"] > 0
+
+            reloaded = self.make_memory(temp_dir)
+            assert len(reloaded.documents) == 6
+            assert reloaded.get_post_by_url("https://example.com/p/3")["context"] == "LinkedIn"
+            assert reloaded.documents[-1]["context"] == "Twitter"
+            assert len(reloaded.vector_store.index_to_docstore_id) == 6
+
+    def test_duplicates_skipped(self):
+        """Test rows already in memory or repeated in the file are not added again"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "export.csv")
+            write_csv(path, export_rows(3) + export_rows(2))
+            memory = self.make_memory(temp_dir)
+            ingestor = EchoForgeIngestor(memory, batch_size=10, workers=1)
+
+            stats = ingestor.ingest_file(path)
+            assert (stats["added"], stats["duplicates"]) == (3, 2)
+
+            stats = ingestor.ingest_file(path, resume=False)
+            assert (stats["added"], stats["duplicates"]) == (0, 5)
+            assert len(memory.documents) == 3
+
+    def test_near_duplicates_collapsed(self):
+        """Test cross-posts are collapsed before embedding unless dedupe is off"""
+        content = "Shipping our new search feature today after months of work on relevance and latency tuning"
+        rows = [
+            {"url": "https://linkedin/1", "content": content, "reply": "Proud of the team"},
+            {"url": "https://twitter/1", "content": content + "!", "reply": "Proud of the team, go try it"},
+            {"url": "https://reddit/1", "content": "Completely different post about home espresso", "reply": "Yes"}
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "export.csv")
+            write_csv(path, rows)
+            memory = self.make_memory(temp_dir)
+
+            stats = EchoForgeIngestor(memory, workers=1).ingest_file(path)
+            assert (stats["added"], stats["near_duplicates"]) == (2, 1)
+            assert memory.get_post_by_url("https://twitter/1") is not None
+
+            stats = EchoForgeIngestor(memory, workers=1, dedupe=False).ingest_file(path, resume=False)
+            assert stats["near_duplicates"] == 0
+
+    def test_resume_after_interruption(self):
+        """Test a rerun continues after the last checkpointed batch"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "export.csv")
+            write_csv(path, export_rows(6))
+            memory = self.make_memory(temp_dir)
+            ingestor = EchoForgeIngestor(memory, batch_size=2, workers=1)
+
+            append = memory.extend_documents
+            calls = []
+
+            def flaky_append(records):
+                calls.append(len(records))
+                if len(calls) == 2:
+                    raise RuntimeError("embedding service down")
+                append(records)
+
+            memory.extend_documents = flaky_append
+            with pytest.raises(RuntimeError):
+                ingestor.ingest_file(path)
+            memory.extend_documents = append
+
+            resumed = EchoForgeIngestor(self.make_memory(temp_dir), batch_size=2, workers=1)
+            stats = resumed.ingest_file(path)
+
+            assert stats["resumed_rows"] == 2
+            assert (stats["rows"], stats["added"], stats["duplicates"]) == (4, 4, 0)
+            assert [doc["url"] for doc in resumed.memory.documents] == [f"https://example.com/p/{i}" for i in range(6)]
+
+    def test_hard_kill_between_saves(self):
+        """Test a run killed between saves re-embeds only the batches appended since the last save"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "export.csv")
+            write_csv(path, export_rows(10))
+            memory = self.make_memory(temp_dir)
+            save_indexes = memory.save_indexes
+            saves = []
+
+            def killed_save():
+                # Stands in for the process dying: nothing after the first save reaches disk
+                saves.append(len(memory.documents))
+                if len(saves) > 1:
+                    raise KeyboardInterrupt()
+                save_indexes()
+
+            memory.save_indexes = killed_save
+            with pytest.raises(KeyboardInterrupt):
+                EchoForgeIngestor(memory, batch_size=2, workers=1, checkpoint_interval=2).ingest_file(path)
+
+            with patch.object(EchoForgeMemory, "_faiss_from_documents") as rebuild:
+                reloaded = self.make_memory(temp_dir)
+                assert reloaded.vector_store.index.ntotal == 8
+            assert not rebuild.called
+            stats = EchoForgeIngestor(reloaded, batch_size=2, workers=1).ingest_file(path)
+            assert (stats["resumed_rows"], stats["duplicates"], stats["added"]) == (4, 4, 2)
+            assert reloaded.vector_store.index.ntotal == 10
+
+    def test_indexes_saved_per_checkpoint_interval(self):
+        """Test batches only extend the indexes in memory and are saved once per interval"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "export.csv")
+            write_csv(path, export_rows(10))
+            memory = self.make_memory(temp_dir)
+            saves = []
+            save_indexes = memory.save_indexes
+            memory.save_indexes = lambda: saves.append(len(memory.documents)) or save_indexes()
+
+            stats = EchoForgeIngestor(memory, batch_size=2, workers=1, checkpoint_interval=2).ingest_file(path)
+
+            assert stats["added"] == 10
+            assert saves == [4, 8, 10]
+            # The saved indexes match the documents file, so a fresh memory loads them as-is
+            reloaded = self.make_memory(temp_dir)
+            with open(reloaded.index_manifest_file, 'r') as f:
+                manifest = json.load(f)
+            assert manifest["documents_fingerprint"] == reloaded.documents_fingerprint
+            assert manifest["document_count"] == 10
+            assert reloaded.vector_store.index.ntotal == 10
+
+    def test_main(self, capsys):
+        """Test the command line entry point reads the config and reports totals"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "export.csv")
+            write_csv(path, export_rows(3))
+            config_path = os.path.join(temp_dir, "config.yaml")
+            with open(config_path, 'w') as f:
+                yaml.dump({"embedding_provider": "fake", "embedding_dim": 32, "data_dir": temp_dir}, f)
+
+            assert main([path, "--config", config_path, "--workers", "1"]) == 0
+            assert "3 added" in capsys.readouterr().out
+            assert len(EchoForgeMemory(temp_dir, EchoForgeConfig.from_file(config_path)).documents) == 3
@@ -3,11 +3,13 @@ Unit tests for EchoForgeMemory
 """
 import pytest
 import tempfile
+import threading
 import os
 import json
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 from src.agents.echoForge.memory import EchoForgeMemory
+from src.agents.echoForge.config import EchoForgeConfig
 
 
 class TestEchoForgeMemory:
@@ -176,3 +178,160 @@ class TestEchoForgeMemory:
             # Check timestamps are valid ISO format
             datetime.fromisoformat(profile["created_at"])
             datetime.fromisoformat(profile["last_updated"])
+    
+    def test_index_manifest_records_backend(self):
+        """Test that a built index is persisted with the backend that built it"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            echoForge_dir = os.path.join(temp_dir, "echoForge")
+            os.makedirs(echoForge_dir, exist_ok=True)
+            with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+                json.dump([{"context": "LinkedIn", "title": "AI", "content": "Working on AI"}], f)
+            
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=32)
+            memory = EchoForgeMemory(temp_dir, config)
+            
+            with open(memory.index_manifest_file, 'r') as f:
+                manifest = json.load(f)
+            assert manifest["backend"] == "hashing:dim=32"
+            assert manifest["document_count"] == 1
+            
+            # Same backend reuses the persisted index instead of re-embedding
+            with patch.object(EchoForgeMemory, '_persist_index') as mock_persist:
+                EchoForgeMemory(temp_dir, config)
+                mock_persist.assert_not_called()
+    
+    def test_index_rebuilt_on_backend_mismatch(self):
+        """Test that an index built by another backend is never reused"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            echoForge_dir = os.path.join(temp_dir, "echoForge")
+            os.makedirs(echoForge_dir, exist_ok=True)
+            with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+                json.dump([{"context": "LinkedIn", "title": "AI", "content": "Working on AI"}], f)
+            
+            EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_provider="hashing", embedding_dim=32))
+            memory = EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_provider="hashing", embedding_dim=64))
+            
+            with open(memory.index_manifest_file, 'r') as f:
+                manifest = json.load(f)
+            assert manifest["backend"] == "hashing:dim=64"
+            assert memory.vector_store.index.d == 64
+    
+    def test_get_packed_context_diverse_and_budgeted(self):
+        """Test packed context drops near-duplicates and respects the limit"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            echoForge_dir = os.path.join(temp_dir, "echoForge")
+            os.makedirs(echoForge_dir, exist_ok=True)
+            posts = [
+                {"url": "dup1", "context": "LinkedIn", "title": "AI ethics", "content": "AI ethics in healthcare matters", "human_response": "Agreed"},
+                {"url": "dup2", "context": "LinkedIn", "title": "AI ethics", "content": "AI ethics in healthcare matters!", "human_response": "Agreed"},
+                {"url": "other", "context": "LinkedIn", "title": "AI hiring", "content": "Hiring AI engineers in healthcare", "human_response": "Nice"},
+                {"url": "far", "context": "Discord", "title": "Weekend", "content": "Hiking photos from the weekend", "human_response": "Fun"}
+            ]
+            with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+                json.dump(posts, f)
+            
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=256, example_limit=2, mmr_lambda=0.5)
+            memory = EchoForgeMemory(temp_dir, config)
+            
+            packed = memory.get_packed_context("<context>LinkedIn</context>\n<title>AI ethics</title>\n<content>AI ethics in healthcare matters</content>")
+            
+            assert len(packed) == 2
+            assert {p["url"] for p in packed} != {"dup1", "dup2"}
+            assert memory.get_relevant_context("AI ethics", limit=10, min_similarity=0.0)[0]["similarity_dist"] >= 0
+    
+    def test_adaptive_k_threshold(self):
+        """Test only hits above confidence_threshold are returned, with drop reasons reported"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            echoForge_dir = os.path.join(temp_dir, "echoForge")
+            os.makedirs(echoForge_dir, exist_ok=True)
+            posts = [
+                {"url": "match", "context": "LinkedIn", "title": "AI ethics", "content": "AI ethics in healthcare"},
+                {"url": "unrelated", "context": "Discord", "title": "Weekend", "content": "Hiking photos from the mountains"}
+            ]
+            with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+                json.dump(posts, f)
+            
+            memory = EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_provider="hashing", embedding_dim=256, confidence_threshold=0.7))
+            query = "<context>LinkedIn</context>\n<title>AI ethics</title>\n<content>AI ethics in healthcare</content>"
+            
+            results = memory.get_relevant_context(query, limit=3)
+            report = memory.last_retrieval_report
+            
+            assert [r["url"] for r in results] == ["match"]
+            assert 0.7 <= results[0]["similarity"] <= 1.0
+            assert report["candidates"] == 2
+            assert report["dropped"] == [{"url": "unrelated", "similarity": pytest.approx(report["dropped"][0]["similarity"]), "reason": "below_threshold"}]
+            
+            # A novel query matches nothing and the prompt gets no examples
+            assert memory.get_relevant_context("quantum cryptography lattice", limit=3) == []
+            assert memory.get_packed_context("quantum cryptography lattice") == []
+            assert memory.last_retrieval_report["returned"] == 0
+    
+    def test_retrieval_reports_are_per_call(self):
+        """Test a retrieval on another thread does not overwrite this thread's report"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            echoForge_dir = os.path.join(temp_dir, "echoForge")
+            os.makedirs(echoForge_dir, exist_ok=True)
+            posts = [
+                {"url": "match", "context": "LinkedIn", "title": "AI ethics", "content": "AI ethics in healthcare"},
+                {"url": "unrelated", "context": "Discord", "title": "Weekend", "content": "Hiking photos from the mountains"}
+            ]
+            with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+                json.dump(posts, f)
+            
+            memory = EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_provider="hashing", embedding_dim=256, confidence_threshold=0.7))
+            query = "<context>LinkedIn</context>\n<title>AI ethics</title>\n<content>AI ethics in healthcare</content>"
+            
+            packed, report = memory.packed_with_report(query)
+            assert [p["url"] for p in packed] == ["match"] and report["returned"] == 1
+            memory.get_packed_context(query)
+            other = threading.Thread(target=memory.get_packed_context, args=("quantum cryptography lattice",))
+            other.start()
+            other.join(5)
+            
+            assert memory.last_retrieval_report["returned"] == 1
+    
+    def test_pca_reduced_index_persisted_with_projection(self):
+        """Test a pca-reduced index stores its projection and queries are projected on reload"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            echoForge_dir = os.path.join(temp_dir, "echoForge")
+            os.makedirs(echoForge_dir, exist_ok=True)
+            posts = [{"url": f"p{i}", "context": "LinkedIn", "title": f"Topic {i}", "content": f"Notes on subject {i}"}
+                     for i in range(20)]
+            with open(os.path.join(echoForge_dir, "echoForge_documents.json"), 'w') as f:
+                json.dump(posts, f)
+            
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=128, embedding_dimensions=16,
+                                     embedding_reduction="pca", confidence_threshold=0.0)
+            memory = EchoForgeMemory(temp_dir, config)
+            
+            with open(memory.index_manifest_file, 'r') as f:
+                manifest = json.load(f)
+            assert manifest["backend"] == "hashing:dim=128|pca=16"
+            assert manifest["dimensions"] == 16
+            assert os.path.exists(memory.projection_file)
+            
+            with patch.object(EchoForgeMemory, '_persist_index') as mock_persist:
+                reloaded = EchoForgeMemory(temp_dir, config)
+                mock_persist.assert_not_called()
+            query = "<context>LinkedIn</context>\n<title>Topic 7</title>\n<content>Notes on subject 7</content>"
+            assert reloaded.get_relevant_context(query, limit=1)[0]["url"] == "p7"
+            
+            # Going back to full size rebuilds rather than mixing dimensions
+            full = EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_provider="hashing", embedding_dim=128))
+            assert full.vector_store.index.d == 128
+    
+    @patch('src.agents.echoForge.memory.OpenAIEmbeddings')
+    def test_native_dimensions(self, mock_embeddings):
+        """Test native reduction is requested from OpenAI and refused for local backends"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            memory = EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_dimensions=256))
+            memory.embeddings
+            
+            assert mock_embeddings.call_args.kwargs["dimensions"] == 256
+            assert memory.embedding_backend == "openai:text-embedding-3-small:dim=256"
+            
+            local = EchoForgeMemory(temp_dir, EchoForgeConfig(embedding_provider="hashing", embedding_dimensions=64),
+                                    load_index=False)
+            with pytest.raises(ValueError):
+                local.embeddings
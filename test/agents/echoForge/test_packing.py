@@ -0,0 +1,81 @@
+"""
+Unit tests for EchoForge example packing
+"""
+import pytest
+import numpy as np
+from src.agents.echoForge.packing import estimate_tokens, mmr_select, pack_examples, truncate_to_tokens
+
+
+class TestMMRSelect:
+    """Test cases for mmr_select"""
+    
+    def test_pure_relevance_orders_by_similarity(self):
+        """Test lambda 1.0 reduces to nearest-first ordering"""
+        query = np.array([1.0, 0.0])
+        vectors = np.array([[0.0, 1.0], [1.0, 0.0], [0.7, 0.7]])
+        
+        assert mmr_select(query, vectors, 3, lambda_mult=1.0) == [1, 2, 0]
+    
+    def test_near_duplicates_are_demoted(self):
+        """Test a near-duplicate of the top hit loses to a diverse candidate"""
+        query = np.array([1.0, 1.0])
+        vectors = np.array([
+            [1.0, 0.35],   # best match
+            [1.0, 0.34],   # near-duplicate of the best match
+            [0.3, 1.0]     # slightly less relevant but different
+        ])
+        
+        assert mmr_select(query, vectors, 2, lambda_mult=0.5) == [0, 2]
+    
+    def test_k_bounds(self):
+        """Test k larger than the candidate set and empty inputs"""
+        assert mmr_select(np.ones(2), np.ones((2, 2)), 5) in ([0, 1], [1, 0])
+        assert mmr_select(np.ones(2), np.zeros((0, 2)), 3) == []
+
+
+class TestPackExamples:
+    """Test cases for pack_examples and truncation"""
+    
+    def test_truncate_on_word_boundary(self):
+        """Test long text is cut near the token limit on a word boundary"""
+        text = "word " * 100
+        truncated = truncate_to_tokens(text, 10)
+        
+        assert truncated.endswith(" ...")
+        assert len(truncated) <= 10 * 4 + 4
+        assert truncate_to_tokens("short", 10) == "short"
+    
+    def test_budget_and_limit(self):
+        """Test packing respects the limit, the budget and field truncation"""
+        candidates = [
+            {"context": "A", "title": "T", "content": "x " * 2000, "human_response": "ok"},
+            {"context": "B", "title": "T", "content": "short", "human_response": "ok"},
+            {"context": "C", "title": "T", "content": "short", "human_response": "ok"},
+            {"context": "D", "title": "T", "content": "short", "human_response": "ok"}
+        ]
+        
+        packed = pack_examples(candidates, [0, 1, 2, 3], limit=3, token_budget=1000, field_max_tokens=100)
+        
+        assert [p["context"] for p in packed] == ["A", "B", "C"]
+        assert estimate_tokens(packed[0]["content"]) <= 101
+        assert candidates[0]["content"] == "x " * 2000
+    
+    def test_oversized_examples_skipped(self):
+        """Test examples that overflow the remaining budget are skipped for smaller ones"""
+        candidates = [
+            {"context": "big", "content": "y " * 400},
+            {"context": "small", "content": "z"}
+        ]
+        
+        packed = pack_examples(candidates, [0, 1], limit=3, token_budget=100, field_max_tokens=1000)
+        
+        assert [p["context"] for p in packed] == ["small"]
+    
+    def test_dropped_reasons(self):
+        """Test examples left out are reported with a reason"""
+        candidates = [{"url": str(i), "content": "z"} for i in range(3)]
+        dropped = []
+        
+        pack_examples(candidates, [0, 1, 2], limit=2, token_budget=1000, field_max_tokens=10, dropped=dropped)
+        
+        assert dropped == [{"url": "2", "similarity": None, "reason": "limit_reached"}]
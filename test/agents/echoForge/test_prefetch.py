@@ -0,0 +1,121 @@
+"""
+Unit tests for EchoForge speculative retrieval
+"""
+import threading
+from src.agents.echoForge.fakes import DEFAULT_SCRIPT
+from src.agents.echoForge.prefetch import RetrievalPrefetcher, echo_query, parse_post_fields
+
+
+class TestParsePostFields:
+    """Test cases for parse_post_fields"""
+    
+    def test_confirmation_question(self):
+        """Test the three fields are read from a confirmation question"""
+        question = "Let me confirm:\n- **Context**: LinkedIn\n- Title: AI Ethics\n- content: Thoughts on AI?"
+        
+        assert parse_post_fields(question) == {"context": "LinkedIn", "title": "AI Ethics", "content": "Thoughts on AI?"}
+    
+    def test_multi_line_fields(self):
+        """Test values spanning several lines, or starting below their label, are read whole"""
+        question = ("Here is the post:\n- **Context:** Reddit r/MachineLearning\n- Title: Scaling laws\n- Content:\n"
+                    "  First paragraph line one\n  line two of the post\n\nIs this correct?")
+        
+        assert parse_post_fields(question) == {
+            "context": "Reddit r/MachineLearning", "title": "Scaling laws",
+            "content": "First paragraph line one\nline two of the post"
+        }
+    
+    def test_incomplete_fields(self):
+        """Test nothing is returned until all three fields are known"""
+        assert parse_post_fields("context: LinkedIn\ntitle: AI Ethics") is None
+        assert parse_post_fields("What would you like to work on today?") is None
+
+
+class TestRetrievalPrefetcher:
+    """Test cases for RetrievalPrefetcher class"""
+    
+    def test_hit_and_miss(self):
+        """Test a matching query reuses the prefetch and a different one discards it"""
+        calls = []
+        prefetcher = RetrievalPrefetcher(lambda query: calls.append(query) or [query])
+        
+        assert prefetcher.start("s1", "q1")
+        assert not prefetcher.start("s1", "q1")
+        assert prefetcher.take("s1", "q1") == (True, ["q1"])
+        assert prefetcher.take("s1", "q1") == (False, None)
+        
+        prefetcher.start("s2", "q2")
+        assert prefetcher.take("s2", "other") == (False, None)
+        assert prefetcher.stats() == {"started": 2, "hits": 1, "misses": 1, "pending": 0}
+        prefetcher.close()
+    
+    def test_equivalent_queries_match(self):
+        """Test the same post parsed from a question matches its structured query despite formatting"""
+        prefetcher = RetrievalPrefetcher(lambda query: [query])
+        fields = parse_post_fields("Context: LinkedIn\nTitle: \"AI Ethics\"\nContent: Thoughts on\n  AI in healthcare?")
+        
+        prefetcher.start("s1", echo_query(**fields))
+        hit, _ = prefetcher.take("s1", echo_query("LinkedIn", "AI ethics", "Thoughts on AI in healthcare?"))
+        
+        assert hit
+        prefetcher.close()
+    
+    def test_retrieval_error_falls_back(self):
+        """Test a failed prefetch is reported as a miss"""
+        def fail(query):
+            raise RuntimeError("index unavailable")
+        
+        prefetcher = RetrievalPrefetcher(fail)
+        prefetcher.start("s1", "q1")
+        
+        assert prefetcher.take("s1", "q1") == (False, None)
+        prefetcher.close()
+
+
+class TestAgentPrefetch:
+    """Test speculative retrieval in a session"""
+    
+    def test_prefetch_used_by_echo(self, make_agent):
+        """Test retrieval starts at the confirmation question and echo reuses it"""
+        agent = make_agent()
+        queries = []
+        retrieved = threading.Event()
+        
+        def packed_context(query):
+            queries.append((threading.current_thread().name, query))
+            retrieved.set()
+            return []
+        
+        agent.memory.get_packed_context = packed_context
+        
+        turn = agent.start_session("s1")
+        turn = agent.resume_session("s1", "new post")
+        turn = agent.resume_session("s1", "LinkedIn / AI / body")
+        assert "confirm" in turn["question"]
+        assert retrieved.wait(5)
+        
+        turn = agent.resume_session("s1", "yes")
+        
+        assert turn["values"]["status"] == "echo"
+        assert len(queries) == 1
+        assert queries[0][0].startswith("echoforge-prefetch")
+        assert queries[0][1] == echo_query("LinkedIn", "Discussion about AI Ethics", "What are your thoughts on AI in healthcare?")
+        assert agent.prefetcher.stats()["hits"] == 1
+        assert agent.tracer.registry.counter("echoforge_prefetch_total", result="hit") >= 1
+    
+    def test_prefetch_discarded_when_fields_change(self, make_agent):
+        """Test echo retrieves again when the confirmed post differs from the prefetched one"""
+        script = [dict(entry) for entry in DEFAULT_SCRIPT]
+        script[4] = {"collected_info": {"context": "Twitter", "title": "Edited title", "content": "Edited content"}}
+        
+        agent = make_agent(script=script)
+        queries = []
+        agent.memory.get_packed_context = lambda query: queries.append(query) or []
+        
+        turn = agent.start_session("s1")
+        for reply in ["new post", "LinkedIn / AI / body", "yes"]:
+            turn = agent.resume_session("s1", reply)
+        
+        assert turn["values"]["post_info"]["context"] == "Twitter"
+        assert queries[-1] == echo_query("Twitter", "Edited title", "Edited content")
+        assert agent.prefetcher.stats()["misses"] == 1
@@ -0,0 +1,200 @@
+"""
+Unit tests for the EchoForge request policy
+"""
+import os
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+import yaml
+from src.agents.echoForge.agent import EchoForgeAgent
+from src.agents.echoForge.fakes import FakeChatModel
+from src.agents.echoForge.request_policy import PolicyChatModel, RequestPolicy, RequestTimeoutError, is_retryable
+from src.agents.echoForge.usage import UsageTracker, bind_node
+
+
+class RateLimitError(Exception):
+    """Stands in for the provider's rate-limit error"""
+
+
+def warm_up(policy, key, count):
+    for _ in range(count):
+        policy.call(lambda: time.sleep(0.005), key=key)
+
+
+class SlowFirstModel(FakeChatModel):
+    """Fake model whose first call is slow"""
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        first = self._calls == 0 and not self._positions
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        if first:
+            time.sleep(0.5)
+        return result
+
+
+class TestRequestPolicy:
+    """Test cases for RequestPolicy class"""
+    
+    def test_retries_transient_errors(self):
+        """Test retryable errors are retried with backoff and others raise at once"""
+        policy = RequestPolicy(max_retries=2, backoff=0.001, seed=0)
+        failures = [ConnectionError("reset"), RateLimitError("slow down")]
+        
+        def flaky():
+            if failures:
+                raise failures.pop(0)
+            return "ok"
+        
+        assert policy.call(flaky) == "ok"
+        assert policy.stats()["retries"] == 2
+        with pytest.raises(ValueError):
+            policy.call(lambda: (_ for _ in ()).throw(ValueError("bad request")))
+        assert policy.stats()["retries"] == 2
+        assert not is_retryable(RequestTimeoutError())
+    
+    def test_retries_exhausted(self):
+        """Test the last error surfaces once max_retries is used up"""
+        policy = RequestPolicy(max_retries=1, backoff=0.001)
+        calls = []
+        
+        with pytest.raises(ConnectionError):
+            policy.call(lambda: calls.append(1) or (_ for _ in ()).throw(ConnectionError()))
+        assert len(calls) == 2
+    
+    def test_backoff_is_jittered_and_capped(self):
+        """Test backoff delays stay within the doubling cap"""
+        policy = RequestPolicy(backoff=0.5, backoff_max=2.0, seed=1)
+        
+        delays = [policy.backoff_delay(attempt) for attempt in range(6)]
+        
+        assert all(0 <= d <= min(2.0, 0.5 * 2 ** i) for i, d in enumerate(delays))
+        assert len(set(delays)) == len(delays)
+    
+    def test_deadline(self):
+        """Test a call without a result by its deadline raises instead of stalling the turn"""
+        policy = RequestPolicy(deadline=0.1, max_retries=3)
+        
+        start = time.perf_counter()
+        with pytest.raises(RequestTimeoutError):
+            policy.call(lambda: time.sleep(1), key="echo")
+        
+        assert time.perf_counter() - start < 0.5
+        assert policy.stats()["timeouts"] == 1
+        assert policy.stats()["retries"] == 0
+        policy.close()
+    
+    def test_hedge_wins_over_slow_request(self):
+        """Test a call slower than the latency percentile gets a duplicate that can win"""
+        policy = RequestPolicy(hedge_percentile=0.9, hedge_min_samples=10, hedge_max_rate=0.5)
+        warm_up(policy, "echo", 10)
+        abandoned = []
+        done = threading.Event()
+        attempts = []
+        
+        def request():
+            attempts.append(1)
+            if len(attempts) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+        
+        start = time.perf_counter()
+        result = policy.call(request, key="echo", on_abandoned=lambda r: (abandoned.append(r), done.set()))
+        
+        assert result == "fast"
+        assert time.perf_counter() - start < 0.4
+        stats = policy.stats()
+        assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+        assert stats["hedge_rate"] == pytest.approx(1 / 11)
+        assert done.wait(2) and abandoned == ["slow"]
+        policy.close()
+    
+    def test_hedge_rate_cap(self):
+        """Test hedging pauses once the hedge rate reaches hedge_max_rate"""
+        policy = RequestPolicy(hedge_percentile=0.5, hedge_min_samples=5, hedge_max_rate=0.1)
+        warm_up(policy, "echo", 5)
+        
+        for _ in range(3):
+            policy.call(lambda: time.sleep(0.05), key="echo")
+        
+        assert policy.stats()["hedges"] == 1
+        assert policy.hedge_delay("echo") is None
+        assert policy.hedge_delay("gather_intent") is None
+        policy.close()
+    
+    def test_bounded_steps_do_not_starve_their_calls(self):
+        """Test call_within steps waiting on policy calls cannot take every attempt worker"""
+        policy = RequestPolicy(deadline=5.0, max_workers=2)
+        results = []
+        
+        def step():
+            results.append(policy.call_within(lambda: policy.call(lambda: time.sleep(0.1) or "ok"), 2.0))
+        
+        threads = [threading.Thread(target=step) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        
+        assert results == ["ok", "ok"]
+        policy.close()
+
+
+class TestPolicyChatModel:
+    """Test cases for PolicyChatModel class"""
+    
+    def test_abandoned_hedge_usage_is_charged(self):
+        """Test the losing duplicate's tokens still reach the usage tracker"""
+        policy = RequestPolicy(hedge_percentile=0.5, hedge_min_samples=3, hedge_max_rate=1.0)
+        warm_up(policy, "echo", 3)
+        usage = UsageTracker()
+        model = PolicyChatModel(inner=SlowFirstModel(script=[{"content": "slow"}, {"content": "fast"}]),
+                                policy=policy, model_name="gpt-4o-mini", usage=usage)
+        
+        with bind_node("echo"):
+            assert model.invoke("hello").content == "fast"
+        
+        deadline = time.time() + 2
+        while usage.summary()["total"]["calls"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        assert usage.summary()["by_node"]["echo"]["calls"] == 1
+        policy.close()
+    
+    def test_tools_and_structured_output_pass_through(self):
+        """Test bound tools reach the inner model and structured output goes through the policy"""
+        policy = RequestPolicy(deadline=5.0)
+        model = PolicyChatModel(inner=FakeChatModel(script=[
+            {"tool": "ask_human", "args": {"question": "Hi?"}},
+            {"collected_info": {"context": "LinkedIn", "title": "T", "content": "C"}}
+        ]), policy=policy)
+        
+        reply = model.bind_tools([lambda question: question]).invoke("start")
+        assert reply.tool_calls[0]["name"] == "ask_human"
+        from src.agents.echoForge.state import PostSchema
+        parsed = model.with_structured_output(PostSchema).invoke('COLLECTED_INFO: {"context": "X", "title": "T"}')
+        assert parsed.context == "X"
+        assert policy.stats()["calls"] == 2
+        policy.close()
+
+
+class TestAgentRequestPolicy:
+    """Test the policy wiring in EchoForgeAgent"""
+    
+    @patch('src.agents.echoForge.agent.ChatOpenAI')
+    def test_openai_models_wrapped(self, mock_chat_openai):
+        """Test openai models go through the policy and the client's own retries are off"""
+        mock_chat_openai.side_effect = lambda **kwargs: MagicMock(name=kwargs["model"])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_path = os.path.join(temp_dir, "config.yaml")
+            with open(config_path, 'w') as f:
+                yaml.dump({"embedding_provider": "fake", "data_dir": temp_dir, "llm_timeout": 30.0}, f)
+        
+            agent = EchoForgeAgent(config_path)
+        
+            assert isinstance(agent.llm, PolicyChatModel)
+            assert mock_chat_openai.call_args.kwargs["max_retries"] == 0
+            assert mock_chat_openai.call_args.kwargs["timeout"].read == 30.0
+            assert agent.get_request_stats()["hedge_rate"] == 0.0
+            agent.close()
@@ -0,0 +1,187 @@
+"""
+Unit tests for EchoForge server mode
+"""
+import asyncio
+import json
+from src.agents.echoForge.server import EchoForgeServer
+
+
+async def send(writer, message):
+    writer.write((json.dumps(message) + "\n").encode("utf-8"))
+    await writer.drain()
+
+
+async def receive(reader):
+    return json.loads(await asyncio.wait_for(reader.readline(), timeout=10))
+
+
+async def converse(port, replies):
+    """Run one session to its result, answering questions from replies"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await send(writer, {"type": "start"})
+    session = await receive(reader)
+    replies = list(replies)
+    while True:
+        message = await receive(reader)
+        if message["type"] == "question":
+            await send(writer, {"type": "reply", "text": replies.pop(0)})
+        else:
+            break
+    return session["thread_id"], message, reader, writer
+
+
+class TestEchoForgeServer:
+    """Test cases for EchoForgeServer class"""
+    
+    def test_session_runs_to_echo(self, make_agent):
+        """Test a client answers relayed questions and receives the echo result"""
+        agent = make_agent()
+        
+        async def scenario():
+            server = EchoForgeServer(agent, port=0)
+            port = await server.start()
+            try:
+                thread_id, result, reader, writer = await converse(port, ["new post", "LinkedIn / AI / body", "yes"])
+                await send(writer, {"type": "feedback", "human_response": "Mine", "reflections": "Shorter"})
+                recorded = await receive(reader)
+                writer.close()
+                return thread_id, result, recorded
+            finally:
+                await server.stop()
+        
+        thread_id, result, recorded = asyncio.run(scenario())
+        
+        assert result["type"] == "result"
+        assert result["status"] == "echo"
+        assert "human in the loop" in result["ai_response"]
+        assert recorded == {"type": "feedback_recorded", "url": f"echoforge://session/{thread_id}"}
+        state = agent.graph.get_state(agent.memory.create_config(thread_id)).values
+        assert state["human_response"] == "Mine"
+        assert agent.memory.get_post_by_url(recorded["url"])["reflections"] == "Shorter"
+    
+    def test_sessions_are_isolated(self, make_agent):
+        """Test each session keeps its own thread_id and state"""
+        agent = make_agent()
+        
+        async def scenario():
+            server = EchoForgeServer(agent, port=0)
+            port = await server.start()
+            try:
+                first = await converse(port, ["new post", "LinkedIn / AI / body", "yes"])
+                second = await converse(port, ["new post", "LinkedIn / AI / body", "yes"])
+                for _, _, _, writer in (first, second):
+                    writer.close()
+                return first[0], second[0]
+            finally:
+                await server.stop()
+        
+        first_id, second_id = asyncio.run(scenario())
+        
+        assert first_id != second_id
+        for thread_id in (first_id, second_id):
+            state = agent.graph.get_state(agent.memory.create_config(thread_id)).values
+            assert state["status"] == "echo"
+            assert len([m for m in state["messages"] if m.type == "tool"]) == 3
+    
+    def test_refuses_connections_over_limit(self, make_agent):
+        """Test clients beyond server_max_sessions get server_full"""
+        agent = make_agent(server_max_sessions=1)
+        
+        async def scenario():
+            server = EchoForgeServer(agent, port=0)
+            port = await server.start()
+            try:
+                first_reader, first_writer = await asyncio.open_connection("127.0.0.1", port)
+                await send(first_writer, {"type": "start"})
+                await receive(first_reader)
+                second_reader, second_writer = await asyncio.open_connection("127.0.0.1", port)
+                refused = await receive(second_reader)
+                first_writer.close()
+                second_writer.close()
+                return refused
+            finally:
+                await server.stop()
+        
+        assert asyncio.run(scenario()) == {"type": "error", "error": "server_full"}
+    
+    def test_rejects_invalid_user_id(self, make_agent):
+        """Test a start with a user_id that is not a safe directory name gets invalid_user_id"""
+        agent = make_agent()
+        
+        async def scenario():
+            server = EchoForgeServer(agent, port=0)
+            port = await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await send(writer, {"type": "start", "user_id": "../other"})
+                reply = await receive(reader)
+                writer.close()
+                return reply
+            finally:
+                await server.stop()
+        
+        assert asyncio.run(scenario()) == {"type": "error", "error": "invalid_user_id"}
+    
+    def test_reconnect_resumes_paused_session(self, make_agent):
+        """Test a client can drop while a question is pending and pick the session up again"""
+        agent = make_agent()
+        
+        async def scenario():
+            server = EchoForgeServer(agent, port=0)
+            port = await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await send(writer, {"type": "start"})
+                thread_id = (await receive(reader))["thread_id"]
+                first_question = await receive(reader)
+                writer.close()
+                
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await send(writer, {"type": "start", "thread_id": thread_id})
+                await receive(reader)
+                again = await receive(reader)
+                replies = ["new post", "LinkedIn / AI / body", "yes"]
+                message = again
+                while message["type"] == "question":
+                    await send(writer, {"type": "reply", "text": replies.pop(0)})
+                    message = await receive(reader)
+                writer.close()
+                return first_question, again, message
+            finally:
+                await server.stop()
+        
+        first_question, again, result = asyncio.run(scenario())
+        
+        assert first_question == again == {"type": "question", "text": "What would you like to work on today?"}
+        assert result["status"] == "echo"
+    
+    def test_second_start_releases_previous_thread(self, make_agent):
+        """Test starting a new thread on a connection frees the thread it held"""
+        agent = make_agent()
+        
+        async def scenario():
+            server = EchoForgeServer(agent, port=0)
+            port = await server.start()
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                await send(writer, {"type": "start", "thread_id": "first"})
+                await receive(reader)
+                await receive(reader)
+                await send(writer, {"type": "start", "thread_id": "second"})
+                await receive(reader)
+                await receive(reader)
+                held = sorted(server.sessions)
+                
+                other_reader, other_writer = await asyncio.open_connection("127.0.0.1", port)
+                await send(other_writer, {"type": "start", "thread_id": "first"})
+                reply = await receive(other_reader)
+                writer.close()
+                other_writer.close()
+                return held, reply
+            finally:
+                await server.stop()
+        
+        held, reply = asyncio.run(scenario())
+        
+        assert held == ["second"]
+        assert reply == {"type": "session", "thread_id": "first"}
@@ -0,0 +1,184 @@
+"""
+Unit tests for EchoForge multi-tenant memories
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import pytest
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.tenants import TenantMemoryPool, validate_user_id
+
+
+def write_tenant(root, user_id, posts=(), profile=None):
+    tenant_dir = os.path.join(root, user_id)
+    os.makedirs(os.path.join(tenant_dir, "echoForge"), exist_ok=True)
+    os.makedirs(os.path.join(tenant_dir, "shared"), exist_ok=True)
+    with open(os.path.join(tenant_dir, "echoForge", "echoForge_documents.json"), 'w') as f:
+        json.dump(list(posts), f)
+    if profile is not None:
+        with open(os.path.join(tenant_dir, "shared", "user_profile.json"), 'w') as f:
+            json.dump(profile, f)
+
+
+def posts(prefix, count):
+    return [{"url": f"{prefix}/{i}", "context": "LinkedIn", "title": f"{prefix} post {i}",
+             "content": f"{prefix} content number {i}", "human_response": "ok"} for i in range(count)]
+
+
+class TestTenantMemoryPool:
+    """Test cases for TenantMemoryPool class"""
+    
+    def make_pool(self, root, **kwargs):
+        config = EchoForgeConfig(embedding_provider="fake", embedding_dim=64, confidence_threshold=0.0)
+        return TenantMemoryPool(root, config, **kwargs)
+    
+    def test_tenants_are_isolated(self):
+        """Test each user gets their own profile, documents and index"""
+        with tempfile.TemporaryDirectory() as root:
+            write_tenant(root, "alice", posts("alice", 3), profile={"tone": "dry"})
+            write_tenant(root, "bob", posts("bob", 2), profile={"tone": "warm"})
+            pool = self.make_pool(root)
+        
+            alice, bob = pool.get("alice"), pool.get("bob")
+        
+            assert alice.get_user_profile() == {"tone": "dry"}
+            assert bob.get_user_profile() == {"tone": "warm"}
+            assert {p["url"] for p in alice.get_relevant_context("alice post", limit=5)} <= {f"alice/{i}" for i in range(3)}
+            assert bob.vector_store.index.ntotal == 2
+            assert pool.get("alice") is alice
+    
+    def test_lru_eviction_and_reload(self):
+        """Test the least recently used tenant is dropped and reloads from disk"""
+        with tempfile.TemporaryDirectory() as root:
+            for user in ("a", "b", "c"):
+                write_tenant(root, user, posts(user, 1))
+            pool = self.make_pool(root, max_resident=2)
+        
+            first = pool.get("a")
+            pool.get("b")
+            pool.get("a")
+            pool.get("c")
+        
+            assert pool.resident() == ["a", "c"]
+            assert pool.stats()["evictions"] == 1
+            reloaded = pool.get("b")
+            assert reloaded.documents == posts("b", 1)
+            assert pool.resident() == ["c", "b"]
+            assert pool.get("a") is not first
+    
+    def test_memory_budget(self):
+        """Test tenants are evicted once loaded indexes exceed the budget"""
+        with tempfile.TemporaryDirectory() as root:
+            write_tenant(root, "big", posts("big", 50))
+            write_tenant(root, "small", posts("small", 1))
+            pool = self.make_pool(root, memory_budget_mb=0.01)
+        
+            pool.get("big").warm_up()
+            assert pool.stats()["resident_bytes"] > 50 * 64 * 4
+            pool.get("small")
+        
+            assert pool.resident() == ["small"]
+    
+    def test_slow_load_does_not_block_other_tenants(self):
+        """Test one tenant's long load or busy index leaves other tenants' queries alone"""
+        with tempfile.TemporaryDirectory() as root:
+            write_tenant(root, "big", posts("big", 5))
+            write_tenant(root, "small", posts("small", 2))
+            pool = self.make_pool(root)
+        
+            release = threading.Event()
+            load = pool._load
+        
+            def slow_load(user_id):
+                if user_id == "big":
+                    release.wait(5)
+                return load(user_id)
+        
+            pool._load = slow_load
+            loader = threading.Thread(target=pool.get, args=("big",))
+            loader.start()
+            time.sleep(0.05)
+        
+            start = time.perf_counter()
+            small = pool.get("small")
+            small.get_relevant_context("small post", limit=1)
+            assert time.perf_counter() - start < 2
+        
+            release.set()
+            loader.join(5)
+            big = pool.get("big")
+            with big._index_lock:
+                done = threading.Event()
+                threading.Thread(target=lambda: (small.get_relevant_context("small", limit=1), done.set())).start()
+                assert done.wait(2)
+    
+    def test_pinned_tenants_are_not_evicted(self):
+        """Test a tenant in use stays resident and is evicted once released"""
+        with tempfile.TemporaryDirectory() as root:
+            for user in ("a", "b", "c"):
+                write_tenant(root, user, posts(user, 1))
+            pool = self.make_pool(root, max_resident=1)
+        
+            with pool.pinned("a") as memory:
+                pool.get("b")
+                pool.get("c")
+                assert "a" in pool.resident()
+                assert pool.get("a") is memory
+                assert not pool.evict("a")
+            pool.get("c")
+        
+            assert pool.resident() == ["c"]
+            assert pool.stats()["pinned"] == 0
+    
+    def test_tenants_share_one_embedding_client(self):
+        """Test tenants reuse the first tenant's embedding client, with their own PCA projection"""
+        with tempfile.TemporaryDirectory() as root:
+            for user in ("a", "b"):
+                write_tenant(root, user, posts(user, 3))
+            pool = self.make_pool(root)
+            assert pool.get("a").embeddings is pool.get("b").embeddings
+        
+            config = EchoForgeConfig(embedding_provider="fake", embedding_dim=64, embedding_dimensions=2,
+                                     embedding_reduction="pca")
+            pca_pool = TenantMemoryPool(root, config)
+            a, b = pca_pool.get("a").embeddings, pca_pool.get("b").embeddings
+            assert a is not b and a.base is b.base
+            pca_pool.close()
+    
+    def test_invalid_user_id(self):
+        """Test user ids that are not plain directory names are rejected"""
+        for user_id in ("", "..", "a/b", "x" * 200):
+            with pytest.raises(ValueError):
+                validate_user_id(user_id)
+
+
+class TestAgentTenants:
+    """Test sessions routed to tenant memories"""
+    
+    def test_feedback_lands_in_the_users_memory(self, make_agent, tmp_path):
+        """Test a session started with a user_id reads and writes that tenant only"""
+        agent = make_agent()
+        write_tenant(os.path.join(tmp_path, "tenants"), "alice", posts("alice", 2), profile={"tone": "dry"})
+        
+        profiles = []
+        get_profile = agent.tenants.get("alice").get_user_profile
+        agent.tenants.get("alice").get_user_profile = lambda: profiles.append("alice") or get_profile()
+        
+        turn = agent.start_session("s1", user_id="alice")
+        for reply in ["new post", "LinkedIn / AI / body", "yes"]:
+            turn = agent.resume_session("s1", reply)
+        assert turn["values"]["user_id"] == "alice"
+        record = agent.record_feedback("Mine", thread_id="s1")
+        agent.close()
+        
+        assert profiles == ["alice"]
+        alice = agent.tenants.get("alice")
+        assert alice.get_post_by_url(record["url"])["human_response"] == "Mine"
+        assert "user_id" not in alice.get_post_by_url(record["url"])
+        assert agent.memory.get_post_by_url(record["url"]) is None
+        
+        with pytest.raises(ValueError):
+            agent.start_session("s2", user_id="../etc")
+        assert "s1" not in agent._session_users
@@ -0,0 +1,115 @@
+"""
+Unit tests for EchoForge token and cost accounting
+"""
+import pytest
+from src.agents.echoForge.fakes import FakeChatModel, ScriptedHuman
+from src.agents.echoForge.usage import UsageCallbackHandler, UsageTracker, bind_node
+from src.agents.tools import set_input_provider
+
+
+def _chat(agent):
+    """Run one scripted conversation"""
+    set_input_provider(ScriptedHuman(["new post", "LinkedIn / AI / body", "yes"]))
+    try:
+        agent.chat()
+    finally:
+        set_input_provider(None)
+
+
+class TestUsageTracker:
+    """Test cases for UsageTracker class"""
+    
+    def test_cost_estimate(self):
+        """Test cost uses the price table, with prefix matching for dated model names"""
+        tracker = UsageTracker()
+        
+        assert tracker.estimate_cost("gpt-4o", 1_000_000, 0) == pytest.approx(2.5)
+        assert tracker.estimate_cost("gpt-4o-mini-2024-07-18", 0, 1_000_000) == pytest.approx(0.6)
+        assert tracker.estimate_cost("unknown-model", 1000, 1000) == 0.0
+    
+    def test_pricing_override(self):
+        """Test configured prices override the built-in table"""
+        tracker = UsageTracker(pricing={"gpt-4o": [1.0, 1.0]})
+        
+        assert tracker.estimate_cost("gpt-4o", 1_000_000, 1_000_000) == pytest.approx(2.0)
+    
+    def test_rollup_per_node_and_thread(self):
+        """Test usage is rolled up per node and per thread_id"""
+        tracker = UsageTracker()
+        tracker.record("gpt-4o", 100, 10, node="gather_intent", thread_id="a")
+        tracker.record("gpt-4o", 200, 20, node="echo", thread_id="a")
+        tracker.record("gpt-4o", 50, 5, node="echo", thread_id="b")
+        
+        summary = tracker.summary()
+        assert summary["total"]["total_tokens"] == 385
+        assert summary["by_node"]["echo"]["calls"] == 2
+        assert tracker.summary("a")["total"]["prompt_tokens"] == 300
+        assert set(tracker.summary("b")["by_node"]) == {"echo"}
+    
+    def test_scope_and_node_binding(self):
+        """Test callback records are attributed to the bound node and collected by scopes"""
+        tracker = UsageTracker()
+        model = FakeChatModel(script=[{"content": "hello"}])
+        
+        with bind_node("echo"), tracker.scope() as scope:
+            model.invoke("hi", config={"callbacks": [UsageCallbackHandler(tracker)]})
+        
+        assert scope.calls == 1
+        assert tracker.summary()["by_node"]["echo"]["total_tokens"] == scope.total_tokens
+    
+    def test_budget(self):
+        """Test token and cost budgets"""
+        tracker = UsageTracker(session_token_budget=100)
+        tracker.record("gpt-4o", 60, 10, thread_id="a")
+        assert not tracker.over_budget("a")
+        
+        tracker.record("gpt-4o", 30, 0, thread_id="a")
+        assert tracker.over_budget("a")
+        assert not tracker.over_budget("b")
+        assert not tracker.over_budget(None)
+
+
+class TestAgentUsage:
+    """Test usage accounting through the agent"""
+    
+    def test_usage_per_node(self, make_agent):
+        """Test a conversation attributes tokens to the ReAct loops and echo"""
+        agent = make_agent()
+        _chat(agent)
+        thread_id = agent.memory.get_config()["configurable"]["thread_id"]
+        
+        usage = agent.get_usage(thread_id)
+        
+        assert {"gather_intent", "collect_post_info", "echo"} <= set(usage["by_node"])
+        assert usage["by_node"]["echo"]["calls"] == 1
+        assert usage["total"]["total_tokens"] > 0
+    
+    def test_echo_call_usage(self, make_agent):
+        """Test direct echo calls report their own usage"""
+        agent = make_agent()
+        agent.llm = FakeChatModel(script=[{"content": "reply"}])
+        
+        assert agent.echo("LinkedIn", "AI", "Body") == "reply"
+        assert agent.last_echo_usage.calls == 1
+        assert agent.last_echo_usage.prompt_tokens > 0
+    
+    def test_budget_abort(self, make_agent):
+        """Test a session over budget is aborted before reaching echo"""
+        agent = make_agent(session_token_budget=1)
+        _chat(agent)
+        thread_id = agent.memory.get_config()["configurable"]["thread_id"]
+        
+        assert "echo" not in agent.get_usage(thread_id)["by_node"]
+    
+    def test_budget_degrade(self, make_agent):
+        """Test a session over budget still echoes, but without retrieval"""
+        agent = make_agent(session_token_budget=1, budget_action="degrade")
+        calls = []
+        agent.memory.get_packed_context = lambda *args, **kwargs: calls.append(args) or []
+        _chat(agent)
+        thread_id = agent.memory.get_config()["configurable"]["thread_id"]
+        
+        assert agent.get_usage(thread_id)["by_node"]["echo"]["calls"] == 1
+        assert calls == []
+        assert agent.last_echo_report["level"] == "no_examples"
+        assert agent.last_echo_report["reasons"] == ["session_budget"]
@@ -0,0 +1,206 @@
+"""
+Unit tests for EchoForge write-behind persistence
+"""
+import hashlib
+import json
+import tempfile
+import threading
+from unittest.mock import patch
+from src.agents.echoForge.config import EchoForgeConfig
+from src.agents.echoForge.fakes import ScriptedHuman
+from src.agents.echoForge.memory import EchoForgeMemory
+from src.agents.echoForge.writeback import WriteBehindQueue
+from src.agents.tools import set_input_provider
+
+
+class TestWriteBehindQueue:
+    """Test cases for WriteBehindQueue class"""
+    
+    def test_batches_by_size(self):
+        """Test records are handed to the writer in batches of batch_size"""
+        batches = []
+        release = threading.Event()
+        
+        def writer(batch):
+            release.wait(5)
+            batches.append(list(batch))
+        
+        queue = WriteBehindQueue(writer, batch_size=3, flush_interval=5.0)
+        for i in range(6):
+            queue.enqueue({"n": i})
+        release.set()
+        queue.flush()
+        
+        assert [len(b) for b in batches] == [3, 3]
+        assert queue.flushed_records == 6
+        queue.close()
+    
+    def test_close_flushes_partial_batch(self):
+        """Test close writes whatever is still queued"""
+        batches = []
+        queue = WriteBehindQueue(batches.append, batch_size=100, flush_interval=60.0)
+        queue.enqueue({"n": 1})
+        queue.enqueue({"n": 2})
+        queue.close()
+        
+        assert batches == [[{"n": 1}, {"n": 2}]]
+        queue.close()  # idempotent
+    
+    def test_writer_errors_are_counted(self):
+        """Test a failing writer does not stop the worker"""
+        def writer(batch):
+            raise IOError("disk full")
+        
+        queue = WriteBehindQueue(writer, batch_size=1, flush_interval=0.01)
+        queue.enqueue({"n": 1})
+        queue.flush()
+        
+        assert queue.failed_records == 1
+        assert queue.flushed_records == 0
+        queue.close()
+
+
+class TestAppendDocuments:
+    """Test cases for EchoForgeMemory.append_documents"""
+    
+    def test_appended_posts_are_searchable_and_persisted(self):
+        """Test appended posts reach the documents file, vector store and history index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=64, confidence_threshold=0.0)
+            memory = EchoForgeMemory(temp_dir, config)
+            memory.append_documents([
+                {"url": "https://a", "context": "LinkedIn", "title": "Rust compilers", "content": "borrow checker",
+                 "human_response": "Love it", "timestamp": "2024-01-01T00:00:00"}
+            ])
+            memory.append_documents([
+                {"url": "https://b", "context": "Twitter", "title": "Gardening tips", "content": "tomatoes",
+                 "human_response": "Water daily", "timestamp": "2024-02-01T00:00:00"}
+            ])
+        
+            with open(memory.echoForge_documents_file, 'r') as f:
+                assert [d["url"] for d in json.load(f)] == ["https://a", "https://b"]
+            assert memory.get_post_by_url("https://b")["human_response"] == "Water daily"
+            assert memory.get_relevant_context("<title>Gardening tips</title>", limit=1)[0]["url"] == "https://b"
+        
+            # A fresh memory loads the persisted index instead of rebuilding
+            reloaded = EchoForgeMemory(temp_dir, config)
+            assert reloaded.vector_store.index.ntotal == 2
+            assert reloaded.search_posts_by_title("rust")[0]["url"] == "https://a"
+    
+    def test_append_before_index_is_loaded(self):
+        """Test appending to a memory whose store is not loaded yet does not index posts twice"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=64)
+            post = {"url": "https://a", "title": "Rust", "content": "borrow checker", "human_response": "Love it"}
+            EchoForgeMemory(temp_dir, config).append_documents([post])
+            
+            memory = EchoForgeMemory(temp_dir, config, load_index=False)
+            memory.append_documents([dict(post, url="https://b")])
+            
+            assert memory.vector_store.index.ntotal == 2
+    
+    def test_search_not_blocked_while_appending(self):
+        """Test retrieval proceeds while an append is embedding its batch"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=64, confidence_threshold=0.0)
+            memory = EchoForgeMemory(temp_dir, config)
+            memory.append_documents([{"url": "https://a", "title": "Rust", "content": "borrow checker"}])
+            embedding = threading.Event()
+            release = threading.Event()
+            embed_documents = memory.embeddings.embed_documents
+            
+            def slow_embed(texts):
+                embedding.set()
+                release.wait(5)
+                return embed_documents(texts)
+            
+            memory.embeddings.embed_documents = slow_embed
+            writer = threading.Thread(target=memory.append_documents,
+                                      args=([{"url": "https://b", "title": "Go", "content": "goroutines"}],))
+            writer.start()
+            assert embedding.wait(5)
+            
+            searched = []
+            reader = threading.Thread(target=lambda: searched.append(memory.get_relevant_context("<title>Rust</title>")))
+            reader.start()
+            reader.join(2)
+            blocked = reader.is_alive()
+            release.set()
+            writer.join(5)
+            
+            assert not blocked
+            assert [post["url"] for post in searched[0]] == ["https://a"]
+            assert memory.vector_store.index.ntotal == 2
+    
+    def test_small_batches_save_incrementally(self):
+        """Test a small batch only logs its vectors and a reload picks them up without rebuilding"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = EchoForgeConfig(embedding_provider="hashing", embedding_dim=64, confidence_threshold=0.0)
+            memory = EchoForgeMemory(temp_dir, config)
+            memory.append_documents([{"url": f"https://{i}", "title": f"Post {i}", "content": "filler"}
+                                     for i in range(4)])
+            
+            with patch.object(memory, "_persist_index") as persist:
+                memory.append_documents([{"url": "https://rust", "title": "Rust compilers", "content": "borrow checker"}])
+            
+            assert not persist.called
+            with open(memory.index_manifest_file, 'r') as f:
+                assert json.load(f)["appended"] == 1
+            with open(memory.echoForge_documents_file, 'rb') as f:
+                assert memory.documents_fingerprint == hashlib.sha256(f.read()).hexdigest()
+            with patch.object(EchoForgeMemory, "_faiss_from_documents") as rebuild:
+                reloaded = EchoForgeMemory(temp_dir, config)
+                assert reloaded.vector_store.index.ntotal == 5
+            assert not rebuild.called
+            assert reloaded.get_relevant_context("<title>Rust compilers</title>", limit=1)[0]["url"] == "https://rust"
+            assert reloaded.get_post_by_url("https://rust")["title"] == "Rust compilers"
+            
+            # Once the log outgrows the saved index the next save rewrites it in full
+            reloaded.append_documents([{"url": f"https://more/{i}", "title": "More", "content": "filler"}
+                                       for i in range(4)])
+            with open(memory.index_manifest_file, 'r') as f:
+                manifest = json.load(f)
+            assert (manifest["appended"], manifest["base_count"]) == (0, 9)
+            assert EchoForgeMemory(temp_dir, config).vector_store.index.ntotal == 9
+
+
+class TestRecordFeedback:
+    """Test cases for EchoForgeAgent.record_feedback"""
+    
+    def test_feedback_is_written_behind(self, make_agent):
+        """Test a finished echo session lands in memory after the queue is flushed"""
+        agent = make_agent()
+        set_input_provider(ScriptedHuman(["new post", "LinkedIn / AI / body", "yes"]))
+        try:
+            agent.chat()
+        finally:
+            set_input_provider(None)
+        
+        record = agent.record_feedback("I'd keep it short.", reflections="Too formal")
+        agent.close()
+        
+        state = agent.graph.get_state(agent.memory.get_config()).values
+        assert state["human_response"] == "I'd keep it short."
+        assert record["ai_response"] == state["ai_response"]
+        post = agent.memory.get_post_by_url(record["url"])
+        assert post["reflections"] == "Too formal"
+        assert agent.writeback.flushed_records == 1
+    
+    def test_repeated_feedback_stored_once(self, make_agent):
+        """Test recording feedback twice for a session keeps one stored post"""
+        agent = make_agent()
+        set_input_provider(ScriptedHuman(["new post", "LinkedIn / AI / body", "yes"]))
+        try:
+            agent.chat()
+        finally:
+            set_input_provider(None)
+        
+        record = agent.record_feedback("First answer")
+        agent.writeback.flush()
+        agent.record_feedback("Second answer")
+        agent.record_feedback("Third answer")
+        agent.close()
+        
+        urls = [doc["url"] for doc in agent.memory.documents]
+        assert urls.count(record["url"]) == 1
+        assert agent.graph.get_state(agent.memory.get_config()).values["human_response"] == "Third answer"
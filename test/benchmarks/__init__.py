@@ -0,0 +1 @@
+# Benchmark tests
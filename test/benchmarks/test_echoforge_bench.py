@@ -0,0 +1,58 @@
+"""
+Unit tests for the EchoForge benchmark suite
+"""
+import pytest
+import json
+import os
+import tempfile
+from benchmarks.echoforge_bench import compare, main, make_corpus, run
+
+
+class TestEchoForgeBench:
+    """Test cases for the benchmark suite"""
+    
+    def test_make_corpus_deterministic(self):
+        """Test synthetic corpora are reproducible and complete"""
+        corpus = make_corpus(10)
+        
+        assert corpus == make_corpus(10)
+        assert len(corpus) == 10
+        assert {"url", "context", "title", "content", "human_response", "timestamp"} <= set(corpus[0])
+    
+    def test_compare_flags_regressions(self):
+        """Test that only slowdowns beyond the threshold are flagged"""
+        baseline = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}, "gone": {"median": 1.0}}}
+        current = {"results": {"a": {"median": 1.1}, "b": {"median": 1.5}, "new": {"median": 1.0}}}
+        
+        rows = {row["benchmark"]: row for row in compare(current, baseline, threshold=0.2)}
+        
+        assert set(rows) == {"a", "b"}
+        assert not rows["a"]["regression"]
+        assert rows["b"]["regression"]
+        assert rows["b"]["ratio"] == pytest.approx(1.5)
+    
+    def test_run_covers_hot_paths(self):
+        """Test a tiny run produces every benchmark"""
+        results = run(sizes=[20], repeats=1, queries=2, dim=32)
+        
+        expected = {
+            "index_build[n=20]", "index_load[n=20]", "get_relevant_context[n=20]",
+            "build_echo_prompt[n=20]", "storage_save[n=20]", "storage_load[n=20]",
+            "ttl_store[n=20]", "graph_traversal"
+        }
+        assert set(results["results"]) == expected
+        assert results["meta"]["sizes"] == [20]
+    
+    def test_main_exit_code_on_regression(self):
+        """Test the comparison mode exits non-zero when a regression is found"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "current.json")
+            baseline = os.path.join(temp_dir, "baseline.json")
+            with open(baseline, 'w') as f:
+                json.dump({"results": {"graph_traversal": {"median": 1e-9}}}, f)
+            
+            code = main(["--sizes", "20", "--repeats", "1", "--queries", "1", "--dim", "32",
+                         "--output", output, "--compare", baseline])
+            
+            assert code == 1
+            assert os.path.exists(output)
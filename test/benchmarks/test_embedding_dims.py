@@ -0,0 +1,37 @@
+"""
+Unit tests for the embedding dimension trade-off benchmark
+"""
+import numpy as np
+from benchmarks.embedding_dims import evaluate, main, nearest, recall_at_k, smallest_acceptable
+
+
+class TestEmbeddingDims:
+    """Test cases for the embedding dimension benchmark"""
+    
+    def test_nearest_excludes_query(self):
+        """Test neighbours are ranked by cosine and never include the query"""
+        vectors = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.5, 0.5]], dtype=np.float32)
+        
+        found = nearest(vectors, np.array([0]), k=2)
+        
+        assert found.tolist() == [[1, 3]]
+        assert recall_at_k(found, np.array([[3, 2]])) == 0.5
+    
+    def test_low_rank_data_keeps_recall(self):
+        """Test pca keeps recall on data that really lives in few dimensions"""
+        rng = np.random.RandomState(0)
+        vectors = rng.normal(size=(300, 8)) @ rng.normal(size=(8, 64))
+        
+        rows = evaluate(vectors, dims=[4, 8, 16], k=5, queries=50)
+        by_key = {(row["method"], row["dims"]): row for row in rows}
+        
+        assert by_key[("full", 64)]["recall"] == 1.0
+        assert by_key[("pca", 8)]["recall"] > 0.99
+        assert by_key[("pca", 4)]["recall"] < by_key[("pca", 8)]["recall"]
+        assert by_key[("pca", 8)]["bytes_per_vector"] == 32
+        assert smallest_acceptable(rows, 0.99)["pca"] == 8
+    
+    def test_main_synthetic(self, capsys):
+        """Test the command line run on a small synthetic corpus"""
+        assert main(["--size", "200", "--dim", "128", "--dims", "32", "64", "--queries", "20"]) == 0
+        assert "recall@5" in capsys.readouterr().out
@@ -0,0 +1,51 @@
+"""
+Unit tests for the load test harness
+"""
+import json
+import os
+from benchmarks.load_test import main, replay
+
+
+def record_cassette(make_agent, temp_dir, sessions=2):
+    path = os.path.join(temp_dir, "sessions.json")
+    agent = make_agent(cassette_record_file=path)
+    for i in range(sessions):
+        turn = agent.start_session(f"rec-{i}")
+        for reply in ["new post", "LinkedIn / AI / body", "yes"]:
+            turn = agent.resume_session(f"rec-{i}", reply)
+    agent.close()
+    return path
+
+
+class TestLoadTest:
+    """Test cases for the load test harness"""
+    
+    def test_replay_levels(self, make_agent, tmp_path):
+        """Test every concurrency level completes its sessions without errors"""
+        cassette = record_cassette(make_agent, tmp_path)
+        
+        rows = replay(cassette, users=[1, 4], sessions_per_user=2, latency_scale=0.0, corpus_size=50)
+        
+        assert [(row["users"], row["sessions"], row["completed"]) for row in rows] == [(1, 2, 2), (4, 8, 8)]
+        assert all(row["error_rate"] == 0.0 for row in rows)
+        assert all(row["sessions_per_s"] > 0 and row["turn_p50_ms"] <= row["turn_p99_ms"] for row in rows)
+        assert all(row["rss_mb"] > 0 for row in rows)
+    
+    def test_main_reports_errors(self, capsys, make_agent, tmp_path):
+        """Test the command line run writes JSON rows and fails when sessions diverge"""
+        cassette = record_cassette(make_agent, tmp_path, sessions=1)
+        output = os.path.join(tmp_path, "load.json")
+        
+        assert main(["replay", "--cassette", cassette, "--users", "2", "--sessions", "1",
+                     "--latency-scale", "0", "--corpus-size", "20", "--output", output]) == 0
+        with open(output, 'r') as f:
+            assert json.load(f)[0]["completed"] == 2
+        
+        with open(cassette, 'r') as f:
+            data = json.load(f)
+        data["sessions"][0]["events"] = data["sessions"][0]["events"][:3]
+        with open(cassette, 'w') as f:
+            json.dump(data, f)
+        assert main(["replay", "--cassette", cassette, "--users", "1", "--sessions", "1",
+                     "--latency-scale", "0", "--corpus-size", "20"]) == 1
+        assert "sess/s" in capsys.readouterr().out
@@ -0,0 +1,55 @@
+"""
+Unit tests for the retrieval evaluation harness
+"""
+import json
+import os
+import tempfile
+from benchmarks.echoforge_bench import make_corpus
+from benchmarks.retrieval_eval import main, run, score
+from src.agents.echoForge.config import EchoForgeConfig
+
+
+class TestRetrievalEval:
+    """Test cases for the retrieval evaluation harness"""
+    
+    def test_score(self):
+        """Test recall@k against the exact top k and MRR of the exact nearest post"""
+        truth = [["a", "b"], ["c", "d"]]
+        retrieved = [["b", "a"], ["x", "y"]]
+        
+        assert score(truth, retrieved, k=2) == {"recall": 0.5, "mrr": 0.25}
+    
+    def test_exact_mode_matches_ground_truth(self):
+        """Test the full-size index reproduces exact search and reduced modes are reported"""
+        base = EchoForgeConfig(embedding_provider="hashing", embedding_dim=128, confidence_threshold=0.0)
+        modes = [{"name": "flat"}, {"name": "pca-16", "embedding_dimensions": 16, "embedding_reduction": "pca", "k": 5}]
+        
+        rows = run(make_corpus(150), modes, base, queries=30)
+        flat, pca = rows
+        
+        assert (flat["mode"], flat["k"], flat["dims"]) == ("flat", 3, 128)
+        assert flat["recall"] == 1.0 and flat["mrr"] == 1.0
+        assert pca["dims"] == 16 and pca["k"] == 5
+        assert pca["index_mb"] < flat["index_mb"]
+        assert 0.0 <= pca["recall"] <= 1.0
+        assert flat["p50_ms"] <= flat["p99_ms"]
+        assert flat["build_s"] > 0
+    
+    def test_main_with_documents_and_modes(self, capsys):
+        """Test the command line run over supplied documents and a modes file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            documents = os.path.join(temp_dir, "documents.json")
+            with open(documents, 'w') as f:
+                json.dump(make_corpus(60), f)
+            modes = os.path.join(temp_dir, "modes.json")
+            with open(modes, 'w') as f:
+                json.dump([{"name": "flat"}, {"name": "strict", "confidence_threshold": 0.99}], f)
+            output = os.path.join(temp_dir, "rows.json")
+            
+            assert main(["--documents", documents, "--modes", modes, "--queries", "10", "--output", output]) == 0
+            
+            with open(output, 'r') as f:
+                rows = json.load(f)
+            assert [row["mode"] for row in rows] == ["flat", "strict"]
+            assert rows[1]["recall"] <= rows[0]["recall"]
+            assert "recall@k" in capsys.readouterr().out
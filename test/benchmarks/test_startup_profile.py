@@ -0,0 +1,39 @@
+"""
+Startup regression tests for the EchoForge entry points
+"""
+import pytest
+from benchmarks.startup_profile import (
+    TARGET_FIRST_PROMPT_SECONDS, import_profile, parse_importtime, time_to_first_prompt
+)
+
+
+class TestStartupProfile:
+    """Test cases for the startup profile"""
+    
+    def test_parse_importtime(self):
+        """Test -X importtime lines are parsed with their nesting depth"""
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   json.decoder\n"
+            "import time:       300 |        420 | json\n"
+        )
+        
+        rows = parse_importtime(stderr)
+        
+        assert rows == [
+            {"module": "json.decoder", "self_us": 120, "cumulative_us": 120, "depth": 1},
+            {"module": "json", "self_us": 300, "cumulative_us": 420, "depth": 0}
+        ]
+    
+    def test_agent_import_defers_heavy_modules(self):
+        """Test importing the agent module does not load model/vector-store clients"""
+        profile = import_profile("src.agents.echoForge.agent")
+        
+        assert profile["deferred_loaded"] == []
+        assert profile["seconds"] > 0
+    
+    def test_time_to_first_prompt_within_target(self):
+        """Test the demo asks its first question within the startup target"""
+        elapsed = min(time_to_first_prompt() for _ in range(2))
+        
+        assert elapsed < TARGET_FIRST_PROMPT_SECONDS
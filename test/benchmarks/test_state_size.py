@@ -0,0 +1,40 @@
+"""
+Unit tests for the checkpointed state size benchmark
+"""
+import json
+import os
+import tempfile
+from benchmarks.state_size import main, measure_path
+
+
+class TestStateSize:
+    """Test cases for the state size benchmark"""
+    
+    def test_growth_is_linear(self):
+        """Test each conversation on a thread adds the same number of messages and bytes"""
+        rows = measure_path("collect", conversations=3)
+        
+        assert [row["conversation"] for row in rows] == [1, 2, 3]
+        assert rows[1]["messages"] - rows[0]["messages"] == rows[2]["messages"] - rows[1]["messages"]
+        assert abs((rows[2]["checkpoint_bytes"] - rows[1]["checkpoint_bytes"]) -
+                   (rows[1]["checkpoint_bytes"] - rows[0]["checkpoint_bytes"])) < 64
+    
+    def test_compaction_shrinks_fetch_state(self):
+        """Test search chatter only stays in the checkpoint with compaction disabled"""
+        compact = measure_path("fetch", conversations=2)
+        full = measure_path("fetch", conversations=2, compact=False)
+        
+        assert compact[-1]["checkpoint_bytes"] < full[-1]["checkpoint_bytes"]
+        assert compact[-1]["prompt_tokens"] < full[-1]["prompt_tokens"]
+    
+    def test_main(self, capsys):
+        """Test the command line run writes one row per path and conversation"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "state.json")
+        
+            assert main(["--conversations", "2", "--output", output]) == 0
+            with open(output, 'r') as f:
+                rows = json.load(f)
+        
+        assert [(row["path"], row["conversation"]) for row in rows] == [("collect", 1), ("collect", 2), ("fetch", 1), ("fetch", 2)]
+        assert "prompt tokens" in capsys.readouterr().out
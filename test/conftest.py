@@ -0,0 +1,35 @@
+"""
+Shared pytest fixtures
+"""
+import json
+import os
+import pytest
+import yaml
+from src.agents.echoForge.agent import EchoForgeAgent
+
+
+@pytest.fixture
+def make_agent(tmp_path):
+    """Factory for offline EchoForgeAgents: fake providers, data under tmp_path, closed after the test.
+
+    Keyword arguments override config entries; a script is written to fake_script_file.
+    """
+    agents = []
+
+    def build(script=None, data_dir=None, **overrides):
+        data_dir = str(data_dir or tmp_path)
+        config = {"llm_provider": "fake", "embedding_provider": "fake", "data_dir": data_dir, **overrides}
+        if script is not None:
+            config["fake_script_file"] = os.path.join(data_dir, "script.json")
+            with open(config["fake_script_file"], 'w') as f:
+                json.dump(script, f)
+        config_path = os.path.join(data_dir, "config.yaml")
+        with open(config_path, 'w') as f:
+            yaml.dump(config, f)
+        agent = EchoForgeAgent(config_path)
+        agents.append(agent)
+        return agent
+
+    yield build
+    for agent in agents:
+        agent.close()
@@ -2,7 +2,9 @@
 Unit tests for EchoForgePrompts
 """
 import pytest
-from src.prompts.echoForge.echoForge_prompts import EchoForgePrompts
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+from src.prompts.echoForge.echoForge_prompts import EchoForgePrompts, EchoPromptAssembler
 
 
 class TestEchoForgePrompts:
@@ -194,4 +196,86 @@ class TestEchoForgePrompts:
         assert isinstance(confirm_prompt, str)
         
         response_prompt = EchoForgePrompts.generate_response_prompt({}, [], "", "", "")
-        assert isinstance(response_prompt, str)
\ No newline at end of file
+        assert isinstance(response_prompt, str)
+
+
+class TestEchoPromptAssembler:
+    """Test cases for EchoPromptAssembler class"""
+    
+    PROFILE = {"tone": "Direct", "interests": ["AI", "hiking"], "style": {"humor": "dry"}}
+    NOTES = [{"context": "Twitter", "title": "Old post", "content": "Old body", "human_response": "Old reply", "similarity_dist": 0.2}]
+    
+    def test_segments_ordered_static_first(self):
+        """Test instructions and profile come before examples and the current post"""
+        prompt, _ = EchoPromptAssembler().build("LinkedIn", "AI Ethics", "Thoughts?", self.PROFILE, self.NOTES)
+        
+        positions = [prompt.index(marker) for marker in (
+            "You are responding as if you were the user", "<user_profile>",
+            "<relevant_historical_examples>", "<current_post>", "Response:"
+        )]
+        assert positions == sorted(positions)
+        assert "<humor>dry</humor>" in prompt
+        assert "<human_response>Old reply</human_response>" in prompt
+    
+    def test_static_prefix_memoized_until_profile_changes(self):
+        """Test the profile is rendered once and re-rendered only when it changes"""
+        assembler = EchoPromptAssembler()
+        profile = dict(self.PROFILE)
+        
+        with patch('src.prompts.echoForge.echoForge_prompts.render_user_profile', return_value="<p/>") as mock_render:
+            assembler.build("A", "B", "C", profile, [])
+            assembler.build("D", "E", "F", profile, self.NOTES)
+            assert mock_render.call_count == 1
+            
+            profile["tone"] = "Warm"
+            assembler.build("D", "E", "F", profile, [])
+            assert mock_render.call_count == 2
+            
+            # Alternating between known profiles keeps using the memoized prefixes
+            assembler.build("G", "H", "I", dict(self.PROFILE), [])
+            assembler.build("G", "H", "I", profile, [])
+            assert mock_render.call_count == 2
+    
+    def test_profiles_not_shared_between_tenants(self):
+        """Test concurrent builds for different profiles always get their own profile prefix"""
+        assembler = EchoPromptAssembler()
+        profiles = [{"tone": f"tenant-{n}"} for n in range(8)]
+        
+        def build(n):
+            prompt, _ = assembler.build("A", "B", "C", profiles[n % 8], [], session=f"thread-{n}")
+            return n % 8, prompt
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(build, range(200)))
+        for n, prompt in results:
+            assert f"<tone>tenant-{n}</tone>" in prompt
+            assert prompt.count("<tone>") == 1
+    
+    def test_prefix_report(self):
+        """Test consecutive prompts report a shared prefix covering the static segments"""
+        assembler = EchoPromptAssembler()
+        first, report = assembler.build("LinkedIn", "One", "Body one", self.PROFILE, self.NOTES, session="a")
+        assert report["shared_prefix_chars"] == 0
+        
+        # Another session's prompt in between does not count as the previous prompt
+        _, other = assembler.build("LinkedIn", "One", "Body one", self.PROFILE, self.NOTES, session="b")
+        assert other["shared_prefix_chars"] == 0
+        
+        _, report = assembler.build("Twitter", "Two", "Body two", self.PROFILE, [], session="a")
+        
+        assert report["static_prefix_chars"] == first.index("<relevant_historical_examples>")
+        assert report["shared_prefix_chars"] >= report["static_prefix_chars"]
+        assert report["shared_prefix_tokens_est"] == report["shared_prefix_chars"] // 4
+    
+    def test_static_builder_matches_assembler(self):
+        """Test the static build_echo_prompt produces the same prompt"""
+        expected, _ = EchoPromptAssembler().build("LinkedIn", "T", "C", self.PROFILE, self.NOTES)
+        
+        assert EchoForgePrompts.build_echo_prompt("LinkedIn", "T", "C", self.PROFILE, self.NOTES) == expected
+    
+    def test_empty_profile_and_notes(self):
+        """Test placeholders for missing profile and examples"""
+        prompt, _ = EchoPromptAssembler().build("", "", "", {}, [])
+        
+        assert "<no_profile>" in prompt
+        assert "<no_examples>" in prompt
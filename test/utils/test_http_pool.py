@@ -0,0 +1,161 @@
+"""
+Unit tests for the shared HTTP connection pool
+"""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+from src.utils.http_pool import HTTPPool, get_http_pool, reset_http_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+class OpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal chat completion and embedding responses"""
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path.endswith("/embeddings"):
+            payload = {"object": "list", "model": "m", "data": [{"object": "embedding", "index": 0, "embedding": [0.1, 0.2]}],
+                       "usage": {"prompt_tokens": 1, "total_tokens": 1}}
+        else:
+            payload = {"id": "c", "object": "chat.completion", "created": 0, "model": "m",
+                       "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "hi"}}],
+                       "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}}
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def openai_url():
+    server = serve(OpenAIHandler)
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+class TestHTTPPool:
+    """Test cases for HTTPPool class"""
+    
+    def test_sync_requests_reuse_connection(self, server_url):
+        """Test sequential requests share one kept-alive connection"""
+        pool = HTTPPool()
+        for _ in range(5):
+            assert pool.client.get(server_url).text == "ok"
+        
+        stats = pool.stats()
+        assert stats["requests"] == 5
+        assert stats["connections_opened"] == 1
+        assert stats["reused_connections"] == 4
+        assert stats["idle_connections"] == 1
+        pool.close()
+    
+    def test_async_requests_counted(self, server_url):
+        """Test the async client shares the same counters"""
+        pool = HTTPPool()
+        
+        async def fetch():
+            for _ in range(3):
+                await pool.async_client.get(server_url)
+            await pool.aclose()
+        
+        asyncio.run(fetch())
+        
+        assert pool.stats()["requests"] == 3
+        assert pool.stats()["connections_opened"] == 1
+    
+    def test_limits_and_timeouts_from_config(self):
+        """Test pool settings come from the config"""
+        config = SimpleNamespace(
+            http_max_connections=7, http_max_keepalive_connections=3, http_keepalive_expiry=5.0,
+            http_connect_timeout=1.0, http_read_timeout=2.0, http_write_timeout=3.0, http_pool_timeout=4.0
+        )
+        pool = HTTPPool.from_config(config)
+        
+        assert pool.stats()["max_connections"] == 7
+        assert pool.client.timeout.connect == 1.0
+        assert pool.client.timeout.pool == 4.0
+        pool.close()
+    
+    def test_process_wide_pool(self):
+        """Test get_http_pool returns one shared instance until reset"""
+        reset_http_pool()
+        try:
+            first = get_http_pool()
+            assert get_http_pool() is first
+            assert first.client is first.client
+        finally:
+            reset_http_pool()
+
+    def test_request_timeout_overrides_read(self):
+        """Test per-client timeouts keep the pool's limits and replace only read"""
+        pool = HTTPPool(connect_timeout=1.0, read_timeout=2.0, write_timeout=3.0, pool_timeout=4.0)
+        
+        assert pool.request_timeout() == pool.timeout
+        assert pool.request_timeout(read=9.0).as_dict() == {"connect": 1.0, "read": 9.0, "write": 3.0, "pool": 4.0}
+        assert pool.request_timeout(read=0).read == 2.0
+
+
+class TestOpenAIClientTimeouts:
+    """Test the pool's timeouts reach OpenAI chat and embedding requests"""
+    
+    def test_requests_carry_pool_timeouts(self, make_agent, monkeypatch, openai_url):
+        """Test outgoing requests use the pool's connect/write/pool limits, and llm_timeout as chat read limit"""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("OPENAI_BASE_URL", openai_url)
+        reset_http_pool()
+        try:
+            agent = make_agent(llm_provider="openai", embedding_provider="openai", llm_timeout=45.0,
+                               http_connect_timeout=1.0, http_read_timeout=2.0, http_write_timeout=3.0,
+                               http_pool_timeout=4.0)
+            seen = {}
+            pool = get_http_pool()
+            pool.client.event_hooks["request"].append(
+                lambda request: seen.setdefault(request.url.path.rsplit("/", 1)[-1], request.extensions["timeout"])
+            )
+            
+            assert agent.llm.invoke("hello").content == "hi"
+            agent.memory.embeddings.client.create(input=["hello"], model="text-embedding-3-small")
+        finally:
+            reset_http_pool()
+        
+        assert seen["completions"] == {"connect": 1.0, "read": 45.0, "write": 3.0, "pool": 4.0}
+        assert seen["embeddings"] == {"connect": 1.0, "read": 2.0, "write": 3.0, "pool": 4.0}
@@ -0,0 +1,122 @@
+"""
+Unit tests for EchoForge tracing utilities
+"""
+import pytest
+import json
+import os
+import tempfile
+from langgraph.errors import GraphInterrupt
+from src.agents.echoForge.fakes import ScriptedHuman
+from src.agents.tools import set_input_provider
+from src.utils.tracing import MetricsRegistry, Tracer, configure_tracing, percentile
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry class"""
+    
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0.0
+    
+    def test_summary_and_counters(self):
+        """Test summaries track count/sum/percentiles and counters accumulate"""
+        registry = MetricsRegistry()
+        for i in range(1, 101):
+            registry.observe("latency", i / 100, span="a")
+        registry.inc("errors", span="a")
+        registry.inc("errors", span="a")
+        
+        summary = registry.summary("latency", span="a")
+        assert summary["count"] == 100
+        assert summary["sum"] == pytest.approx(50.5)
+        assert summary["p99"] == pytest.approx(0.99)
+        assert registry.counter("errors", span="a") == 2
+    
+    def test_text_exposition(self):
+        """Test the text exposition format"""
+        registry = MetricsRegistry()
+        registry.observe("echoforge_span_seconds", 0.5, span="node.echo")
+        
+        text = registry.to_text()
+        
+        assert "# TYPE echoforge_span_seconds summary" in text
+        assert 'echoforge_span_seconds{span="node.echo",quantile="0.5"} 0.5' in text
+        assert 'echoforge_span_seconds_count{span="node.echo"} 1' in text
+
+
+class TestTracer:
+    """Test cases for Tracer class"""
+    
+    def test_disabled_tracer_records_nothing(self):
+        """Test that a disabled tracer is a no-op"""
+        tracer = Tracer(enabled=False)
+        with tracer.span("work") as span:
+            span.set(extra=1)
+        
+        assert tracer.registry.summary("echoforge_span_seconds", span="work")["count"] == 0
+    
+    def test_spans_logged_with_thread_and_parent(self):
+        """Test spans are written as JSON lines with thread_id and parent"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = os.path.join(temp_dir, "trace.jsonl")
+            tracer = Tracer(enabled=True, log_file=log_file)
+            with tracer.bind_thread("thread-1"):
+                with tracer.span("outer"):
+                    with tracer.span("inner", k=3):
+                        pass
+            tracer.close()
+            
+            with open(log_file, 'r') as f:
+                entries = [json.loads(line) for line in f]
+        
+        assert [e["span"] for e in entries] == ["inner", "outer"]
+        assert entries[0]["parent"] == "outer"
+        assert entries[0]["k"] == 3
+        assert all(e["thread_id"] == "thread-1" for e in entries)
+    
+    def test_span_error_status(self):
+        """Test exceptions are recorded on the span and re-raised"""
+        tracer = Tracer(enabled=True)
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("boom")
+        
+        assert tracer.registry.counter("echoforge_span_errors_total", span="failing") == 1
+    
+    def test_interrupt_is_not_an_error(self):
+        """Test spans suspended by a graph interrupt are not counted as errors"""
+        tracer = Tracer(enabled=True)
+        with pytest.raises(GraphInterrupt):
+            with tracer.span("waiting"):
+                raise GraphInterrupt()
+        
+        assert tracer.registry.counter("echoforge_span_errors_total", span="waiting") == 0
+        assert tracer.registry.summary("echoforge_span_seconds", span="waiting")["count"] == 1
+    
+    def test_agent_graph_traced(self, make_agent, tmp_path):
+        """Test a full offline traversal produces node, LLM and retrieval spans"""
+        agent = make_agent(logs_dir=str(tmp_path), tracing_enabled=True)
+        agent.tracer.registry.reset()
+        set_input_provider(ScriptedHuman(["new post", "LinkedIn / AI / body", "yes"]))
+        try:
+            agent.chat()
+        finally:
+            set_input_provider(None)
+            configure_tracing(False)
+        
+        with open(os.path.join(tmp_path, "echoforge_trace.jsonl"), 'r') as f:
+            entries = [json.loads(line) for line in f]
+        with open(os.path.join(tmp_path, "echoforge_metrics.prom"), 'r') as f:
+            metrics = f.read()
+        
+        spans = {e["span"] for e in entries}
+        thread_id = agent.memory.get_config()["configurable"]["thread_id"]
+        assert {"node.gather_intent", "node.collect_post_info", "node.echo", "llm.call",
+                "tool.ask_human", "llm.structured_parse", "llm.echo_generation"} <= spans
+        assert all(e["thread_id"] == thread_id for e in entries if e["span"].startswith("node."))
+        assert 'span="node.echo"' in metrics